@@ -4,6 +4,7 @@ import numpy as np
 import json
 import sys
 import os
+import struct
 from base64 import b64decode
 
 mp_pose = mp.solutions.pose
@@ -49,6 +50,22 @@ def calculate_body_ratios(landmarks, image_shape, gender="male"):
         "height": float(round(height_px, 2)),
     }
 
+def analyze_image_bytes(image_bytes, gender, pose):
+    # Numpy array'e dönüştür (kopyasız)
+    nparr = np.frombuffer(image_bytes, np.uint8)
+    image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+
+    if image is None:
+        raise Exception("Görsel yüklenemedi")
+
+    image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    results = pose.process(image_rgb)
+
+    if not results.pose_landmarks:
+        raise Exception("Vücut noktaları tespit edilemedi")
+
+    return calculate_body_ratios(results.pose_landmarks.landmark, image.shape, gender)
+
 def analyze_body():
     try:
         # Stdin'den JSON verisini oku
@@ -61,22 +78,9 @@ def analyze_body():
 
         # Base64 görsel verisini decode et
         image_data = b64decode(image_data.split(',')[1] if ',' in image_data else image_data)
-        
-        # Numpy array'e dönüştür
-        nparr = np.frombuffer(image_data, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
-        if image is None:
-            raise Exception("Görsel yüklenemedi")
 
         with mp_pose.Pose(static_image_mode=True, min_detection_confidence=0.5) as pose:
-            image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            results = pose.process(image_rgb)
-
-            if not results.pose_landmarks:
-                raise Exception("Vücut noktaları tespit edilemedi")
-
-            body_ratios = calculate_body_ratios(results.pose_landmarks.landmark, image.shape, gender)
+            body_ratios = analyze_image_bytes(image_data, gender, pose)
             
             # Sonuçları JSON olarak yazdır
             print(json.dumps({"success": True, "results": body_ratios}))
@@ -86,5 +90,58 @@ def analyze_body():
         print(json.dumps({"success": False, "error": str(e)}))
         sys.stdout.flush()
 
+# --- Kalıcı çalışan (worker) modu ---
+# Node tarafı süreci bir kez başlatır; cv2/mediapipe/numpy importları ve model yüklemesi
+# her istekte tekrar ödenmez. Çerçeve (frame) formatı, tüm tamsayılar big-endian uint32:
+#   İstek : [uzunluk][istek id][başlık uzunluğu][başlık JSON ({"gender": ...})][ham görsel baytları]
+#   Yanıt : [uzunluk][istek id][sonuç JSON ({"success": ..., "results"/"error": ...})]
+# `uzunluk`, kendisinden sonra gelen bayt sayısıdır. id=0 yanıtı "hazır" sinyalidir.
+
+def _read_exact(stream, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = stream.read(size - len(data))
+        if not chunk:
+            return None
+        data.extend(chunk)
+    return bytes(data)
+
+def _write_frame(stream, request_id, payload):
+    body = json.dumps(payload).encode("utf-8")
+    stream.write(struct.pack(">II", len(body) + 4, request_id))
+    stream.write(body)
+    stream.flush()
+
+def run_worker():
+    # Protokol için gerçek stdout'u ayır, fd 1'i stderr'e yönlendir:
+    # kütüphanelerin yazdığı her şey çerçeve akışını bozmadan stderr'e gider.
+    out = os.fdopen(os.dup(1), "wb")
+    os.dup2(2, 1)
+    inp = sys.stdin.buffer
+
+    with mp_pose.Pose(static_image_mode=True, min_detection_confidence=0.5) as pose:
+        _write_frame(out, 0, {"ready": True, "pid": os.getpid()})
+        while True:
+            header = _read_exact(inp, 4)
+            if header is None:
+                break  # stdin kapandı: Node tarafı çalışanı kapatıyor
+            (length,) = struct.unpack(">I", header)
+            frame = _read_exact(inp, length)
+            if frame is None or length < 8:
+                break
+            request_id, meta_length = struct.unpack(">II", frame[:8])
+            try:
+                meta = json.loads(frame[8:8 + meta_length].decode("utf-8")) if meta_length else {}
+                image_bytes = memoryview(frame)[8 + meta_length:]
+                if len(image_bytes) == 0:
+                    raise Exception("Görsel verisi bulunamadı")
+                body_ratios = analyze_image_bytes(image_bytes, meta.get("gender", "male"), pose)
+                _write_frame(out, request_id, {"success": True, "results": body_ratios})
+            except Exception as e:
+                _write_frame(out, request_id, {"success": False, "error": str(e)})
+
 if __name__ == "__main__":
-    analyze_body() 
\ No newline at end of file
+    if "--worker" in sys.argv[1:]:
+        run_worker()
+    else:
+        analyze_body()
@@ -0,0 +1,73 @@
+"""
+Node tarafının (backend/pythonWorkerPool.js) kalıcı çalışan süreci.
+
+FastAPI servisiyle aynı analiz hattını (`body_analysis.analyze_body_bytes`) kullanır; yanıt
+anahtarları ve boy hesabı /analyze_image/ ile aynıdır (Türkçe etiketler, görünür noktaların
+dikey açıklığı). Çerçeve formatı backend/bodyAnalysis.py --worker ile aynıdır, tüm tamsayılar
+big-endian uint32:
+  İstek : [uzunluk][istek id][başlık uzunluğu][başlık JSON ({"gender": ...})][ham görsel baytları]
+  Yanıt : [uzunluk][istek id][sonuç JSON ({"success": ..., "results"/"error": ...})]
+`uzunluk`, kendisinden sonra gelen bayt sayısıdır. id=0 yanıtı "hazır" sinyalidir.
+
+Kullanım: python analysis_worker.py
+"""
+import json
+import os
+import struct
+import sys
+
+
+def _read_exact(stream, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = stream.read(size - len(data))
+        if not chunk:
+            return None
+        data.extend(chunk)
+    return bytes(data)
+
+
+def _write_frame(stream, request_id, payload):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    stream.write(struct.pack(">II", len(body) + 4, request_id))
+    stream.write(body)
+    stream.flush()
+
+
+def run_worker():
+    # Protokol için gerçek stdout'u ayır, fd 1'i stderr'e yönlendir:
+    # kütüphanelerin yazdığı her şey çerçeve akışını bozmadan stderr'e gider.
+    out = os.fdopen(os.dup(1), "wb")
+    os.dup2(2, 1)
+    inp = sys.stdin.buffer
+
+    from body_analysis import BodyAnalysisError, analyze_body_bytes
+    from pose_pool import PosePool
+
+    pose_pool = PosePool(size=1)
+    try:
+        _write_frame(out, 0, {"ready": True, "pid": os.getpid()})
+        while True:
+            header = _read_exact(inp, 4)
+            if header is None:
+                break  # stdin kapandı: Node tarafı çalışanı kapatıyor
+            (length,) = struct.unpack(">I", header)
+            frame = _read_exact(inp, length)
+            if frame is None or length < 8:
+                break
+            request_id, meta_length = struct.unpack(">II", frame[:8])
+            try:
+                meta = json.loads(frame[8:8 + meta_length].decode("utf-8")) if meta_length else {}
+                image_bytes = memoryview(frame)[8 + meta_length:]
+                results = analyze_body_bytes(image_bytes, meta.get("gender", "male"), pose_pool=pose_pool)
+                _write_frame(out, request_id, {"success": True, "results": results})
+            except BodyAnalysisError as e:
+                _write_frame(out, request_id, {"success": False, "error": str(e), "reason": e.reason})
+            except Exception as e:
+                _write_frame(out, request_id, {"success": False, "error": str(e)})
+    finally:
+        pose_pool.close()
+
+
+if __name__ == "__main__":
+    run_worker()
@@ -0,0 +1,68 @@
+"""
+Her istekte yeni Pose oluşturma ile sıcak Pose havuzu kullanımını karşılaştırır.
+
+Kullanım (backend/python dizininden):
+    python -m benchmarks.bench_pose_pool --requests 40 --concurrency 4 --output pose_pool.json
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import encode_png, latency_summary, synthetic_person_image, write_results
+from body_analysis import BodyAnalysisError, analyze_body
+from pose_pool import PosePool
+
+
+def _timed_analyze(image_path, pose_pool):
+    start = time.perf_counter()
+    try:
+        analyze_body(image_path, "male", pose_pool=pose_pool)
+    except BodyAnalysisError:
+        # Sentetik siluette nokta bulunamaması beklenebilir; ölçülen süre yine de tam çıkarım süresidir
+        pass
+    return time.perf_counter() - start
+
+
+def _run(image_path, requests, concurrency, pose_pool):
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        start = time.perf_counter()
+        samples = list(executor.map(lambda _: _timed_analyze(image_path, pose_pool), range(requests)))
+        wall = time.perf_counter() - start
+    return latency_summary(samples, wall)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--width", type=int, default=720)
+    parser.add_argument("--height", type=int, default=1280)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        image_path = os.path.join(tmp, "synthetic.png")
+        with open(image_path, "wb") as f:
+            f.write(encode_png(synthetic_person_image(args.width, args.height)))
+
+        results = {"config": vars(args)}
+        results["cold_pose_per_request"] = _run(image_path, args.requests, args.concurrency, None)
+
+        pool_start = time.perf_counter()
+        pool = PosePool(size=args.concurrency)
+        results["pool_startup_ms"] = round((time.perf_counter() - pool_start) * 1000.0, 3)
+        try:
+            results["warm_pose_pool"] = _run(image_path, args.requests, args.concurrency, pool)
+        finally:
+            pool.close()
+
+    cold, warm = results["cold_pose_per_request"], results["warm_pose_pool"]
+    results["p50_speedup"] = round(cold["p50_ms"] / warm["p50_ms"], 2) if warm["p50_ms"] else None
+    results["throughput_speedup"] = round(warm["req_per_s"] / cold["req_per_s"], 2) if cold["req_per_s"] else None
+    write_results("pose_pool", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Tam çözünürlükte çözme ile azaltılmış çözme (IMREAD_REDUCED + uzun kenar sınırı)
+arasındaki çözme süresini ve istek başına tepe bellek (RSS) artışını ölçer.
+
+Her ölçüm ayrı bir süreçte yapılır; böylece bir önceki ölçümün bellek tepe değeri
+sonrakini etkilemez.
+
+Kullanım (backend/python dizininden):
+    python -m benchmarks.bench_preprocess --repeat 5 --output preprocess.json
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.common import encode_jpeg, latency_summary, synthetic_person_image, write_results
+
+# Tipik telefon çözünürlükleri (genişlik, yükseklik)
+RESOLUTIONS = {
+    "3MP": (1512, 2016),
+    "12MP": (3024, 4032),
+    "24MP": (4000, 6000),
+    "48MP": (6000, 8000),
+}
+
+
+def _measure(image_path, mode, max_long_edge, repeat):
+    """Alt süreçte çalışır: çözme + renk dönüşümü sürelerini ve tepe RSS artışını döndürür."""
+    import cv2
+    import numpy as np
+    from image_io import decode_for_inference
+
+    with open(image_path, "rb") as f:
+        buf = f.read()
+    rss_before_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    samples = []
+    shape = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if mode == "full":
+            image = cv2.imdecode(np.frombuffer(buf, dtype=np.uint8), cv2.IMREAD_COLOR)
+        else:
+            image = decode_for_inference(buf, max_long_edge=max_long_edge).image
+        rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        samples.append(time.perf_counter() - start)
+        shape = rgb.shape
+        del image, rgb
+
+    rss_after_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "decoded_shape": list(shape),
+        "latency": latency_summary(samples),
+        "peak_rss_increase_mb": round((rss_after_kb - rss_before_kb) / 1024.0, 2),
+    }
+
+
+def _run_isolated(image_path, mode, max_long_edge, repeat):
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(_measure, image_path, mode, max_long_edge, repeat).result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-long-edge", type=int, default=1280)
+    parser.add_argument("--resolutions", default=",".join(RESOLUTIONS), help="Virgülle ayrılmış: " + ",".join(RESOLUTIONS))
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    results = {"config": vars(args), "cases": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in args.resolutions.split(","):
+            width, height = RESOLUTIONS[name]
+            image_path = os.path.join(tmp, f"{name}.jpg")
+            with open(image_path, "wb") as f:
+                f.write(encode_jpeg(synthetic_person_image(width, height), quality=92))
+
+            full = _run_isolated(image_path, "full", 0, args.repeat)
+            reduced = _run_isolated(image_path, "reduced", args.max_long_edge, args.repeat)
+            results["cases"][name] = {
+                "file_size_mb": round(os.path.getsize(image_path) / (1024.0 * 1024.0), 2),
+                "full_decode": full,
+                "reduced_decode": reduced,
+                "p50_speedup": round(full["latency"]["p50_ms"] / reduced["latency"]["p50_ms"], 2),
+                "peak_rss_saved_mb": round(full["peak_rss_increase_mb"] - reduced["peak_rss_increase_mb"], 2),
+            }
+    write_results("preprocess", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Analiz yanıtının JSON'a yazılma maliyetini ve yanıt boyutunu karşılaştırır:
+
+- legacy_default: Eski yol; FastAPI'nin dict dönüşünde yaptığı gibi jsonable_encoder + JSONResponse
+- legacy_fast: Aynı (Türkçe etiketli) içerik, FastJSONResponse ile doğrudan (orjson varsa orjson)
+- compact_fast: Kısa anahtarlı kompakt içerik (dönüşüm dahil), FastJSONResponse ile
+- compact_model: Kompakt içerik pydantic modeliyle doğrulanıp yazıldığında (response_model yolu)
+
+Toplu analiz için NDJSON satırlarının json.dumps ve schemas.dumps ile yazılma süresi de ölçülür.
+Görüntü analizi çalıştırılmaz; temsili bir sonuç sözlüğü kullanılır.
+
+Kullanım (backend/python dizininden):
+    python -m benchmarks.bench_serialization --iterations 20000 --output serialization.json
+"""
+import argparse
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+import schemas
+from benchmarks.common import write_results
+from schemas import BodyAnalysisCompact, FastJSONResponse, dumps, to_compact
+
+SAMPLE_RESULT = {
+    "Vücut Yağ Oranı (%)": 18.43,
+    "Bel-Kalça Oranı (WHR)": 0.87,
+    "Kalça/Omuz Genişlik Oranı": 0.87,
+    "Omuz Genişliği (px)": 241.52,
+    "Kalça Genişliği (px)": 210.17,
+    "Boy Uzunluğu (px)": 1104,
+}
+
+
+def _per_call_us(fn, iterations, repeats):
+    """En iyi tekrarın çağrı başına süresi (µs); ilk çağrılar ısınma için atılır."""
+    for _ in range(min(iterations, 1000)):
+        fn()
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        elapsed = (time.perf_counter() - start) / iterations
+        best = elapsed if best is None or elapsed < best else best
+    return round(best * 1e6, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=64, help="NDJSON ölçümünde satır sayısı")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    compact = to_compact(SAMPLE_RESULT)
+    cases = {
+        "legacy_default": lambda: JSONResponse(jsonable_encoder(SAMPLE_RESULT)).body,
+        "legacy_fast": lambda: FastJSONResponse(SAMPLE_RESULT).body,
+        "compact_fast": lambda: FastJSONResponse(to_compact(SAMPLE_RESULT)).body,
+        "compact_model": lambda: BodyAnalysisCompact.model_validate(compact).model_dump_json().encode("utf-8"),
+    }
+    results = {"config": vars(args), "orjson": schemas.orjson is not None, "responses": {}}
+    for name, fn in cases.items():
+        results["responses"][name] = {
+            "per_response_us": _per_call_us(fn, args.iterations, args.repeats),
+            "bytes": len(fn()),
+        }
+    baseline = results["responses"]["legacy_default"]
+    for case in results["responses"].values():
+        case["speedup"] = round(baseline["per_response_us"] / case["per_response_us"], 2)
+        case["bytes_saved_pct"] = round(100.0 * (1 - case["bytes"] / baseline["bytes"]), 1)
+
+    lines = [
+        {"index": i, "filename": f"{i}.jpg", "status": 200, "result": SAMPLE_RESULT} for i in range(args.batch_size)
+    ]
+    compact_lines = [dict(line, result=compact) for line in lines]
+    batch_iterations = max(args.iterations // args.batch_size, 1)
+    results["ndjson_batch"] = {
+        "json_dumps_legacy_us": _per_call_us(
+            lambda: [(json.dumps(line, ensure_ascii=False) + "\n").encode("utf-8") for line in lines],
+            batch_iterations, args.repeats,
+        ),
+        "fast_dumps_legacy_us": _per_call_us(lambda: [dumps(line) + b"\n" for line in lines], batch_iterations, args.repeats),
+        "fast_dumps_compact_us": _per_call_us(lambda: [dumps(line) + b"\n" for line in compact_lines], batch_iterations, args.repeats),
+        "legacy_bytes": sum(len(dumps(line)) + 1 for line in lines),
+        "compact_bytes": sum(len(dumps(line)) + 1 for line in compact_lines),
+    }
+    write_results("serialization", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
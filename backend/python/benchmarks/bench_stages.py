@@ -0,0 +1,97 @@
+"""
+body_analysis.py hattının her aşamasını ayrı ayrı ölçer:
+çözme (decode), renk dönüşümü, pose çıkarımı, oran hesabı ve JSON serileştirme.
+
+Görüntüler yerelde sentetik olarak üretilir, ağ erişimi gerekmez.
+
+Kullanım (backend/python dizininden):
+    python -m benchmarks.bench_stages --repeat 20 --resolutions 720x1280,3024x4032 --output stages.json
+"""
+import argparse
+import json
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks.common import encode_jpeg, latency_summary, synthetic_person_image, write_results
+from body_analysis import calculate_body_ratios
+from image_io import decode_for_inference
+from pose_pool import PosePool
+
+
+def _synthetic_landmarks(seed=0):
+    """Pose bir şey bulamazsa oran aşamasını yine de ölçebilmek için makul bir landmark kümesi."""
+    rng = np.random.default_rng(seed)
+
+    class _Landmark:
+        __slots__ = ("x", "y", "z", "visibility")
+
+    landmarks = []
+    for i in range(33):
+        lm = _Landmark()
+        lm.x, lm.y, lm.z = 0.3 + 0.4 * rng.random(), 0.05 + 0.9 * i / 32.0, 0.0
+        lm.visibility = 0.9
+        landmarks.append(lm)
+    return landmarks
+
+
+def bench_resolution(buf, pose, repeat, max_long_edge):
+    stages = {"decode": [], "color_convert": [], "pose_inference": [], "ratios": [], "json_serialize": [], "total": []}
+    detected = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        prepared = decode_for_inference(buf, max_long_edge=max_long_edge)
+        t1 = time.perf_counter()
+        image_rgb = cv2.cvtColor(prepared.image, cv2.COLOR_BGR2RGB)
+        t2 = time.perf_counter()
+        results = pose.process(image_rgb)
+        t3 = time.perf_counter()
+        if results.pose_landmarks:
+            detected += 1
+            landmarks = results.pose_landmarks
+        else:
+            landmarks = _synthetic_landmarks()
+        ratios = calculate_body_ratios(landmarks, prepared.original_shape, "male")
+        t4 = time.perf_counter()
+        json.dumps(ratios, ensure_ascii=False)
+        t5 = time.perf_counter()
+
+        stages["decode"].append(t1 - t0)
+        stages["color_convert"].append(t2 - t1)
+        stages["pose_inference"].append(t3 - t2)
+        stages["ratios"].append(t4 - t3)
+        stages["json_serialize"].append(t5 - t4)
+        stages["total"].append(t5 - t0)
+
+    summary = {name: latency_summary(samples) for name, samples in stages.items()}
+    summary["pose_detected_ratio"] = round(detected / repeat, 3)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--resolutions", default="720x1280,1512x2016,3024x4032")
+    parser.add_argument("--max-long-edge", type=int, default=None, help="Varsayılan: MAX_INFERENCE_EDGE")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    results = {"config": vars(args), "resolutions": {}}
+    pool = PosePool(size=1)
+    try:
+        with pool.checkout() as pose:
+            for spec in args.resolutions.split(","):
+                width, height = (int(v) for v in spec.lower().split("x"))
+                buf = encode_jpeg(synthetic_person_image(width, height))
+                # İlk çağrılardaki tembel başlatma maliyeti ölçüme karışmasın
+                bench_resolution(buf, pose, args.warmup, args.max_long_edge)
+                results["resolutions"][spec] = bench_resolution(buf, pose, args.repeat, args.max_long_edge)
+    finally:
+        pool.close()
+    write_results("stages", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
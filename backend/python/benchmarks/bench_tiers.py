@@ -0,0 +1,141 @@
+"""
+Kademeli çıkarımın (POSE_TIERS) kalite/gecikme raporu.
+
+Aynı sentetik görüntü kümesi şu yapılandırmalarla analiz edilir:
+
+- fixed_cN: Her istek tek model_complexity=N modeliyle (N yüklenebiliyorsa)
+- tiered: TieredPosePool ile ucuzdan ağıra kademeli çıkarım
+
+Her yapılandırma için istek başına duvar saati ve CPU süresi ile tespit oranı, kademeli
+çalıştırma için ayrıca görüntü başına Pose geçişi ve kademe sonuçlarının dağılımı raporlanır. Kalite, en ağır
+kullanılabilir sabit modelin sonuçlarına göre piksel ölçümlerinin ortalama mutlak farkıdır.
+Tek renkli görüntülerin düz görüntü filtresinde reddedilme süresi ayrıca ölçülür.
+
+lite (0) ve heavy (2) model dosyaları mediapipe paketinde yoktur; önce provision_pose_models.py ile
+indirilmelidir. Model dosyası olmayan kademeler raporda "unavailable" olarak listelenir.
+
+Kullanım (backend/python dizininden):
+    python -m benchmarks.bench_tiers --images 24 --repeat 2 --tiers 0,1,2 --output tiers.json
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+import body_analysis
+from benchmarks.common import encode_png, latency_summary, synthetic_person_image, write_results
+from body_analysis import BodyAnalysisError, analyze_body_bytes
+from metrics import StageTimings
+from pose_pool import PosePool, TieredPosePool, pose_model_path
+
+_PIXEL_KEYS = ("Omuz Genişliği (px)", "Kalça Genişliği (px)", "Boy Uzunluğu (px)")
+
+
+def _run(images, repeat, gender, **analyze_kwargs):
+    wall, cpu, outputs, tiers_used = [], [], [], []
+    for buf in images:
+        result = None
+        for _ in range(repeat):
+            timings = StageTimings()
+            w0, c0 = time.perf_counter(), time.process_time()
+            try:
+                result = analyze_body_bytes(buf, gender, timings=timings, **analyze_kwargs)
+            except BodyAnalysisError as e:
+                result = {"error": e.reason}
+            wall.append(time.perf_counter() - w0)
+            cpu.append(time.process_time() - c0)
+        outputs.append(result)
+        tiers_used.append(sorted(name for name in timings.stages if name.startswith("pose_tier")))
+    detected = sum(1 for result in outputs if "error" not in result)
+    return {
+        "latency": latency_summary(wall),
+        "cpu_ms_mean": round(1000.0 * float(np.mean(cpu)), 3),
+        "detected": detected,
+        "detection_rate": round(detected / len(images), 3),
+    }, outputs, tiers_used
+
+
+def _quality(outputs, reference):
+    """Referansla ikisinin de sonuç verdiği görüntülerde piksel ölçümlerinin ortalama mutlak farkı."""
+    diffs = {key: [] for key in _PIXEL_KEYS}
+    agree = 0
+    for result, ref in zip(outputs, reference):
+        agree += ("error" in result) == ("error" in ref)
+        if "error" in result or "error" in ref:
+            continue
+        for key in _PIXEL_KEYS:
+            diffs[key].append(abs(float(result[key]) - float(ref[key])))
+    return {
+        "detection_agreement": round(agree / len(reference), 3),
+        "mean_abs_diff_px": {key: round(float(np.mean(v)), 3) if v else None for key, v in diffs.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=24, help="Sentetik görüntü sayısı (farklı tohumlar)")
+    parser.add_argument("--repeat", type=int, default=2, help="Görüntü başına tekrar")
+    parser.add_argument("--resolution", default="720x1280")
+    parser.add_argument("--tiers", default="0,1,2", help="Denenecek model_complexity kademeleri")
+    parser.add_argument("--min-visibility", type=float, default=body_analysis.POSE_TIER_MIN_VISIBILITY)
+    parser.add_argument("--gender", default="male")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.resolution.lower().split("x"))
+    complexities = [int(c) for c in args.tiers.split(",") if c.strip()]
+    body_analysis.POSE_TIER_MIN_VISIBILITY = args.min_visibility
+    images = [encode_png(synthetic_person_image(width, height, seed)) for seed in range(args.images)]
+
+    pools = {}
+    unavailable = []
+    for complexity in complexities:
+        if not os.path.exists(pose_model_path(complexity)):
+            unavailable.append(complexity)
+            continue
+        try:
+            pools[complexity] = PosePool(size=1, model_complexity=complexity)
+        except Exception:
+            unavailable.append(complexity)
+    results = {"config": vars(args), "available": sorted(pools), "unavailable": unavailable, "runs": {}}
+    if not pools:
+        write_results("tiers", results, args.output)
+        return
+
+    # Modeller ölçümden önce yüklenir ve birer kez çalıştırılır; ilk çıkarımın maliyeti ölçüme girmez
+    tiers = TieredPosePool(complexities, size=1)
+    warm_up_image = np.ascontiguousarray(synthetic_person_image(width, height, 0)[:, :, ::-1])
+    for pool in list(pools.values()) + [tiers.pool(c) for c in tiers.prepare()]:
+        with pool.checkout() as pose:
+            pose.process(warm_up_image)
+
+    outputs = {}
+    for complexity, pool in sorted(pools.items()):
+        name = f"fixed_c{complexity}"
+        results["runs"][name], outputs[name], _ = _run(images, args.repeat, args.gender, pose_pool=pool)
+
+    results["runs"]["tiered"], outputs["tiered"], tiers_used = _run(
+        images, args.repeat, args.gender, pose_pool=pools[max(pools)], pose_tiers=tiers
+    )
+    results["runs"]["tiered"]["passes_per_image"] = round(float(np.mean([len(used) for used in tiers_used])), 3)
+    results["runs"]["tiered"]["outcomes"] = tiers.stats()["outcomes"]
+
+    reference = outputs[f"fixed_c{max(pools)}"]
+    for name, run in results["runs"].items():
+        run["quality_vs_reference"] = _quality(outputs[name], reference)
+    baseline = results["runs"].get("fixed_c1") or results["runs"][f"fixed_c{max(pools)}"]
+    for run in results["runs"].values():
+        run["cpu_saving_pct"] = round(100.0 * (1 - run["cpu_ms_mean"] / baseline["cpu_ms_mean"]), 1)
+
+    blank = encode_png(np.full((height, width, 3), 30, dtype=np.uint8))
+    results["flat_image_rejection"], _, _ = _run([blank], args.repeat * 10, args.gender, pose_pool=pools[min(pools)])
+
+    for pool in pools.values():
+        pool.close()
+    tiers.close()
+    write_results("tiers", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import json
+import os
+import platform
+import time
+
+import cv2
+import numpy as np
+
+
+def synthetic_person_image(width=720, height=1280, seed=0):
+    """
+    Ağ erişimi gerektirmeden basit bir insan silueti çizen sentetik test görüntüsü üretir.
+    Amaç gerçekçi bir fotoğraf değil, tekrarlanabilir boyut ve içerikte bir girdi sağlamaktır.
+    """
+    if width * height > 720 * 1280:
+        # Büyük çözünürlükler (12-48 MP) için temel görüntü büyütülür: piksel gürültüsü
+        # telefon fotoğraflarındaki gibi yumuşak kalır ve üretim hızlı olur
+        base = synthetic_person_image(720, int(round(720 * height / width)), seed)
+        return cv2.resize(base, (width, height), interpolation=cv2.INTER_LINEAR)
+
+    rng = np.random.default_rng(seed)
+    image = rng.integers(180, 230, size=(height, width, 3), dtype=np.uint8)
+    cx = width // 2
+    unit = height / 8.0
+    skin = (150, 180, 220)
+    cloth = (90, 60, 40)
+    thickness = max(int(unit * 0.35), 2)
+
+    cv2.circle(image, (cx, int(unit * 1.0)), int(unit * 0.45), skin, -1)  # baş
+    cv2.rectangle(image, (int(cx - unit * 0.8), int(unit * 1.5)), (int(cx + unit * 0.8), int(unit * 4.2)), cloth, -1)  # gövde
+    cv2.line(image, (int(cx - unit * 0.8), int(unit * 1.7)), (int(cx - unit * 1.3), int(unit * 4.0)), skin, thickness)  # sol kol
+    cv2.line(image, (int(cx + unit * 0.8), int(unit * 1.7)), (int(cx + unit * 1.3), int(unit * 4.0)), skin, thickness)  # sağ kol
+    cv2.line(image, (int(cx - unit * 0.4), int(unit * 4.2)), (int(cx - unit * 0.5), int(unit * 7.5)), cloth, thickness)  # sol bacak
+    cv2.line(image, (int(cx + unit * 0.4), int(unit * 4.2)), (int(cx + unit * 0.5), int(unit * 7.5)), cloth, thickness)  # sağ bacak
+    return image
+
+
+def encode_png(image):
+    # Kayıpsız: JPEG sıkıştırması sentetik siluetin tespit edilmesini bozabiliyor
+    ok, buf = cv2.imencode(".png", image)
+    if not ok:
+        raise RuntimeError("Sentetik görüntü PNG olarak kodlanamadı.")
+    return buf.tobytes()
+
+
+def encode_jpeg(image, quality=90):
+    ok, buf = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise RuntimeError("Sentetik görüntü JPEG olarak kodlanamadı.")
+    return buf.tobytes()
+
+
+def latency_summary(samples_s, wall_time_s=None):
+    """Saniye cinsinden gecikme örneklerinden p50/p95/p99 (ms) ve istek/sn özetini üretir."""
+    if not samples_s:
+        return {"count": 0}
+    ms = np.asarray(samples_s, dtype=np.float64) * 1000.0
+    summary = {
+        "count": int(ms.size),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "max_ms": round(float(ms.max()), 3),
+    }
+    if wall_time_s:
+        summary["req_per_s"] = round(ms.size / wall_time_s, 2)
+    return summary
+
+
+def write_results(name, results, output=None):
+    """Sonuçları makine tarafından okunabilir JSON olarak yazar (dosyaya veya stdout'a)."""
+    payload = {
+        "benchmark": name,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+    text = json.dumps(payload, indent=2, ensure_ascii=False)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+    return payload
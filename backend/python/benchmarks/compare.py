@@ -0,0 +1,59 @@
+"""
+İki benchmark JSON çıktısını karşılaştırır ve gecikme/istek-sn farklarını yüzde olarak yazdırır.
+Regresyon eşiği aşılırsa sıfırdan farklı çıkış koduyla biter (CI için).
+
+Kullanım:
+    python -m benchmarks.compare onceki.json sonraki.json --threshold 10
+"""
+import argparse
+import json
+import sys
+
+COMPARED_KEYS = ("p50_ms", "p95_ms", "p99_ms", "req_per_s")
+
+
+def _flatten(node, prefix=""):
+    """İç içe sonuçları 'yol -> özet' sözlüğüne açar (özet: p50_ms içeren sözlük)."""
+    flat = {}
+    if isinstance(node, dict):
+        if "p50_ms" in node:
+            flat[prefix] = node
+        else:
+            for key, value in node.items():
+                flat.update(_flatten(value, f"{prefix}.{key}" if prefix else key))
+    return flat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Yüzde cinsinden izin verilen kötüleşme")
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = _flatten(json.load(f)["results"])
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = _flatten(json.load(f)["results"])
+
+    regressions = []
+    for path in sorted(baseline.keys() & candidate.keys()):
+        for key in COMPARED_KEYS:
+            before, after = baseline[path].get(key), candidate[path].get(key)
+            if not before or after is None:
+                continue
+            change = (after - before) / before * 100.0
+            # Gecikmede artış, istek/sn'de düşüş kötüleşmedir
+            worse = change if key != "req_per_s" else -change
+            marker = "  <-- regresyon" if worse > args.threshold else ""
+            print(f"{path:50s} {key:10s} {before:10.2f} -> {after:10.2f} ({change:+6.1f}%){marker}")
+            if marker:
+                regressions.append((path, key))
+
+    if regressions:
+        print(f"{len(regressions)} ölçümde %{args.threshold} üzeri kötüleşme var.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
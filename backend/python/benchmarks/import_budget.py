@@ -0,0 +1,111 @@
+"""
+Backend modüllerinin import süresini `python -X importtime` ile ölçer ve bütçeyi aşan veya
+ağır görüntü bağımlılıklarını (cv2, mediapipe) erken yükleyen modülleri raporlar.
+Bütçe aşılırsa sıfırdan farklı çıkış koduyla biter (CI'da başlangıç regresyonlarını yakalamak için).
+
+Her ölçüm ayrı ve temiz bir yorumlayıcıda yapılır; gürültüyü azaltmak için çalıştırmaların en iyisi alınır.
+
+Kullanım (backend/python dizininden):
+    python -m benchmarks.import_budget --runs 5 --budget main=1200 --output import_budget.json
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+from benchmarks.common import write_results
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modül -> (varsayılan bütçe ms, import edildiğinde yüklenmemesi gereken modüller)
+DEFAULT_CHECKS = {
+    "main": (1200.0, ("cv2", "mediapipe", "body_analysis", "video_analysis")),
+    "calculations": (25.0, ("numpy", "cv2", "mediapipe")),
+    "bulk_calculations": (250.0, ("cv2", "mediapipe")),
+}
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def measure(module):
+    """Modülü yeni bir yorumlayıcıda import eder; (toplam µs, {modül: (self µs, kümülatif µs)}) döndürür."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{module} import edilemedi:\n{proc.stderr[-2000:]}")
+    imports = {}
+    total_us = None
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = int(match[1]), int(match[2]), match[3], match[4]
+        imports[name] = (self_us, cumulative_us)
+        if name == module and len(indent) == 1:
+            total_us = cumulative_us
+    return total_us, imports
+
+
+def check_module(module, budget_ms, forbidden, runs, top):
+    best_total = None
+    best_imports = None
+    for _ in range(runs):
+        total_us, imports = measure(module)
+        if best_total is None or total_us < best_total:
+            best_total, best_imports = total_us, imports
+
+    total_ms = best_total / 1000.0
+    loaded_forbidden = sorted(name for name in forbidden if name in best_imports)
+    slowest = sorted(best_imports.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    return {
+        "total_ms": round(total_ms, 1),
+        "budget_ms": budget_ms,
+        "module_count": len(best_imports),
+        "forbidden_loaded": loaded_forbidden,
+        "slowest_self_ms": {name: round(self_us / 1000.0, 1) for name, (self_us, _) in slowest},
+        "ok": total_ms <= budget_ms and not loaded_forbidden,
+    }
+
+
+def _parse_budgets(values):
+    budgets = {}
+    for value in values or ():
+        module, _, ms = value.partition("=")
+        budgets[module] = float(ms)
+    return budgets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", default=",".join(DEFAULT_CHECKS), help="Virgülle ayrılmış modül listesi")
+    parser.add_argument("--budget", action="append", help="modül=ms biçiminde bütçe (tekrarlanabilir)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="Raporlanacak en yavaş modül sayısı")
+    parser.add_argument("--output", help="JSON çıktı dosyası")
+    args = parser.parse_args()
+
+    budgets = _parse_budgets(args.budget)
+    results = {}
+    for module in [m.strip() for m in args.modules.split(",") if m.strip()]:
+        default_budget, forbidden = DEFAULT_CHECKS.get(module, (float("inf"), ()))
+        results[module] = check_module(module, budgets.get(module, default_budget), forbidden, args.runs, args.top)
+
+    write_results("import_budget", results, args.output)
+
+    failures = [module for module, result in results.items() if not result["ok"]]
+    for module in failures:
+        result = results[module]
+        if result["forbidden_loaded"]:
+            print(f"HATA: {module} import edilirken ağır bağımlılıklar yüklendi: {', '.join(result['forbidden_loaded'])}", file=sys.stderr)
+        if result["total_ms"] > result["budget_ms"]:
+            print(f"HATA: {module} import süresi {result['total_ms']} ms, bütçe {result['budget_ms']} ms", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
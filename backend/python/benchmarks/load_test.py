@@ -0,0 +1,155 @@
+"""
+FastAPI uygulamasına (main.py) hedef eşzamanlılıkta yük bindirir ve uç nokta başına
+p50/p95/p99 gecikme ile istek/sn değerlerini JSON olarak raporlar.
+
+Çalışan bir sunucuya karşı:
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --concurrency 8 --requests 200
+
+Sunucuyu kendisi başlatıp kapatarak:
+    python -m benchmarks.load_test --spawn-server --scenarios analyze_image,calculate --output load.json
+"""
+import argparse
+import itertools
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.common import encode_png, latency_summary, synthetic_person_image, write_results
+
+# /calculate/* uç noktaları için örnek sorgular
+CALCULATE_REQUESTS = [
+    ("/calculate/bmi/", {"weight": 72.5, "height": 178}),
+    ("/calculate/bmr/", {"weight": 72.5, "height": 178, "age": 31, "gender": "male"}),
+    ("/calculate/daily_calories/", {"bmr": 1700, "activity_level": "moderate"}),
+    ("/calculate/body_fat_percentage/", {"bmi": 22.9, "age": 31, "gender": "female"}),
+    ("/calculate/ideal_weight/", {"height": 178, "gender": "male"}),
+]
+
+
+def _image_payloads(count):
+    """Sonuç önbelleğine takılmamak için birbirinden farklı sentetik görüntüler üretir."""
+    return [encode_png(synthetic_person_image(seed=seed)) for seed in range(max(count, 1))]
+
+
+def _make_analyze_image(base_url, payloads):
+    cycle = itertools.cycle(payloads)
+    lock = threading.Lock()
+
+    def call(session):
+        with lock:
+            payload = next(cycle)
+        return session.post(
+            f"{base_url}/analyze_image/",
+            data={"gender": "male"},
+            files={"file": ("synthetic.png", payload, "image/png")},
+            timeout=120,
+        )
+
+    return call
+
+
+def _make_calculate(base_url):
+    cycle = itertools.cycle(CALCULATE_REQUESTS)
+    lock = threading.Lock()
+
+    def call(session):
+        with lock:
+            path, params = next(cycle)
+        return session.get(f"{base_url}{path}", params=params, timeout=30)
+
+    return call
+
+
+def run_scenario(call, requests_count, concurrency):
+    local = threading.local()
+    samples = []
+    statuses = Counter()
+    samples_lock = threading.Lock()
+
+    def one(_):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            status = call(session).status_code
+        except requests.RequestException as e:
+            status = type(e).__name__
+        elapsed = time.perf_counter() - start
+        with samples_lock:
+            samples.append(elapsed)
+            statuses[str(status)] += 1
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        start = time.perf_counter()
+        list(executor.map(one, range(requests_count)))
+        wall = time.perf_counter() - start
+
+    summary = latency_summary(samples, wall)
+    summary["status_codes"] = dict(statuses)
+    return summary
+
+
+def _spawn_server(port):
+    env = dict(os.environ)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Sunucu başlatılamadı.")
+        try:
+            requests.get(f"{base_url}/calculate/bmi/", params={"weight": 70, "height": 170}, timeout=1)
+            return process, base_url
+        except requests.RequestException:
+            time.sleep(0.25)
+    process.terminate()
+    raise RuntimeError("Sunucu 60 saniye içinde hazır olmadı.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--spawn-server", action="store_true", help="uvicorn sunucusunu bu betik başlatsın")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--scenarios", default="analyze_image,calculate")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=100, help="Senaryo başına istek sayısı")
+    parser.add_argument("--distinct-images", type=int, default=32, help="Döngüsel kullanılacak farklı görüntü sayısı")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url.rstrip("/")
+    if args.spawn_server:
+        server, base_url = _spawn_server(args.port)
+
+    results = {"config": vars(args), "scenarios": {}}
+    try:
+        for scenario in args.scenarios.split(","):
+            if scenario == "analyze_image":
+                call = _make_analyze_image(base_url, _image_payloads(args.distinct_images))
+            elif scenario == "calculate":
+                call = _make_calculate(base_url)
+            else:
+                raise SystemExit(f"Bilinmeyen senaryo: {scenario}")
+            results["scenarios"][scenario] = run_scenario(call, args.requests, args.concurrency)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+    write_results("load_test", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,78 +2,25 @@ import cv2
 import mediapipe as mp
 import numpy as np
 # import sys # sys.exit kaldırıldığı için buna gerek kalmayabilir
-import json # Hata mesajları için belki hala kullanılabilir ama ana çıktı json.dumps ile olmayacak
 import os
+from contextlib import contextmanager
+from typing import Optional, Union
+
+# Hesaplama fonksiyonları hafif `calculations` modülünde; eski importlar bozulmasın diye buradan da erişilebilir
+from calculations import (  # noqa: F401
+    BodyAnalysisError,
+    calculate_bmi,
+    calculate_bmr,
+    calculate_body_fat_percentage,
+    calculate_daily_calories,
+    calculate_ideal_weight,
+)
+from image_io import PreparedImage, decode_for_inference
+from metrics import stage_timer
+from person_detection import detect_person_regions
+from pose_pool import PosePoolError
 
 mp_pose = mp.solutions.pose
-mp_drawing = mp.solutions.drawing_utils
-
-class BodyAnalysisError(Exception):
-    """Vücut analizi sırasında özel hata sınıfı"""
-    pass
-
-def calculate_bmi(weight, height):
-    if height <= 0:
-        raise BodyAnalysisError("Boy değeri pozitif olmalıdır.")
-    height_m = height / 100
-    return round(weight / (height_m ** 2), 2)
-
-def calculate_bmr(weight, height, age, gender):
-    if gender.lower() not in ['male', 'female']:
-        raise BodyAnalysisError("Geçersiz cinsiyet değeri. 'male' veya 'female' olmalıdır.")
-    if gender.lower() == 'male':
-        bmr = 10 * weight + 6.25 * height - 5 * age + 5
-    else:
-        bmr = 10 * weight + 6.25 * height - 5 * age - 161
-    return round(bmr)
-
-def calculate_daily_calories(bmr, activity_level):
-    activity_multipliers = {
-        'sedentary': 1.2,
-        'light': 1.375,
-        'moderate': 1.55,
-        'very': 1.725,
-        'extra': 1.9
-    }
-    if activity_level.lower() not in activity_multipliers:
-        raise BodyAnalysisError("Geçersiz aktivite seviyesi.")
-    return round(bmr * activity_multipliers[activity_level.lower()])
-
-def calculate_body_fat_percentage(bmi, age, gender):
-    if gender.lower() not in ['male', 'female']:
-        raise BodyAnalysisError("Geçersiz cinsiyet değeri. 'male' veya 'female' olmalıdır.")
-    if gender.lower() == 'male':
-        body_fat = (1.20 * bmi) + (0.23 * age) - 16.2
-    else:
-        body_fat = (1.20 * bmi) + (0.23 * age) - 5.4
-    return round(body_fat, 2)
-
-def calculate_ideal_weight(height, gender):
-    if gender.lower() not in ['male', 'female']:
-        raise BodyAnalysisError("Geçersiz cinsiyet değeri. 'male' veya 'female' olmalıdır.")
-    # Devine Formula
-    height_inches = height / 2.54
-    if height_inches < 60: # Formül 60 inç (5 feet) altı için tasarlanmamış olabilir
-        # raise BodyAnalysisError("Boy ideal kilo hesaplaması için çok kısa.")
-        # Alternatif olarak, daha düşük boylar için bir taban değer döndürebilir veya farklı bir formül kullanabiliriz.
-        # Şimdilik Devine formülünü olduğu gibi uygulayalım, ancak bu bir sınırlama olabilir.
-        pass
-
-    if gender.lower() == 'male':
-        ideal_weight_lb = 50 + 2.3 * (height_inches - 60)
-    else:
-        ideal_weight_lb = 45.5 + 2.3 * (height_inches - 60)
-    
-    if ideal_weight_lb < 0: # Negatif ağırlık mantıksız
-        # Bu durum genellikle çok kısa boylar için (formülün sınırları dışında) oluşur.
-        # raise BodyAnalysisError("Hesaplanan ideal kilo negatif. Boy değeri formül için uygun olmayabilir.")
-        # Makul bir minimum döndürebiliriz ya da hatayı olduğu gibi bırakabiliriz.
-        # Şimdilik 0 döndürelim veya küçük bir pozitif değer. Ya da hatayı olduğu gibi bırakalım.
-        # Pratik bir uygulama için bu durumun nasıl ele alınacağına karar vermek gerekir.
-        # Şimdilik, formülün doğrudan sonucunu döndürelim, negatif çıksa bile.
-        pass
-
-    return round(ideal_weight_lb * 0.45359237, 2)  # Convert to kg
 
 def _calculate_internal_body_fat_from_measurements(hip_width, shoulder_width, height_px, gender="male"):
     # Bu fonksiyon, doğrudan çağrılmak yerine calculate_body_ratios içinden kullanılacak
@@ -125,125 +72,554 @@ def _calculate_internal_body_fat_from_measurements(hip_width, shoulder_width, he
         return -1, (hip_width / shoulder_width if shoulder_width > 0 else 0) # body_fat için -1, whr için hesaplanabildiği kadar
 
 def calculate_body_ratios(landmarks, image_shape, gender="male"):
+    """
+    Tek bir pozun vücut oranlarını hesaplar.
+
+    - **landmarks**: MediaPipe landmark listesi ya da `pose_landmarks_to_array` ile üretilmiş
+      (33, 4) [x, y, z, visibility] dizisi (normalize koordinatlar).
+    - **image_shape**: Orijinal görüntünün (h, w[, c]) boyutu; piksel çıktıları bu ölçektedir.
+
+    Noktalar görüntü sınırlarına kırpılıp tam piksele indirilir; boy, görünür (visibility > 0.5)
+    noktaların en üst ve en alt y değerleri arasındaki farktır. Hesaplar tüm noktalar üzerinde
+    dizi işlemleriyle yapılır (toplu sürümle aynı `_pixel_coords` kuralı); landmark başına
+    Python nesnesi oluşturulmaz.
+    """
     try:
-        h, w, _ = image_shape
-        def get_point(landmark):
-            # Görüntü boyutları içinde kalmasını sağla
-            x = min(max(landmark.x * w, 0), w -1)
-            y = min(max(landmark.y * h, 0), h -1)
-            return int(x), int(y)
-
-        # Gerekli noktaları al
-        left_hip = get_point(landmarks[mp_pose.PoseLandmark.LEFT_HIP.value])
-        right_hip = get_point(landmarks[mp_pose.PoseLandmark.RIGHT_HIP.value])
-        left_shoulder = get_point(landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value])
-        right_shoulder = get_point(landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value])
-        
-        # Ayak bilekleri yerine, boy için daha stabil olabilecek üst ve alt vücut noktaları kullanılabilir.
-        # Örneğin, başın üstü (eğer tespit edilebiliyorsa) veya omuzlar ve kalçalar arası dikey mesafe.
-        # Mevcut implementasyonda ayak bilekleri kullanılıyor, bu da pozun doğruluğuna çok bağlı.
-        # Eğer ayak bilekleri resimde yoksa veya yanlış tespit edilirse height_px hatalı olur.
-        # Bu fonksiyonun çağrıldığı yerde landmarkların varlığı kontrol edilmeli.
-
-        left_ankle = get_point(landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value])
-        # right_ankle = get_point(landmarks[mp_pose.PoseLandmark.RIGHT_ANKLE.value]) # Sadece sol kullanılıyor gibi
-
-        # Mesafeleri hesapla
-        hip_width = np.linalg.norm(np.array(left_hip) - np.array(right_hip))
-        shoulder_width = np.linalg.norm(np.array(left_shoulder) - np.array(right_shoulder))
-        
-        # Boy (piksel cinsinden) - Omuz ve ayak bileği arasındaki dikey mesafeyi kullanmak yerine,
-        # tüm vücut iskeletinin dikey izdüşümünü kullanmak daha doğru olabilir.
-        # Ancak mevcut kod sol omuz ve sol ayak bileği arasını kullanıyor.
-        # Bu, kişinin kameraya tam dik durmadığı durumlarda hatalı olabilir.
-        # height_px = np.linalg.norm(np.array(left_ankle) - np.array(left_shoulder)) # Bu 3D mesafe, 2D değil
-        
-        # Daha doğru bir 2D yükseklik için:
-        # En üst nokta (örneğin burun veya gözlerin ortası) ile en alt nokta (ayak bilekleri)
-        # arasındaki y farkını kullanmak daha iyi olabilir.
-        # Şimdilik orijinal mantığı koruyalım ama bunun bir geliştirme alanı olduğunu belirtelim.
-        # Orijinal kodda height_px, sol omuz ve sol ayak bileği arasındaki Öklid mesafesi.
-        # Bu, vücudun eğik durması durumunda gerçek dikey boyu temsil etmeyebilir.
-        
-        # Yükseklik için daha stabil bir yaklaşım:
-        all_ys = [get_point(lm)[1] for lm_idx, lm in enumerate(landmarks) if lm.visibility > 0.5] # Sadece görünür noktalar
-        if not all_ys:
-             raise BodyAnalysisError("Yükseklik hesaplamak için görünür nokta bulunamadı.")
-        min_y = min(all_ys)
-        max_y = max(all_ys)
-        height_px = max_y - min_y
-
+        array = landmarks if isinstance(landmarks, np.ndarray) else pose_landmarks_to_array(landmarks)
+        if array.shape != (33, 4):
+            raise BodyAnalysisError("Vücut oranları hesaplanırken gerekli tüm vücut noktaları tespit edilemedi.", reason="missing_landmarks")
+
+        h, w = image_shape[:2]
+        xs, ys = _pixel_coords(array, h, w)
+        # np.float64 olarak bırakılır: round() NumPy yuvarlamasını kullanır (toplu sürümle aynı sonuç)
+        hip_width = np.hypot(xs[_LEFT_HIP] - xs[_RIGHT_HIP], ys[_LEFT_HIP] - ys[_RIGHT_HIP])
+        shoulder_width = np.hypot(xs[_LEFT_SHOULDER] - xs[_RIGHT_SHOULDER], ys[_LEFT_SHOULDER] - ys[_RIGHT_SHOULDER])
+
+        visible_ys = ys[array[:, 3] > _VISIBILITY_THRESHOLD]
+        if visible_ys.size == 0:
+            raise BodyAnalysisError("Yükseklik hesaplamak için görünür nokta bulunamadı.", reason="no_visible_landmarks")
+        height_px = int(visible_ys.max() - visible_ys.min())
         if height_px <= 0:
-            raise BodyAnalysisError("Hesaplanan piksel boyu geçersiz.")
-
+            raise BodyAnalysisError("Hesaplanan piksel boyu geçersiz.", reason="invalid_pixel_height")
 
-        # Vücut yağ oranını hesapla
         body_fat, whr = _calculate_internal_body_fat_from_measurements(hip_width, shoulder_width, height_px, gender)
-
+        body_fat = float(body_fat)
+        whr = float(whr)
         return {
             "Vücut Yağ Oranı (%)": body_fat if body_fat != -1 else "Hesaplanamadı",
-            "Bel-Kalça Oranı (WHR)": whr, # WHR için kalça ve bel ölçümü lazım, burada omuz ve kalça kullanılıyor. WHR değil SHR olmalı.
-                                        # Bel (waist) çevresi ve kalça (hip) çevresi gerekir. Mevcut implementasyon
-                                        # hip_width (kalça genişliği) ve shoulder_width (omuz genişliği) kullanıyor.
-                                        # Bu aslında Bel-Omuz oranı (Waist-Shoulder Ratio) veya Kalça-Omuz Oranı (Hip-Shoulder Ratio) gibi bir şeydir.
-                                        # Standart WHR için farklı landmarklar (örn. NAVEL) gerekir.
-                                        # Şimdilik isimlendirmeyi "Kalça/Omuz Genişlik Oranı" olarak değiştirebiliriz.
-            "Kalça/Omuz Genişlik Oranı": whr, # Daha doğru bir isimlendirme
-            "Omuz Genişliği (px)": round(shoulder_width, 2),
-            "Kalça Genişliği (px)": round(hip_width, 2),
-            "Boy Uzunluğu (px)": round(height_px, 2),
+            # Gerçek WHR için bel çevresi gerekir; burada kalça/omuz genişlik oranı hesaplanıyor.
+            # Anahtar istemci uyumluluğu için korunuyor, doğru isim "Kalça/Omuz Genişlik Oranı".
+            "Bel-Kalça Oranı (WHR)": whr,
+            "Kalça/Omuz Genişlik Oranı": whr,
+            "Omuz Genişliği (px)": float(round(shoulder_width, 2)),
+            "Kalça Genişliği (px)": float(round(hip_width, 2)),
+            "Boy Uzunluğu (px)": height_px,
         }
-    except IndexError:
-        # Bu genellikle landmarks listesinde beklenen PoseLandmark'ın bulunmaması durumunda olur.
-        # Örneğin, bazı vücut kısımları algılanamamışsa.
-        raise BodyAnalysisError("Vücut oranları hesaplanırken gerekli tüm vücut noktaları tespit edilemedi.")
+    except BodyAnalysisError:
+        raise
     except Exception as e:
-        raise BodyAnalysisError(f"Vücut oranları hesaplanırken genel hata: {str(e)}")
-
-
-def analyze_body(image_path: str, gender: str = "male"):
-    try:
-        if not os.path.exists(image_path):
-            raise BodyAnalysisError(f"Görüntü dosyası bulunamadı: {image_path}")
+        raise BodyAnalysisError(f"Vücut oranları hesaplanırken genel hata: {str(e)}", reason="ratio_error")
+
+
+# Toplu (vektörel) hesaplamalarda kullanılan landmark indeksleri
+_LEFT_HIP = mp_pose.PoseLandmark.LEFT_HIP.value
+_RIGHT_HIP = mp_pose.PoseLandmark.RIGHT_HIP.value
+_LEFT_SHOULDER = mp_pose.PoseLandmark.LEFT_SHOULDER.value
+_RIGHT_SHOULDER = mp_pose.PoseLandmark.RIGHT_SHOULDER.value
+_VISIBILITY_THRESHOLD = 0.5
+
+# Kademeli çıkarımda sonucun kabulüne bakılan noktalar: genişlikler için omuzlar ve kalçalar,
+# boy için ayak bilekleri. Bu noktaların en düşük görünürlüğü eşiği geçerse sonuç kabul edilir,
+# geçmezse bir sonraki (daha ağır) model_complexity kademesi denenir.
+_TIER_REQUIRED_LANDMARKS = np.array([
+    _LEFT_SHOULDER, _RIGHT_SHOULDER, _LEFT_HIP, _RIGHT_HIP,
+    mp_pose.PoseLandmark.LEFT_ANKLE.value, mp_pose.PoseLandmark.RIGHT_ANKLE.value,
+])
+POSE_TIER_MIN_VISIBILITY = float(os.getenv("POSE_TIER_MIN_VISIBILITY", "0.6"))
+# Düz görüntü filtresi: ~64 piksellik gri örneklemenin standart sapması bunun altındaysa (siyah/beyaz
+# kare, kapalı objektif, tek renkli ekran görüntüsü) Pose hiç çalıştırılmadan reddedilir. 0 kapatır.
+# Bu bir kişi tespiti değildir: dokulu ama kişisiz sahneler filtreden geçer ve Pose'a gider.
+FLAT_IMAGE_MIN_STD = float(os.getenv("FLAT_IMAGE_MIN_STD", "4"))
+_PRECHECK_EDGE = 64
+
+
+# NormalizedLandmarkList ikili formatı: her landmark için [0x0a][uzunluk] ve ardından her alan
+# [etiket baytı][little-endian float32] (x=0x0d, y=0x15, z=0x1d, visibility=0x25, presence=0x2d).
+# Tüm alanlar dolu olduğunda kayıtlar sabit uzunluktadır ve tek bir np.frombuffer ile okunabilir.
+def _landmark_wire_layout(field_count):
+    """Alan sayısına göre (kayıt uzunluğu, etiket bayt konumları, beklenen baytlar, x/y/z/visibility bayt konumları)."""
+    tag_offsets = np.array([0, 1] + [2 + 5 * i for i in range(field_count)])
+    expected = np.array([0x0A, field_count * 5] + [0x0D, 0x15, 0x1D, 0x25, 0x2D][:field_count], dtype=np.uint8)
+    value_offsets = np.array([3 + 5 * i + b for i in range(4) for b in range(4)])
+    return 2 + field_count * 5, tag_offsets, expected, value_offsets
+
+
+def _landmark_descriptor_matches():
+    """
+    Kurulu mediapipe'ın NormalizedLandmarkList tanımı yukarıdaki yerleşimle uyumlu mu? Alan
+    numaraları veya tipleri değişmişse (başka bir mediapipe sürümü) hızlı yol kapatılır ve
+    landmarklar alan alan okunur.
+    """
+    from google.protobuf.descriptor import FieldDescriptor
+    from mediapipe.framework.formats import landmark_pb2
+
+    landmark_field = landmark_pb2.NormalizedLandmarkList.DESCRIPTOR.fields_by_name.get("landmark")
+    if landmark_field is None or landmark_field.number != 1 or landmark_field.message_type is None:
+        return False
+    fields = landmark_field.message_type.fields_by_name
+    expected = {"x": 1, "y": 2, "z": 3, "visibility": 4, "presence": 5}
+    return all(
+        name in fields and fields[name].number == number and fields[name].type == FieldDescriptor.TYPE_FLOAT
+        for name, number in expected.items()
+    )
+
+
+_LANDMARK_WIRE_LAYOUTS = {field_count * 5: _landmark_wire_layout(field_count) for field_count in (4, 5)}
+_LITTLE_ENDIAN_F32 = np.dtype("<f4")
+try:
+    _LANDMARK_WIRE_ENABLED = _landmark_descriptor_matches()
+except Exception:  # Tanım okunamıyorsa (farklı paket yapısı) güvenli yol kullanılır
+    _LANDMARK_WIRE_ENABLED = False
+
+
+def _landmark_list_from_wire(message):
+    """Landmark listesini serileştirilmiş protobuf'tan okur; format beklenenden farklıysa None."""
+    if not _LANDMARK_WIRE_ENABLED:
+        return None
+    data = message.SerializeToString()
+    layout = _LANDMARK_WIRE_LAYOUTS.get(data[1]) if len(data) >= 2 and data[0] == 0x0A else None
+    if layout is None or len(data) % layout[0] != 0:
+        return None
+    record_size, tag_offsets, expected, value_offsets = layout
+    raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, record_size)
+    # Tüm kayıtların başlık ve alan etiketleri tek bir karşılaştırmayla doğrulanır
+    if not (raw[:, tag_offsets] == expected).all():
+        return None
+    return np.ascontiguousarray(raw[:, value_offsets]).view(_LITTLE_ENDIAN_F32).astype(np.float32, copy=False)
+
+
+def pose_landmarks_to_array(landmarks):
+    """
+    MediaPipe landmarklarını tek seferde bitişik (33, 4) float32 [x, y, z, visibility] dizisine
+    çevirir. Protobuf alanları zaten float32 olduğu için dönüşüm kayıpsızdır.
+
+    `results.pose_landmarks` (NormalizedLandmarkList) verilirse mesaj ikili formatından
+    landmark başına Python nesnesi oluşturmadan okunur; landmark listesi veya x/y/z/visibility
+    nitelikli nesneler için alan alan okumaya düşülür. Dizi önbelleğe alınabilir veya toplu
+    hesaplara verilebilir.
+    """
+    if hasattr(landmarks, "SerializeToString"):
+        array = _landmark_list_from_wire(landmarks)
+        if array is not None:
+            return array
+        landmarks = landmarks.landmark
+    return np.array([(lm.x, lm.y, lm.z, lm.visibility) for lm in landmarks], dtype=np.float32)
+
+
+def _pixel_coords(landmarks, h, w):
+    """
+    Normalize x/y koordinatlarını görüntü sınırlarına kırpılmış tam piksel değerlerine çevirir.
+    (33, 4) dizi ve skaler h/w ya da (N, 33, 4) dizi ve (N, 1) h/w sütunları ile çalışır.
+    """
+    # float32 landmarklar float64'e yükseltilir; piksel değerleri eski get_point ile birebir aynı kalır
+    xs = np.floor(np.clip(landmarks[..., 0].astype(np.float64) * w, 0, w - 1))
+    ys = np.floor(np.clip(landmarks[..., 1].astype(np.float64) * h, 0, h - 1))
+    return xs, ys
+
+
+def _body_measurements_batch(landmarks, image_shapes, genders):
+    """
+    (N, 33, 4) landmark dizisi için genişlik, boy ve yağ oranlarını tek geçişte hesaplar.
+    Hesaplamalar `calculate_body_ratios` ile aynı kuralları izler (piksele yuvarlama,
+    görünürlük eşiği, hata durumunda -1 yağ oranı).
+    """
+    n = landmarks.shape[0]
+    shapes = np.asarray(image_shapes, dtype=np.float64)
+    if shapes.ndim == 1:
+        shapes = np.broadcast_to(shapes, (n, shapes.shape[0]))
+    h = shapes[:, 0:1]
+    w = shapes[:, 1:2]
+
+    xs, ys = _pixel_coords(landmarks, h, w)
+
+    hip_width = np.hypot(xs[:, _LEFT_HIP] - xs[:, _RIGHT_HIP], ys[:, _LEFT_HIP] - ys[:, _RIGHT_HIP])
+    shoulder_width = np.hypot(xs[:, _LEFT_SHOULDER] - xs[:, _RIGHT_SHOULDER], ys[:, _LEFT_SHOULDER] - ys[:, _RIGHT_SHOULDER])
+
+    visible = landmarks[:, :, 3] > _VISIBILITY_THRESHOLD
+    has_visible = visible.any(axis=1)
+    max_y = np.where(visible, ys, -np.inf).max(axis=1)
+    min_y = np.where(visible, ys, np.inf).min(axis=1)
+    height_px = np.where(has_visible, max_y - min_y, 0.0)
+
+    if isinstance(genders, str):
+        is_male = np.full(n, genders.lower() == "male")
+    else:
+        is_male = np.array([g.lower() == "male" for g in genders], dtype=bool)
+
+    valid = (shoulder_width > 0) & (hip_width > 0) & (height_px > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        whr = np.where(shoulder_width > 0, hip_width / shoulder_width, 0.0)
+        log_height = np.log10(height_px)
+        male_den = 1.0324 - 0.19077 * np.log10(hip_width) + 0.15456 * log_height
+        female_den = 1.29579 - 0.35004 * np.log10(hip_width + shoulder_width) + 0.22100 * log_height
+        denominator = np.where(is_male, male_den, female_den)
+        body_fat = 495 / denominator - 450
+    body_fat = np.where(valid & (denominator != 0), np.round(body_fat, 2), -1.0)
+    whr = np.where(valid, np.round(whr, 2), 0.0)
+
+    return {
+        "hip_width": hip_width,
+        "shoulder_width": shoulder_width,
+        "height_px": height_px,
+        "has_visible": has_visible,
+        "body_fat": body_fat,
+        "whr": whr,
+    }
 
-        image = cv2.imread(image_path)
-        if image is None:
-            raise BodyAnalysisError(f"Görüntü yüklenemedi veya bozuk: {image_path}")
 
+def calculate_body_ratios_batch(landmarks, image_shapes, gender="male"):
+    """
+    `calculate_body_ratios` fonksiyonunun vektörel karşılığı.
+
+    - **landmarks**: (N, 33, 4) boyutlu [x, y, z, visibility] dizisi (normalize koordinatlar).
+    - **image_shapes**: Tüm görüntüler için tek bir (h, w[, c]) ya da (N, 2|3) dizi.
+    - **gender**: Tek cinsiyet değeri veya satır başına cinsiyet listesi.
+
+    Her satır için `calculate_body_ratios` ile aynı anahtarlara sahip bir sözlük döndürür;
+    hesaplanamayan satırlar {"error": "..."} olarak işaretlenir, toplu işlem durmaz.
+    """
+    landmarks = np.asarray(landmarks, dtype=np.float64)
+    if landmarks.ndim != 3 or landmarks.shape[1:] != (33, 4):
+        raise BodyAnalysisError("Landmark dizisi (N, 33, 4) boyutunda olmalıdır.", reason="invalid_landmarks")
+
+    m = _body_measurements_batch(landmarks, image_shapes, gender)
+    results = []
+    for i in range(landmarks.shape[0]):
+        if not m["has_visible"][i]:
+            results.append({"error": "Yükseklik hesaplamak için görünür nokta bulunamadı."})
+            continue
+        if m["height_px"][i] <= 0:
+            results.append({"error": "Hesaplanan piksel boyu geçersiz."})
+            continue
+        body_fat = float(m["body_fat"][i])
+        whr = float(m["whr"][i])
+        results.append({
+            "Vücut Yağ Oranı (%)": body_fat if body_fat != -1 else "Hesaplanamadı",
+            "Bel-Kalça Oranı (WHR)": whr,
+            "Kalça/Omuz Genişlik Oranı": whr,
+            "Omuz Genişliği (px)": round(float(m["shoulder_width"][i]), 2),
+            "Kalça Genişliği (px)": round(float(m["hip_width"][i]), 2),
+            "Boy Uzunluğu (px)": int(m["height_px"][i]),
+        })
+    return results
+
+
+def _is_flat_image(image):
+    """
+    Görüntü neredeyse tek renkli mi? Küçük örneklem üzerinde, milisaniyenin altında çalışır.
+    Sadece içeriksiz kareleri eler; görüntüde kişi olup olmadığına karar vermez.
+    """
+    if FLAT_IMAGE_MIN_STD <= 0:
+        return False
+    # Yeniden örnekleme yerine adımlı görünüm: kopyasız, tam görüntüyü dolaşmaz
+    step = max(max(image.shape[:2]) // _PRECHECK_EDGE, 1)
+    sample = np.ascontiguousarray(image[::step, ::step])
+    gray = cv2.cvtColor(sample, cv2.COLOR_BGR2GRAY) if sample.ndim == 3 else sample
+    return float(gray.std()) < FLAT_IMAGE_MIN_STD
+
+
+def _pose_landmarks(image_rgb, pose_pool=None, timings=None):
+    """Tek Pose çalıştırması; (33, 4) landmark dizisi ya da kişi bulunamazsa None döndürür."""
+    # Tahminleyici sadece çıkarım süresince tutulur; oran hesapları havuzu meşgul etmez
+    with _pose_estimator(pose_pool) as pose:
+        with stage_timer(timings, "pose_inference"):
+            results = pose.process(image_rgb)
+    # Protobuf listesi bir kez (33, 4) diziye çevrilir
+    return pose_landmarks_to_array(results.pose_landmarks) if results.pose_landmarks else None
+
+
+def _tiered_pose_landmarks(image_rgb, pose_tiers, pose_pool=None, timings=None):
+    """
+    Pose'u `pose_tiers` (pose_pool.TieredPosePool) kademeleriyle ucuzdan ağıra doğru çalıştırır ve
+    (33, 4) landmark dizisi ya da None döndürür. Gerekli noktaların (`_TIER_REQUIRED_LANDMARKS`) en
+    düşük görünürlüğü POSE_TIER_MIN_VISIBILITY eşiğini geçen ilk sonuç kabul edilir; hiçbir kademe
+    geçemezse en görünür sonuç kullanılır. Kişi tespit modeli tüm kademelerde aynı olduğundan ilk
+    çalışan kademe kişi bulamazsa ağır kademeler denenmez. Hiçbir kademe kullanılamıyorsa
+    `pose_pool` ile tek çalıştırmaya düşülür.
+    """
+    best, best_visibility = None, -1.0
+    insufficient = None
+    for complexity in pose_tiers.complexities:
+        pool = pose_tiers.pool(complexity)
+        if pool is None:
+            continue
+        if insufficient is not None:
+            pose_tiers.record(insufficient, "escalated")
+            insufficient = None
+        with pool.checkout() as pose:
+            with stage_timer(timings, "pose_inference"), stage_timer(timings, f"pose_tier{complexity}"):
+                results = pose.process(image_rgb)
+        if not results.pose_landmarks:
+            pose_tiers.record(complexity, "no_pose")
+            return best
+        landmarks = pose_landmarks_to_array(results.pose_landmarks)
+        visibility = float(landmarks[_TIER_REQUIRED_LANDMARKS, 3].min())
+        if visibility >= POSE_TIER_MIN_VISIBILITY:
+            pose_tiers.record(complexity, "accepted")
+            return landmarks
+        if visibility > best_visibility:
+            best, best_visibility = landmarks, visibility
+        insufficient = complexity
+    if insufficient is None:
+        return _pose_landmarks(image_rgb, pose_pool, timings)
+    pose_tiers.record(insufficient, "low_visibility")
+    return best
+
+
+@contextmanager
+def _pose_estimator(pose_pool=None):
+    """Havuz verilmişse oradan sıcak bir tahminleyici ödünç alır, yoksa tek kullanımlık oluşturur."""
+    if pose_pool is not None:
+        with pose_pool.checkout() as pose:
+            yield pose
+    else:
         with mp_pose.Pose(
             static_image_mode=True,
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5
         ) as pose:
-            image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            results = pose.process(image_rgb)
+            yield pose
+
+
+def analyze_body_bytes(buf: Union[bytes, bytearray, memoryview], gender: str = "male", pose_pool=None, cache=None,
+                       max_long_edge: Optional[int] = None, roi=None, timings=None, pose_tiers=None):
+    """
+    Yüklenen görüntüyü diske yazmadan doğrudan bellekteki tampondan analiz eder.
+    `np.frombuffer` tamponu kopyalamadan görür, `cv2.imdecode` doğrudan ondan çözümler.
+    `cache` (ResultCache) verilirse aynı bayt içeriği ve cinsiyet için önceki sonuç döndürülür.
 
-            if not results.pose_landmarks:
-                raise BodyAnalysisError("Görüntüde vücut noktaları tespit edilemedi.")
-            
-            # Landmarkların sayısını kontrol etme, bazıları eksik olabilir.
-            # calculate_body_ratios içinde IndexError ile bu durum ele alınmaya çalışıldı.
-            # Alternatif olarak, burada gerekli tüm landmarkların varlığını (visibility > threshold) kontrol edebiliriz.
-            # Örneğin:
-            # required_landmarks = [
-            #     mp_pose.PoseLandmark.LEFT_HIP, mp_pose.PoseLandmark.RIGHT_HIP,
-            #     mp_pose.PoseLandmark.LEFT_SHOULDER, mp_pose.PoseLandmark.RIGHT_SHOULDER,
-            #     mp_pose.PoseLandmark.LEFT_ANKLE
-            # ]
-            # for lm_enum in required_landmarks:
-            #     if results.pose_landmarks.landmark[lm_enum.value].visibility < 0.5: # Visibility eşiği
-            #         raise BodyAnalysisError(f"{lm_enum.name} noktası yeterince görünür değil veya tespit edilemedi.")
-
-
-            body_ratios = calculate_body_ratios(results.pose_landmarks.landmark, image.shape, gender)
-            return body_ratios
-
-    except BodyAnalysisError: # Kendi tanımladığımız hataları tekrar fırlat
+    Görüntü çıkarımdan önce azaltılmış boyutta çözülür (uzun kenar `max_long_edge`,
+    varsayılan MAX_INFERENCE_EDGE); `roi` (orijinal piksel koordinatlarında x, y, w, h)
+    verilirse sadece o bölge analiz edilir. Piksel çıktıları her durumda orijinal
+    görüntü ölçeğindedir. `timings` (metrics.StageTimings) verilirse aşama süreleri kaydedilir.
+
+    Tek renkli (düz) görüntüler Pose çalıştırılmadan reddedilir. `pose_tiers` (TieredPosePool)
+    verilirse çıkarım kademeli yapılır (bkz. `_tiered_pose_landmarks`), yoksa `pose_pool` kullanılır.
+    """
+    try:
+        if buf is None or len(buf) == 0:
+            raise BodyAnalysisError("Görüntü verisi boş.", reason="empty_image")
+
+        cache_key = None
+        if cache is not None and roi is None:
+            cache_key = cache.make_key(buf, gender)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        with stage_timer(timings, "decode"):
+            prepared = decode_for_inference(buf, max_long_edge=max_long_edge, roi=roi)
+        if prepared is None:
+            raise BodyAnalysisError("Görüntü çözümlenemedi veya bozuk.", reason="decode_failed")
+
+        with stage_timer(timings, "precheck"):
+            flat = _is_flat_image(prepared.image)
+        if flat:
+            raise BodyAnalysisError("Görüntü tek renkli veya içeriksiz, analiz edilecek kişi yok.", reason="flat_image")
+
+        with stage_timer(timings, "color_convert"):
+            image_rgb = cv2.cvtColor(prepared.image, cv2.COLOR_BGR2RGB)
+        if pose_tiers is not None:
+            landmarks = _tiered_pose_landmarks(image_rgb, pose_tiers, pose_pool, timings)
+        else:
+            landmarks = _pose_landmarks(image_rgb, pose_pool, timings)
+
+        if landmarks is None:
+            raise BodyAnalysisError("Görüntüde vücut noktaları tespit edilemedi.", reason="no_pose_detected")
+
+        # Kırpma varsa dizi orijinal görüntüye taşınır, pikseller orijinal boyuttan hesaplanır.
+        # calculate_body_ratios (33, 4) dışındaki dizileri missing_landmarks ile reddeder.
+        with stage_timer(timings, "ratios"):
+            landmarks = prepared.remap_landmark_array(landmarks)
+            body_ratios = calculate_body_ratios(landmarks, prepared.original_shape, gender)
+        if cache_key is not None:
+            cache.put(cache_key, body_ratios)
+        return body_ratios
+
+    except (BodyAnalysisError, PosePoolError): # Kendi tanımladığımız hataları tekrar fırlat
         raise
     except Exception as e: # Beklenmedik diğer hatalar için genel bir hata
         # Burada orijinal hatayı loglamak iyi bir pratik olabilir.
         # logger.error(f"Analiz sırasında beklenmedik hata: {e}", exc_info=True)
-        raise BodyAnalysisError(f"Analiz sırasında beklenmedik bir sunucu hatası oluştu.")
+        raise BodyAnalysisError(f"Analiz sırasında beklenmedik bir sunucu hatası oluştu.", reason="unexpected_error")
+
+
+MULTI_PERSON_MAX_PEOPLE = int(os.getenv("MULTI_PERSON_MAX_PEOPLE", "8"))
+# Çok kişili görüntüde her kişi karenin sadece bir kısmını kapladığından görüntü tek kişilik
+# analizden daha büyük çözülür; kırpıntılar Pose'a makul çözünürlükte ulaşır
+MULTI_PERSON_MAX_EDGE = int(os.getenv("MULTI_PERSON_MAX_EDGE", "2560"))
+# İki kırpıntıdan çıkan iskeletlerin kutuları bu oranda çakışıyorsa aynı kişi sayılır
+_DUPLICATE_IOU = 0.5
+
+
+def _expand_region(region, width, height, factor=0.25):
+    """Bölgeyi her yönde `factor` oranında genişletir (görüntü sınırlarına kırpılmış x, y, w, h)."""
+    x, y, w, h = region[:4]
+    x0, y0 = max(0, int(x - w * factor)), max(0, int(y - h * factor))
+    x1, y1 = min(width, int(x + w * (1 + factor))), min(height, int(y + h * (1 + factor)))
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def _landmark_box(landmarks, shape):
+    xs, ys = _pixel_coords(landmarks, shape[0], shape[1])
+    visible = landmarks[:, 3] > _VISIBILITY_THRESHOLD
+    if visible.any():
+        xs, ys = xs[visible], ys[visible]
+    return xs.min(), ys.min(), xs.max(), ys.max()
+
+
+def _box_iou(a, b):
+    ix = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    iy = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def prepare_people_crops(buf: Union[bytes, bytearray, memoryview], max_people: Optional[int] = None,
+                         max_long_edge: Optional[int] = None, timings=None):
+    """
+    Çok kişili analizin ilk aşaması: görüntüyü bir kez çözer, kişi bölgelerini bulur ve her bölge
+    için (kırpıntı, geniş kırpıntı, skor) üçlüsünü döndürür. Kırpıntılar çözülmüş dizinin
+    görünümleridir (kopyalanmaz) ve `roi`'leri orijinal piksel koordinatlarındadır. Kişi bölgesi
+    bulunamazsa tüm görüntü tek bölge olarak döner.
+
+    Dönüş: (orijinal görüntü boyutu, [(PreparedImage, PreparedImage, skor | None), ...])
+    """
+    try:
+        if buf is None or len(buf) == 0:
+            raise BodyAnalysisError("Görüntü verisi boş.", reason="empty_image")
+        max_people = MULTI_PERSON_MAX_PEOPLE if max_people is None else max_people
+        max_long_edge = MULTI_PERSON_MAX_EDGE if max_long_edge is None else max_long_edge
+
+        with stage_timer(timings, "decode"):
+            prepared = decode_for_inference(buf, max_long_edge=max_long_edge)
+        if prepared is None:
+            raise BodyAnalysisError("Görüntü çözümlenemedi veya bozuk.", reason="decode_failed")
+        with stage_timer(timings, "color_convert"):
+            image_rgb = cv2.cvtColor(prepared.image, cv2.COLOR_BGR2RGB)
+        with stage_timer(timings, "person_detect"):
+            regions = detect_person_regions(prepared.image, max_people=max_people)
+
+        img_h, img_w = prepared.image.shape[:2]
+        if not regions:
+            regions = [(0, 0, img_w, img_h, None)]
+        orig_h, orig_w = prepared.original_shape[:2]
+        sx, sy = img_w / orig_w, img_h / orig_h
+
+        def make_crop(x, y, w, h):
+            return PreparedImage(image_rgb[y:y + h, x:x + w], prepared.original_shape, (x / sx, y / sy, w / sx, h / sy))
+
+        # Pose kişi tespiti kadraja duyarlıdır; bulunamayan bölgeler geniş kadrajla bir kez daha denenir
+        crops = [
+            (make_crop(*region[:4]), make_crop(*_expand_region(region, img_w, img_h)), region[4])
+            for region in regions
+        ]
+        return prepared.original_shape, crops
+
+    except (BodyAnalysisError, PosePoolError):
+        raise
+    except Exception:
+        raise BodyAnalysisError("Analiz sırasında beklenmedik bir sunucu hatası oluştu.", reason="unexpected_error")
+
+
+def people_crop_landmarks(crop: PreparedImage, wider: Optional[PreparedImage] = None, pose_pool=None):
+    """
+    Tek kişi bölgesinde Pose çalıştırır; kişi bulunamazsa `wider` kırpıntı denenir.
+    Dönüş: (kullanılan kırpıntının roi'si, orijinal görüntüye göre normalize (33, 4) dizi) ya da None.
+    """
+    try:
+        for candidate in (crop, wider):
+            if candidate is None:
+                continue
+            # Kırpıntı bir görünümdür; MediaPipe bitişik bellek beklediği için kopyalanır
+            with _pose_estimator(pose_pool) as pose:
+                results = pose.process(np.ascontiguousarray(candidate.image))
+            if results.pose_landmarks:
+                landmarks = pose_landmarks_to_array(results.pose_landmarks)
+                return candidate.roi, candidate.remap_landmark_array(landmarks)
+        return None
+
+    except (BodyAnalysisError, PosePoolError):
+        raise
+    except Exception:
+        raise BodyAnalysisError("Analiz sırasında beklenmedik bir sunucu hatası oluştu.", reason="unexpected_error")
+
+
+def combine_people(original_shape, detections, gender: str = "male"):
+    """
+    Bölge sonuçlarını birleştirir. `detections` [(roi, skor, landmarklar | None), ...] listesidir.
+    Aynı kişiye denk gelen kırpıntılar iskelet kutularının çakışmasına (`_DUPLICATE_IOU`) göre
+    tekilleştirilir; landmarkları daha görünür olan tutulur.
+
+    Dönüş: {"count", "people": [{"bbox": [x, y, w, h], "score", "result" | "error"}]} (soldan sağa).
+    """
+    candidates = [
+        (landmarks, roi, score, float(landmarks[:, 3].mean()))
+        for roi, score, landmarks in detections if landmarks is not None
+    ]
+    candidates.sort(key=lambda c: c[3], reverse=True)
+    people = []
+    kept_boxes = []
+    for landmarks, roi, score, _ in candidates:
+        box = _landmark_box(landmarks, original_shape)
+        if any(_box_iou(box, kept) > _DUPLICATE_IOU for kept in kept_boxes):
+            continue
+        kept_boxes.append(box)
+        person = {"bbox": [int(round(v)) for v in roi], "score": score}
+        try:
+            person["result"] = calculate_body_ratios(landmarks, original_shape, gender)
+        except BodyAnalysisError as e:
+            person["error"] = str(e)
+        people.append(person)
+
+    if not people:
+        raise BodyAnalysisError("Görüntüde vücut noktaları tespit edilemedi.", reason="no_pose_detected")
+    people.sort(key=lambda person: person["bbox"][0])
+    return {"count": len(people), "people": people}
+
+
+def analyze_people_bytes(buf: Union[bytes, bytearray, memoryview], gender: str = "male", pose_pool=None,
+                         max_people: Optional[int] = None, max_long_edge: Optional[int] = None, timings=None):
+    """
+    Görüntüdeki tüm kişileri (grup fotoğrafı, yan yana önce/sonra kolajı) tek çözmeyle analiz eder.
+
+    `prepare_people_crops`, `people_crop_landmarks` ve `combine_people` aşamalarını sırayla
+    çalıştırır; bölgeler tek tek analiz edilir ve aynı anda en fazla bir Pose tahminleyicisi
+    kullanılır. Sunucu bölgeleri çıkarım yürütücüsüne ayrı işler olarak verir (bkz. main.py),
+    böylece paralel kırpıntılar yürütücünün sınırlı kapasitesinden pay alır.
+    """
+    original_shape, crops = prepare_people_crops(buf, max_people, max_long_edge, timings)
+    detections = []
+    with stage_timer(timings, "pose_inference"):
+        for crop, wider, score in crops:
+            found = people_crop_landmarks(crop, wider, pose_pool)
+            roi, landmarks = found if found is not None else (crop.roi, None)
+            detections.append((roi, score, landmarks))
+    with stage_timer(timings, "ratios"):
+        return combine_people(original_shape, detections, gender)
+
+
+def analyze_body(image_path: str, gender: str = "male", pose_pool=None, cache=None):
+    """Dosya yolundan analiz; dosyayı okuyup `analyze_body_bytes` fonksiyonuna devreder."""
+    if not os.path.exists(image_path):
+        raise BodyAnalysisError(f"Görüntü dosyası bulunamadı: {image_path}", reason="file_not_found")
+    try:
+        with open(image_path, "rb") as f:
+            buf = f.read()
+    except OSError:
+        raise BodyAnalysisError(f"Görüntü yüklenemedi veya bozuk: {image_path}", reason="read_failed")
+    return analyze_body_bytes(buf, gender, pose_pool=pose_pool, cache=cache)
 
 
 # if __name__ == "__main__":
@@ -0,0 +1,250 @@
+import csv
+import io
+import math
+
+import numpy as np
+
+from calculations import BodyAnalysisError
+
+# Toplu hesaplama: calculate_bmi, calculate_bmr, calculate_daily_calories,
+# calculate_body_fat_percentage ve calculate_ideal_weight fonksiyonlarının NumPy ile
+# vektörleştirilmiş karşılıkları. Girdi sütunlar halinde verilir; geçersiz satırlar tüm
+# toplu işlemi durdurmaz, o satır için ilgili metrik boş bırakılır ve hata kodu döner.
+
+BULK_INPUT_COLUMNS = ("weight", "height", "age", "gender", "activity_level")
+BULK_METRICS = ("bmi", "bmr", "daily_calories", "body_fat_percentage", "ideal_weight")
+
+_NUMERIC_COLUMNS = ("weight", "height", "age")
+_ACTIVITY_MULTIPLIERS = {
+    'sedentary': 1.2,
+    'light': 1.375,
+    'moderate': 1.55,
+    'very': 1.725,
+    'extra': 1.9
+}
+
+# Her metriğin ihtiyaç duyduğu girdi sütunları; eksik sütun varsa metrik hesaplanmaz
+_METRIC_INPUTS = {
+    "bmi": ("weight", "height"),
+    "bmr": ("weight", "height", "age", "gender"),
+    "daily_calories": ("weight", "height", "age", "gender", "activity_level"),
+    "body_fat_percentage": ("weight", "height", "age", "gender"),
+    "ideal_weight": ("height", "gender"),
+}
+
+
+def _to_float_array(values):
+    """
+    Sayısal sütunu float64 diziye çevirir. (dizi, ayrıştırılamayan satır maskesi) döndürür;
+    boş/None değerler ve ayrıştırılamayan değerler dizide NaN olur.
+    """
+    try:
+        array = np.asarray(values, dtype=np.float64)
+        return array, np.zeros(array.shape, dtype=bool)
+    except (TypeError, ValueError):
+        pass
+    # Yavaş yol: CSV'den gelen boş hücreler veya hatalı değerler
+    result = np.empty(len(values), dtype=np.float64)
+    unparsable = np.zeros(len(values), dtype=bool)
+    for i, value in enumerate(values):
+        try:
+            result[i] = float(value)
+        except (TypeError, ValueError):
+            result[i] = np.nan
+            unparsable[i] = value is not None and str(value).strip() != ""
+    return result, unparsable
+
+
+def _lookup(values, table):
+    """
+    Metin sütununu küçük harfe çevirip tabloda arar. Benzersiz değerler üzerinden eşlendiği
+    için satır sayısından bağımsız olarak sadece birkaç sözlük araması yapılır.
+    Tabloda olmayan değerler NaN döner.
+    """
+    normalized = np.char.lower(np.char.strip(np.asarray(values, dtype=str)))
+    uniques, inverse = np.unique(normalized, return_inverse=True)
+    mapped = np.array([table.get(u, np.nan) for u in uniques.tolist()], dtype=np.float64)
+    return mapped[inverse.reshape(-1)]
+
+
+def _normalize_columns(columns):
+    present = {name: columns[name] for name in BULK_INPUT_COLUMNS if columns.get(name) is not None}
+    if not present:
+        raise BodyAnalysisError(
+            f"En az bir girdi sütunu gerekli: {', '.join(BULK_INPUT_COLUMNS)}", reason="invalid_columns"
+        )
+    lengths = {name: len(values) for name, values in present.items()}
+    if len(set(lengths.values())) != 1:
+        raise BodyAnalysisError(f"Tüm sütunlar aynı uzunlukta olmalıdır: {lengths}", reason="invalid_columns")
+    return present, next(iter(lengths.values()))
+
+
+def calculate_metrics_bulk(weight=None, height=None, age=None, gender=None, activity_level=None, metrics=None):
+    """
+    Sütun halindeki girdiler için tüm metrikleri tek geçişte hesaplar.
+
+    - Sayısal sütunlar (kg, cm, yıl) liste veya NumPy dizisi olabilir.
+    - `gender` ('male'/'female') ve `activity_level` metin sütunlarıdır.
+    - `metrics` verilirse sadece istenen metrikler hesaplanır.
+
+    Dönüş: {"count", "metrics": {ad: float64 dizi (geçersiz satırda NaN)}, "row_errors": {satır: [kodlar]}}
+    Hata kodları: missing_<sütun>, invalid_weight, invalid_height, invalid_age, invalid_gender,
+    invalid_activity_level, invalid_bmr.
+    """
+    columns, count = _normalize_columns({
+        "weight": weight, "height": height, "age": age, "gender": gender, "activity_level": activity_level,
+    })
+    requested = BULK_METRICS if metrics is None else tuple(metrics)
+    unknown = [m for m in requested if m not in BULK_METRICS]
+    if unknown:
+        raise BodyAnalysisError(f"Bilinmeyen metrik: {', '.join(unknown)}", reason="invalid_metric")
+
+    values = {}
+    valid = {}
+    codes = {}  # hata kodu -> satır maskesi
+    for name in _NUMERIC_COLUMNS:
+        if name not in columns:
+            continue
+        array, unparsable = _to_float_array(columns[name])
+        missing = np.isnan(array) & ~unparsable
+        # /calculate/* uç noktalarındaki gt=0 kısıtlarıyla aynı; inf/-inf de geçersizdir
+        invalid = unparsable | (~missing & ~(np.isfinite(array) & (array > 0)))
+        codes[f"missing_{name}"] = missing
+        codes[f"invalid_{name}"] = invalid
+        values[name] = array
+        valid[name] = ~(missing | invalid)
+
+    if "gender" in columns:
+        is_male = _lookup(columns["gender"], {"male": 1.0, "female": 0.0})
+        valid["gender"] = ~np.isnan(is_male)
+        codes["invalid_gender"] = ~valid["gender"]
+        values["gender"] = is_male == 1.0
+
+    if "activity_level" in columns:
+        multiplier = _lookup(columns["activity_level"], _ACTIVITY_MULTIPLIERS)
+        valid["activity_level"] = ~np.isnan(multiplier)
+        codes["invalid_activity_level"] = ~valid["activity_level"]
+        values["activity_level"] = multiplier
+
+    def computable(metric):
+        return all(name in columns for name in _METRIC_INPUTS[metric])
+
+    def mask(*names):
+        result = np.ones(count, dtype=bool)
+        for name in names:
+            result &= valid[name]
+        return result
+
+    results = {}
+    # Ara değerler (bmi, bmr) başka metrikler için de gerektiğinden istenmese de hesaplanabilir
+    bmi = bmr = None
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if computable("bmi"):
+            height_m = values["height"] / 100
+            bmi = np.where(mask("weight", "height"), np.round(values["weight"] / (height_m ** 2), 2), np.nan)
+        if computable("bmr"):
+            bmr = 10 * values["weight"] + 6.25 * values["height"] - 5 * values["age"]
+            bmr = np.where(values["gender"], bmr + 5, bmr - 161)
+            bmr = np.where(mask("weight", "height", "age", "gender"), np.rint(bmr), np.nan)
+
+        if "bmi" in requested and bmi is not None:
+            results["bmi"] = bmi
+        if "bmr" in requested and bmr is not None:
+            results["bmr"] = bmr
+        if "daily_calories" in requested and computable("daily_calories"):
+            # /calculate/daily_calories/ uç noktası bmr > 0 bekler
+            bad_bmr = ~np.isnan(bmr) & ~(bmr > 0)
+            codes["invalid_bmr"] = bad_bmr
+            ok = ~np.isnan(bmr) & ~bad_bmr & valid["activity_level"]
+            results["daily_calories"] = np.where(ok, np.rint(bmr * values["activity_level"]), np.nan)
+        if "body_fat_percentage" in requested and computable("body_fat_percentage"):
+            body_fat = 1.20 * bmi + 0.23 * values["age"]
+            body_fat = np.where(values["gender"], body_fat - 16.2, body_fat - 5.4)
+            ok = ~np.isnan(bmi) & mask("age", "gender")
+            results["body_fat_percentage"] = np.where(ok, np.round(body_fat, 2), np.nan)
+        if "ideal_weight" in requested and computable("ideal_weight"):
+            # Devine formülü
+            height_inches = values["height"] / 2.54
+            ideal_weight_lb = np.where(values["gender"], 50.0, 45.5) + 2.3 * (height_inches - 60)
+            ok = mask("height", "gender")
+            results["ideal_weight"] = np.where(ok, np.round(ideal_weight_lb * 0.45359237, 2), np.nan)
+
+    # Sadece istenen metriklerin kullandığı sütunların hataları raporlanır (ör. sadece bmi
+    # istendiyse geçersiz cinsiyet satır hatası değildir)
+    used = {name for metric in requested for name in _METRIC_INPUTS[metric]} | {"bmr"}
+    codes = {code: rows for code, rows in codes.items() if code.split("_", 1)[1] in used}
+    return {"count": count, "metrics": results, "row_errors": _collect_row_errors(codes)}
+
+
+def _collect_row_errors(codes):
+    """Hata maskelerini sadece hatalı satırları içeren seyrek {satır: [kodlar]} sözlüğüne çevirir."""
+    row_errors = {}
+    for code, rows in codes.items():
+        for row in np.flatnonzero(rows).tolist():
+            row_errors.setdefault(row, []).append(code)
+    return dict(sorted(row_errors.items()))
+
+
+def bulk_result_to_json(result):
+    """Sonucu JSON'a uygun hale getirir: NaN/sonsuz -> None, bmr ve kalori tamsayı olarak."""
+    metrics = {}
+    for name, array in result["metrics"].items():
+        as_int = name in ("bmr", "daily_calories")
+        # Geçerli ama aşırı büyük girdiler taşmayla sonsuz sonuç üretebilir; JSON'da ve int() ile temsil edilemez
+        metrics[name] = [None if not math.isfinite(v) else (int(v) if as_int else v) for v in array.tolist()]
+    return {
+        "count": result["count"],
+        "metrics": metrics,
+        "errors": [{"row": row, "codes": codes} for row, codes in result["row_errors"].items()],
+        "error_count": len(result["row_errors"]),
+    }
+
+
+def read_csv_columns(buf, max_rows=None):
+    """Başlık satırlı CSV'yi sütun sözlüğüne çevirir (sadece bilinen girdi sütunları alınır)."""
+    try:
+        text = bytes(buf).decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise BodyAnalysisError("CSV dosyası UTF-8 olarak okunamadı.", reason="invalid_file")
+    reader = csv.reader(io.StringIO(text))
+    header = next(reader, None)
+    if not header:
+        raise BodyAnalysisError("CSV dosyası boş veya başlık satırı yok.", reason="invalid_file")
+    indices = {name.strip().lower(): i for i, name in enumerate(header)}
+    wanted = [(name, indices[name]) for name in BULK_INPUT_COLUMNS if name in indices]
+    columns = {name: [] for name, _ in wanted}
+    for row_number, row in enumerate(reader):
+        if max_rows is not None and row_number >= max_rows:
+            raise BodyAnalysisError(f"Bir toplu istekte en fazla {max_rows} satır gönderilebilir.", reason="too_many_rows")
+        for name, index in wanted:
+            columns[name].append(row[index] if index < len(row) else "")
+    return columns
+
+
+def read_parquet_columns(buf, max_rows=None):
+    """Parquet dosyasını sütun sözlüğüne çevirir. pyarrow isteğe bağlı bir bağımlılıktır."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise BodyAnalysisError("Parquet desteği için 'pyarrow' paketi kurulu olmalıdır.", reason="parquet_unavailable")
+    try:
+        parquet_file = pq.ParquetFile(pa.BufferReader(bytes(buf)))
+        available = {name.lower(): name for name in parquet_file.schema_arrow.names}
+        if max_rows is not None and parquet_file.metadata.num_rows > max_rows:
+            raise BodyAnalysisError(f"Bir toplu istekte en fazla {max_rows} satır gönderilebilir.", reason="too_many_rows")
+        wanted = [name for name in BULK_INPUT_COLUMNS if name in available]
+        table = parquet_file.read(columns=[available[name] for name in wanted])
+    except BodyAnalysisError:
+        raise
+    except Exception as e:
+        raise BodyAnalysisError(f"Parquet dosyası okunamadı: {e}", reason="invalid_file")
+    columns = {}
+    for name in wanted:
+        column = table.column(available[name])
+        if name in _NUMERIC_COLUMNS:
+            # Boş değerler NaN olarak, kopyasız sayısal diziye
+            columns[name] = column.cast(pa.float64()).to_numpy(zero_copy_only=False)
+        else:
+            columns[name] = ["" if v is None else v for v in column.to_pylist()]
+    return columns
@@ -0,0 +1,78 @@
+# Saf aritmetik hesaplama fonksiyonları. Bu modül bilerek sadece standart kütüphaneye
+# bağımlıdır: /calculate/* uç noktaları ve toplu işler cv2/mediapipe yüklemeden çalışır.
+# body_analysis bu isimleri geriye dönük uyumluluk için yeniden dışa aktarır.
+
+class BodyAnalysisError(Exception):
+    """Vücut analizi sırasında özel hata sınıfı"""
+
+    def __init__(self, message="", reason="analysis_error"):
+        super().__init__(message)
+        # Metrikler için makine tarafından okunabilir kısa hata nedeni
+        self.reason = reason
+
+    def __reduce__(self):
+        # Süreç havuzundan ana sürece taşınırken nedenin kaybolmaması için
+        return (self.__class__, (str(self), self.reason))
+
+def calculate_bmi(weight, height):
+    if height <= 0:
+        raise BodyAnalysisError("Boy değeri pozitif olmalıdır.", reason="invalid_height")
+    height_m = height / 100
+    return round(weight / (height_m ** 2), 2)
+
+def calculate_bmr(weight, height, age, gender):
+    if gender.lower() not in ['male', 'female']:
+        raise BodyAnalysisError("Geçersiz cinsiyet değeri. 'male' veya 'female' olmalıdır.", reason="invalid_gender")
+    if gender.lower() == 'male':
+        bmr = 10 * weight + 6.25 * height - 5 * age + 5
+    else:
+        bmr = 10 * weight + 6.25 * height - 5 * age - 161
+    return round(bmr)
+
+def calculate_daily_calories(bmr, activity_level):
+    activity_multipliers = {
+        'sedentary': 1.2,
+        'light': 1.375,
+        'moderate': 1.55,
+        'very': 1.725,
+        'extra': 1.9
+    }
+    if activity_level.lower() not in activity_multipliers:
+        raise BodyAnalysisError("Geçersiz aktivite seviyesi.", reason="invalid_activity_level")
+    return round(bmr * activity_multipliers[activity_level.lower()])
+
+def calculate_body_fat_percentage(bmi, age, gender):
+    if gender.lower() not in ['male', 'female']:
+        raise BodyAnalysisError("Geçersiz cinsiyet değeri. 'male' veya 'female' olmalıdır.", reason="invalid_gender")
+    if gender.lower() == 'male':
+        body_fat = (1.20 * bmi) + (0.23 * age) - 16.2
+    else:
+        body_fat = (1.20 * bmi) + (0.23 * age) - 5.4
+    return round(body_fat, 2)
+
+def calculate_ideal_weight(height, gender):
+    if gender.lower() not in ['male', 'female']:
+        raise BodyAnalysisError("Geçersiz cinsiyet değeri. 'male' veya 'female' olmalıdır.", reason="invalid_gender")
+    # Devine Formula
+    height_inches = height / 2.54
+    if height_inches < 60: # Formül 60 inç (5 feet) altı için tasarlanmamış olabilir
+        # raise BodyAnalysisError("Boy ideal kilo hesaplaması için çok kısa.")
+        # Alternatif olarak, daha düşük boylar için bir taban değer döndürebilir veya farklı bir formül kullanabiliriz.
+        # Şimdilik Devine formülünü olduğu gibi uygulayalım, ancak bu bir sınırlama olabilir.
+        pass
+
+    if gender.lower() == 'male':
+        ideal_weight_lb = 50 + 2.3 * (height_inches - 60)
+    else:
+        ideal_weight_lb = 45.5 + 2.3 * (height_inches - 60)
+    
+    if ideal_weight_lb < 0: # Negatif ağırlık mantıksız
+        # Bu durum genellikle çok kısa boylar için (formülün sınırları dışında) oluşur.
+        # raise BodyAnalysisError("Hesaplanan ideal kilo negatif. Boy değeri formül için uygun olmayabilir.")
+        # Makul bir minimum döndürebiliriz ya da hatayı olduğu gibi bırakabiliriz.
+        # Şimdilik 0 döndürelim veya küçük bir pozitif değer. Ya da hatayı olduğu gibi bırakalım.
+        # Pratik bir uygulama için bu durumun nasıl ele alınacağına karar vermek gerekir.
+        # Şimdilik, formülün doğrudan sonucunu döndürelim, negatif çıksa bile.
+        pass
+
+    return round(ideal_weight_lb * 0.45359237, 2)  # Convert to kg
@@ -0,0 +1,135 @@
+import os
+import struct
+
+# Görüntü başlığı okuma ve yükleme kabul kontrolleri. Sadece standart kütüphane kullanır;
+# yükleme reddi kararları cv2/numpy yüklenmeden verilebilir.
+
+# Yükleme kabul sınırları: başlıktaki boyutlar bu değerleri aşarsa görüntü hiç çözülmez
+# (sıkıştırma bombası koruması; 50 MP, 12-48 MP telefon fotoğraflarını rahatça kapsar)
+MAX_IMAGE_PIXELS = int(os.getenv("MAX_IMAGE_PIXELS", str(50_000_000)))
+MAX_IMAGE_DIMENSION = int(os.getenv("MAX_IMAGE_DIMENSION", "16384"))
+# Boyutları bulmak için okunacak en fazla bayt; JPEG'de EXIF/ICC segmentleri SOF'tan önce gelir
+MAX_HEADER_BYTES = 512 * 1024
+
+# Boyut bilgisi taşıyan JPEG SOF işaretçileri (C4 DHT, C8 JPG, CC DAC hariç)
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+class ImageRejectedError(Exception):
+    """
+    Görüntü çözülmeden, başlık kontrolünde reddedildi.
+    reason: unsupported_format, invalid_header, dimensions_too_large, too_large veya empty_image
+    """
+
+    def __init__(self, message="", reason="invalid_header"):
+        super().__init__(message)
+        self.reason = reason
+
+
+def detect_image_format(buf):
+    """Sadece sihirli baytlara bakarak biçimi döndürür; tanınmazsa None."""
+    data = bytes(buf[:12])
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if data.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if data.startswith(b"BM"):
+        return "bmp"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def check_image_header(buf, complete=True):
+    """
+    Yüklemenin ilk baytlarından biçim ve boyutları doğrular, görüntüyü çözmez.
+
+    Geçerliyse (biçim, genişlik, yükseklik) döndürür; aksi halde ImageRejectedError fırlatır.
+    `complete=False` (akış halinde okuma) iken karar vermek için veri henüz yetersizse None döner.
+    """
+    if len(buf) < 12 and not complete:
+        return None
+    if detect_image_format(buf) is None:
+        raise ImageRejectedError("Desteklenmeyen görüntü biçimi (JPEG, PNG, WebP, BMP veya GIF olmalı).", reason="unsupported_format")
+
+    info = sniff_image_info(buf)
+    if info is None:
+        if not complete and len(buf) < MAX_HEADER_BYTES:
+            return None
+        raise ImageRejectedError("Görüntü başlığı okunamadı veya bozuk.", reason="invalid_header")
+
+    _, width, height = info
+    if width <= 0 or height <= 0:
+        raise ImageRejectedError("Görüntü başlığındaki boyutlar geçersiz.", reason="invalid_header")
+    if max(width, height) > MAX_IMAGE_DIMENSION or width * height > MAX_IMAGE_PIXELS:
+        raise ImageRejectedError(f"Görüntü boyutları çok büyük: {width}x{height}.", reason="dimensions_too_large")
+    return info
+
+
+def sniff_image_info(buf):
+    """
+    Görüntüyü çözmeden, sadece başlık baytlarından biçimi ve boyutları okur.
+    (biçim, genişlik, yükseklik) ya da tanınmayan/eksik veride None döndürür.
+    Desteklenen biçimler: JPEG, PNG, GIF, BMP, WebP.
+    """
+    data = bytes(buf[:32]) if len(buf) >= 32 else bytes(buf)
+
+    if data.startswith(b"\x89PNG\r\n\x1a\n") and len(data) >= 24 and data[12:16] == b"IHDR":
+        width, height = struct.unpack(">II", data[16:24])
+        return "png", width, height
+
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        width, height = struct.unpack("<HH", data[6:10])
+        return "gif", width, height
+
+    if data.startswith(b"BM") and len(data) >= 26:
+        width, height = struct.unpack("<ii", data[18:26])
+        return "bmp", abs(width), abs(height)
+
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP" and len(data) >= 30:
+        chunk = data[12:16]
+        if chunk == b"VP8 " and data[23:26] == b"\x9d\x01\x2a":
+            width, height = struct.unpack("<HH", data[26:30])
+            return "webp", width & 0x3FFF, height & 0x3FFF
+        if chunk == b"VP8L" and data[20] == 0x2F:
+            bits = int.from_bytes(data[21:25], "little")
+            return "webp", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b"VP8X":
+            width = int.from_bytes(data[24:27], "little") + 1
+            height = int.from_bytes(data[27:30], "little") + 1
+            return "webp", width, height
+        return None
+
+    if data.startswith(b"\xff\xd8"):
+        return _sniff_jpeg(buf)
+
+    return None
+
+
+def _sniff_jpeg(buf):
+    view = memoryview(buf)
+    size = len(view)
+    pos = 2
+    while pos + 4 <= size:
+        if view[pos] != 0xFF:
+            return None
+        marker = view[pos + 1]
+        if marker == 0xFF:  # Dolgu baytı
+            pos += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:  # Uzunluksuz işaretçiler
+            pos += 2
+            continue
+        segment_length = (view[pos + 2] << 8) | view[pos + 3]
+        if marker in _JPEG_SOF_MARKERS:
+            if pos + 9 > size:
+                return None
+            height = (view[pos + 5] << 8) | view[pos + 6]
+            width = (view[pos + 7] << 8) | view[pos + 8]
+            return "jpeg", width, height
+        if marker == 0xDA:  # Tarama başladı, SOF bulunamadı
+            return None
+        pos += 2 + segment_length
+    return None
@@ -0,0 +1,141 @@
+import os
+
+import cv2
+import numpy as np
+
+from image_header import (  # noqa: F401
+    MAX_HEADER_BYTES,
+    MAX_IMAGE_DIMENSION,
+    MAX_IMAGE_PIXELS,
+    ImageRejectedError,
+    check_image_header,
+    detect_image_format,
+    sniff_image_info,
+)
+
+# Çıkarım öncesi görüntünün uzun kenarı bu değere indirilir. MediaPipe Pose girdiyi zaten
+# 256x256 civarına küçülttüğü için 12-48 MP telefon fotoğraflarını tam çözünürlükte
+# çözmek sadece zaman ve bellek harcar.
+DEFAULT_MAX_INFERENCE_EDGE = int(os.getenv("MAX_INFERENCE_EDGE", "1280"))
+
+# cv2.imdecode indirgeme bayrakları: JPEG için DCT alanında ölçekleme yapılır,
+# tam boyutlu ara görüntü hiç oluşturulmaz.
+_REDUCED_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+
+class PreparedImage:
+    """
+    Çıkarıma hazır (küçültülmüş ve isteğe bağlı kırpılmış) BGR görüntü.
+
+    - **image**: Pose'a verilecek görüntü.
+    - **original_shape**: Orijinal görüntünün (h, w, 3) boyutu; piksel çıktıları bu ölçekte verilir.
+    - **roi**: Orijinal piksel koordinatlarında (x, y, w, h) kırpma bölgesi ya da None.
+    """
+
+    __slots__ = ("image", "original_shape", "roi")
+
+    def __init__(self, image, original_shape, roi=None):
+        self.image = image
+        self.original_shape = original_shape
+        self.roi = roi
+
+    def remap_landmarks(self, landmarks):
+        """
+        Kırpılmış görüntüye göre normalize edilmiş landmarkları orijinal görüntüye göre
+        normalize koordinatlara yerinde çevirir. Küçültme normalize koordinatları etkilemez.
+        """
+        if self.roi is None:
+            return landmarks
+        x0, y0, roi_w, roi_h = self.roi
+        orig_h, orig_w = self.original_shape[:2]
+        for lm in landmarks:
+            lm.x = (x0 + lm.x * roi_w) / orig_w
+            lm.y = (y0 + lm.y * roi_h) / orig_h
+        return landmarks
+
+    def remap_landmark_array(self, array):
+        """`remap_landmarks` ile aynı; (N, 4) [x, y, z, visibility] dizisini yerinde günceller."""
+        if self.roi is None:
+            return array
+        x0, y0, roi_w, roi_h = self.roi
+        orig_h, orig_w = self.original_shape[:2]
+        array[:, 0] = (x0 + array[:, 0].astype(np.float64) * roi_w) / orig_w
+        array[:, 1] = (y0 + array[:, 1].astype(np.float64) * roi_h) / orig_h
+        return array
+
+
+def _reduction_for(long_edge, max_long_edge):
+    """Uzun kenarı hedefin altına düşürmeden uygulanabilecek en büyük indirgeme katsayısı."""
+    for factor, flag in _REDUCED_FLAGS:
+        if long_edge // factor >= max_long_edge:
+            return factor, flag
+    return 1, cv2.IMREAD_COLOR
+
+
+def decode_for_inference(buf, max_long_edge=None, roi=None):
+    """
+    Görüntüyü çıkarım için azaltılmış boyutta çözer.
+
+    Başlıktan okunan boyuta göre `cv2.IMREAD_REDUCED_COLOR_*` ile çözülür (JPEG'de DCT
+    alanında ölçekleme), ardından uzun kenar `max_long_edge` değerine INTER_AREA ile
+    indirilir. `roi` (orijinal piksel koordinatlarında x, y, w, h) verilirse küçültülmüş
+    görüntüden o bölge kırpılır. Çözülemeyen veride None döndürür.
+    """
+    if max_long_edge is None:
+        max_long_edge = DEFAULT_MAX_INFERENCE_EDGE
+    array = np.frombuffer(buf, dtype=np.uint8)
+    info = sniff_image_info(buf)
+
+    flag = cv2.IMREAD_COLOR
+    if info is not None and max_long_edge > 0:
+        _, header_w, header_h = info
+        _, flag = _reduction_for(max(header_w, header_h), max_long_edge)
+
+    image = cv2.imdecode(array, flag)
+    if image is None:
+        return None
+
+    decoded_h, decoded_w = image.shape[:2]
+    if info is not None:
+        _, orig_w, orig_h = info
+        # EXIF yönlendirmesi uygulandıysa (90/270 derece) başlık boyutları yer değiştirir
+        if (decoded_w > decoded_h) != (orig_w > orig_h) and decoded_w != decoded_h:
+            orig_w, orig_h = orig_h, orig_w
+    else:
+        orig_w, orig_h = decoded_w, decoded_h
+    original_shape = (orig_h, orig_w, 3)
+
+    long_edge = max(decoded_h, decoded_w)
+    if max_long_edge > 0 and long_edge > max_long_edge:
+        scale = max_long_edge / long_edge
+        image = cv2.resize(
+            image,
+            (max(int(round(decoded_w * scale)), 1), max(int(round(decoded_h * scale)), 1)),
+            interpolation=cv2.INTER_AREA,
+        )
+
+    if roi is not None:
+        x, y, w, h = _clip_roi(roi, orig_w, orig_h)
+        sx = image.shape[1] / orig_w
+        sy = image.shape[0] / orig_h
+        x0, y0 = int(x * sx), int(y * sy)
+        x1 = max(int(round((x + w) * sx)), x0 + 1)
+        y1 = max(int(round((y + h) * sy)), y0 + 1)
+        image = image[y0:y1, x0:x1]
+        # Kırpma piksel ızgarasına yuvarlandığı için ROI'yi gerçekte kırpılan bölgeye göre güncelle
+        roi = (x0 / sx, y0 / sy, (x1 - x0) / sx, (y1 - y0) / sy)
+
+    return PreparedImage(image, original_shape, roi)
+
+
+def _clip_roi(roi, width, height):
+    x, y, w, h = (float(v) for v in roi)
+    x = min(max(x, 0.0), width - 1.0)
+    y = min(max(y, 0.0), height - 1.0)
+    w = min(max(w, 1.0), width - x)
+    h = min(max(h, 1.0), height - y)
+    return x, y, w, h
@@ -0,0 +1,285 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from metrics import StageTimings
+from pose_pool import PosePool, TieredPosePool
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceSaturatedError(Exception):
+    """Çıkarım kuyruğu dolu olduğunda fırlatılır (istemciye 503 döndürülmeli)"""
+    pass
+
+
+class InferenceTimeoutError(Exception):
+    """Çıkarım istek başına tanınan sürede bitmediğinde fırlatılır"""
+    pass
+
+
+# Her çalışan sürecin (veya thread modunda ana sürecin) kendi Pose havuzu
+_worker_pose_pool = None
+# Kademeli çıkarım açıksa (birden fazla model_complexity) kademe havuzları; varsayılan havuz
+# kendi kademesinde yeniden kullanılır
+_worker_pose_tiers = None
+
+
+def _init_worker(pose_pool_size, pose_checkout_timeout, pose_tiers=None):
+    global _worker_pose_pool, _worker_pose_tiers
+    _worker_pose_pool = PosePool(size=pose_pool_size, checkout_timeout=pose_checkout_timeout)
+    if pose_tiers and tuple(pose_tiers) != (1,):
+        _worker_pose_tiers = TieredPosePool(
+            pose_tiers, size=pose_pool_size, checkout_timeout=pose_checkout_timeout, base_pool=_worker_pose_pool
+        )
+
+
+def _close_worker():
+    global _worker_pose_pool, _worker_pose_tiers
+    if _worker_pose_tiers is not None:
+        _worker_pose_tiers.close()
+        _worker_pose_tiers = None
+    if _worker_pose_pool is not None:
+        _worker_pose_pool.close()
+        _worker_pose_pool = None
+
+
+def get_worker_pose_pool():
+    return _worker_pose_pool
+
+
+def get_worker_pose_tiers():
+    return _worker_pose_tiers
+
+
+# body_analysis (cv2 + mediapipe) çalışan içinde ilk kullanımda yüklenir; bu modülü import
+# etmek ana süreçte görüntü bağımlılıklarını yüklemez.
+
+def analyze_image_bytes(buf, gender):
+    """Çalışan içinde, o çalışanın sıcak Pose havuzunu kullanarak bellekteki görüntüyü analiz eder."""
+    from body_analysis import analyze_body_bytes
+    return analyze_body_bytes(buf, gender, pose_pool=_worker_pose_pool, pose_tiers=_worker_pose_tiers)
+
+
+def analyze_image_bytes_timed(buf, gender):
+    """`analyze_image_bytes` ile aynı; sonuçla birlikte çalışan içindeki aşama sürelerini de döndürür."""
+    from body_analysis import analyze_body_bytes
+    timings = StageTimings()
+    result = analyze_body_bytes(buf, gender, pose_pool=_worker_pose_pool, pose_tiers=_worker_pose_tiers, timings=timings)
+    return result, timings.stages
+
+
+# Çok kişili analiz üç aşamada yürütücüye verilir (çözme + kişi tespiti, bölge başına Pose, birleştirme);
+# her bölge ayrı bir iş olduğundan paralel kırpıntılar da yürütücünün kapasite sınırına tabidir.
+
+def prepare_people_image_bytes(buf):
+    """Görüntüyü çözer ve kişi bölgelerinin kırpıntılarını döndürür (bkz. body_analysis.prepare_people_crops)."""
+    from body_analysis import prepare_people_crops
+    return prepare_people_crops(buf)
+
+
+def people_crop_landmarks(crop, wider):
+    """Tek bölgede, çalışanın Pose havuzundan bir tahminleyiciyle landmarkları bulur."""
+    from body_analysis import people_crop_landmarks as crop_landmarks
+    return crop_landmarks(crop, wider, pose_pool=_worker_pose_pool)
+
+
+def combine_people(original_shape, detections, gender):
+    """Bölge sonuçlarını tekilleştirip kişi başına oranları hesaplar."""
+    from body_analysis import combine_people as combine
+    return combine(original_shape, detections, gender)
+
+
+def analyze_video_path(video_path, gender):
+    """Video dosyasını çalışan içinde analiz eder (video_analysis ilk kullanımda yüklenir)."""
+    from video_analysis import analyze_video_file
+    return analyze_video_file(video_path, gender)
+
+
+def _warm_up_worker():
+    """Görüntü bağımlılıklarını önceden yükler; ilk gerçek isteğin import maliyetini ödememesi için."""
+    import body_analysis  # noqa: F401
+    import video_analysis  # noqa: F401
+    # Kademe modelleri ilk istekte değil burada yüklenir; indirilemeyen kademeler baştan devre dışı kalır
+    if _worker_pose_tiers is not None:
+        _worker_pose_tiers.prepare()
+    return True
+
+
+class InferenceExecutor:
+    """
+    CPU yoğun görüntü analizini olay döngüsünün (event loop) dışında çalıştırır.
+
+    - mode="thread": Tek süreç içinde thread havuzu. MediaPipe çıkarım sırasında GIL'i
+      bıraktığı için çoğu durumda yeterlidir; tüm thread'ler ortak bir Pose havuzunu paylaşır.
+    - mode="process": Her çekirdek için ayrı süreç; her süreç kendi Pose tahminleyicisini tutar.
+
+    Kuyruk derinliği sınırlıdır: çalışan + bekleyen iş sayısı `max_workers + max_queue`
+    değerine ulaştığında yeni istekler InferenceSaturatedError ile hemen reddedilir.
+
+    `pose_tiers` birden fazla model_complexity içeriyorsa (ör. (0, 1, 2)) tek görüntü analizi
+    kademeli çalışır: ucuz model yeterince güvenilir sonuç verirse ağır modeller çalıştırılmaz.
+    Kademe modelleri önceden provision_pose_models.py ile indirilmiş olmalıdır.
+    """
+
+    def __init__(self, mode="thread", max_workers=2, max_queue=8, timeout=30.0, pose_checkout_timeout=30.0,
+                 pose_tiers=(1,)):
+        if mode not in ("thread", "process"):
+            raise ValueError("Geçersiz çıkarım modu. 'thread' veya 'process' olmalıdır.")
+        if max_workers <= 0:
+            raise ValueError("Çalışan sayısı pozitif olmalıdır.")
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_queue = max(max_queue, 0)
+        self.timeout = timeout
+        self.pose_checkout_timeout = pose_checkout_timeout
+        self.pose_tiers = tuple(pose_tiers)
+
+        self._executor = None
+        self._start_lock = threading.Lock()
+        self._shut_down = False
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._rejected = 0
+        self._timed_out = 0
+
+    @property
+    def capacity(self):
+        return self.max_workers + self.max_queue
+
+    def _create_executor(self):
+        if self.mode == "thread":
+            return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        # 'spawn': çalışanlar ana süreçteki thread/olay döngüsü durumunu devralmasın
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(1, self.pose_checkout_timeout, self.pose_tiers),
+        )
+
+    @property
+    def started(self):
+        return self._executor is not None
+
+    def start(self):
+        """
+        Yürütücüyü başlatır (birden fazla kez çağrılabilir). Thread modunda Pose havuzu burada
+        oluşturulduğu için mediapipe ilk kez bu çağrıda yüklenir.
+        """
+        with self._start_lock:
+            if self._executor is not None:
+                return
+            if self._shut_down:
+                raise RuntimeError("Çıkarım yürütücüsü kapatılmış.")
+            if self.mode == "thread":
+                _init_worker(self.max_workers, self.pose_checkout_timeout, self.pose_tiers)
+            self._executor = self._create_executor()
+        logger.info(f"Çıkarım yürütücüsü başlatıldı: mod={self.mode}, çalışan={self.max_workers}, kuyruk={self.max_queue}")
+
+    def warm_up(self):
+        """
+        Yürütücüyü başlatır ve görüntü bağımlılıklarını önceden yükler. Süreç modunda her çalışan
+        süreç başlatılıp kendi Pose havuzunu kurana kadar bekler. Bloklayan bir çağrıdır.
+        """
+        self.start()
+        if self.mode == "thread":
+            _warm_up_worker()
+            return
+        # Süreçler ihtiyaç oldukça açılır; aynı anda max_workers iş göndermek hepsini başlatır
+        futures = [self._executor.submit(_warm_up_worker) for _ in range(self.max_workers)]
+        for future in futures:
+            future.result()
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, fn, *args, timeout=None):
+        """
+        `fn(*args)` çağrısını çalışan havuzunda yürütür ve sonucunu bekler.
+        `fn` süreç modunda pickle edilebilir (modül seviyesinde) bir fonksiyon olmalıdır.
+        `timeout` verilmezse yürütücünün varsayılan istek zaman aşımı kullanılır.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        if self._executor is None:
+            # Isınma kapalıysa (veya henüz bitmediyse) ilk istek yürütücüyü başlatır; Pose havuzu
+            # kurulurken olay döngüsü bloklanmasın diye thread'de çalıştırılır
+            await asyncio.to_thread(self.start)
+
+        with self._lock:
+            if self._pending >= self.capacity:
+                self._rejected += 1
+                raise InferenceSaturatedError("Çıkarım kuyruğu dolu.")
+            self._pending += 1
+
+        try:
+            future = self._executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._release(None)
+            self._restart_broken_pool()
+            raise
+        except Exception:
+            self._release(None)
+            raise
+        # Sayaç iş gerçekten bittiğinde düşer; zaman aşımında arka planda süren iş kapasiteyi tutmaya devam eder
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+        except asyncio.TimeoutError:
+            future.cancel()  # Henüz başlamadıysa kuyruktan çıkarılır
+            with self._lock:
+                self._timed_out += 1
+            raise InferenceTimeoutError(f"Analiz {timeout} saniye içinde tamamlanamadı.")
+        except BrokenProcessPool:
+            self._restart_broken_pool()
+            raise
+
+    def _restart_broken_pool(self):
+        logger.error("Çıkarım süreç havuzu çöktü, yeniden oluşturuluyor.")
+        old = self._executor
+        self._executor = self._create_executor()
+        try:
+            old.shutdown(wait=False, cancel_futures=True)
+        except Exception as e:
+            logger.warning(f"Çöken süreç havuzu kapatılırken hata: {e}")
+
+    def health_check(self):
+        """Thread modunda ortak Pose havuzunu (ve kademe havuzlarını) kontrol eder; süreç modunda her süreç kendi hatalarını onarır."""
+        pose_pool = get_worker_pose_pool()
+        if self.mode == "thread" and pose_pool is not None:
+            pose_tiers = get_worker_pose_tiers()
+            if pose_tiers is not None:
+                pose_tiers.health_check()
+            return pose_pool.health_check()
+        return None
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                "mode": self.mode,
+                "max_workers": self.max_workers,
+                "capacity": self.capacity,
+                "pending": self._pending,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+            }
+        pose_pool = get_worker_pose_pool()
+        if self.mode == "thread" and pose_pool is not None:
+            stats["pose_pool"] = pose_pool.stats()
+            pose_tiers = get_worker_pose_tiers()
+            if pose_tiers is not None:
+                stats["pose_tiers"] = pose_tiers.stats()
+        return stats
+
+    def shutdown(self):
+        self._shut_down = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        if self.mode == "thread":
+            _close_worker()
@@ -0,0 +1,507 @@
+from abc import ABC, abstractmethod
+import asyncio
+import collections
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Öncelik şeritleri ve ağırlıkları: her turda şerit, ağırlığı kadar iş alır. Yüksek öncelik
+# öne geçer ama düşük öncelikli işler sürekli yük altında da açlıktan ölmez.
+LANE_WEIGHTS = {"high": 4, "normal": 2, "low": 1}
+DEFAULT_LANE = "normal"
+
+# İş durumları
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+FINISHED_STATES = (DONE, FAILED)
+
+
+class JobQueueFullError(Exception):
+    """Bekleyen iş sayısı veya girdi verisi boyutu sınıra ulaştığında fırlatılır (istemciye 503 döndürülmeli)"""
+    pass
+
+
+class JobFailedError(Exception):
+    """İş kalıcı olarak başarısız oldu; `status` istemciye gösterilecek HTTP durum kodudur"""
+
+    def __init__(self, message, status=500, reason=None):
+        super().__init__(message)
+        self.status = status
+        self.reason = reason
+
+
+class JobRetryError(Exception):
+    """Geçici hata (ör. çıkarım kapasitesi dolu); iş kısa bir beklemeden sonra yeniden denenir"""
+    pass
+
+
+def _new_job(params, lane):
+    return {
+        "id": uuid.uuid4().hex,
+        "status": QUEUED,
+        "priority": lane,
+        "params": params,
+        "attempts": 0,
+        "created_at": time.time(),
+        "started_at": None,
+        "finished_at": None,
+        "result": None,
+        "error": None,
+    }
+
+
+class JobBackend(ABC):
+    """
+    İş kayıtlarının ve bekleyen işlerin girdi verisinin (payload) saklandığı arayüz.
+
+    Zamanlayıcı kuyrukta sadece iş kimliklerini tutar; girdi verisi iş çalıştırılacağı
+    zaman `load_payload` ile okunur ve iş bittiğinde silinir.
+    """
+
+    @abstractmethod
+    def add(self, job, payload):
+        """Yeni iş kaydını ve girdi verisini saklar."""
+
+    @abstractmethod
+    def get(self, job_id):
+        """İş kaydını (girdi verisi olmadan) döndürür; yoksa None."""
+
+    @abstractmethod
+    def load_payload(self, job_id):
+        """Bekleyen işin girdi verisini döndürür; iş bitmişse veya yoksa None."""
+
+    @abstractmethod
+    def mark_running(self, job_id, attempts):
+        """İşi `running` olarak işaretler ve deneme sayısını kaydeder."""
+
+    @abstractmethod
+    def mark_queued(self, job_id):
+        """Yeniden denenecek işi tekrar `queued` olarak işaretler."""
+
+    @abstractmethod
+    def finish(self, job_id, result=None, error=None):
+        """İşi `done` (error None ise) veya `failed` olarak işaretler ve girdi verisini siler."""
+
+    @abstractmethod
+    def unfinished(self):
+        """Bitmemiş işleri (kuyrukta veya çalışırken kesilmiş) oluşturulma sırasıyla döndürür."""
+
+    @abstractmethod
+    def purge(self, finished_before):
+        """Bu zamandan önce bitmiş işleri siler; silinen iş sayısını döndürür."""
+
+    def close(self):
+        pass
+
+
+class InMemoryJobBackend(JobBackend):
+    """Süreç belleğinde tutulan iş deposu; sunucu yeniden başlatılınca işler kaybolur."""
+
+    def __init__(self):
+        self._jobs = {}
+        self._payloads = {}
+        self._lock = threading.Lock()
+
+    def add(self, job, payload):
+        with self._lock:
+            self._jobs[job["id"]] = dict(job)
+            self._payloads[job["id"]] = payload
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def load_payload(self, job_id):
+        with self._lock:
+            return self._payloads.get(job_id)
+
+    def mark_running(self, job_id, attempts):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(status=RUNNING, attempts=attempts, started_at=time.time())
+
+    def mark_queued(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(status=QUEUED, started_at=None)
+
+    def finish(self, job_id, result=None, error=None):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(
+                    status=DONE if error is None else FAILED,
+                    result=result,
+                    error=error,
+                    finished_at=time.time(),
+                )
+            self._payloads.pop(job_id, None)
+
+    def unfinished(self):
+        with self._lock:
+            jobs = [dict(job) for job in self._jobs.values() if job["status"] not in FINISHED_STATES]
+        return sorted(jobs, key=lambda job: job["created_at"])
+
+    def purge(self, finished_before):
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job["finished_at"] is not None and job["finished_at"] < finished_before
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+        return len(expired)
+
+
+class SQLiteJobBackend(JobBackend):
+    """
+    SQLite tabanlı iş deposu. Bekleyen işlerin girdi verisi de saklandığı için sunucu yeniden
+    başlatıldığında kuyrukta kalan (veya çalışırken kesilen) işler kaldığı yerden devam eder.
+    """
+
+    _COLUMNS = "id, status, priority, params, attempts, created_at, started_at, finished_at, result, error"
+
+    def __init__(self, path="jobs.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                priority TEXT NOT NULL,
+                params TEXT NOT NULL,
+                attempts INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                result TEXT,
+                error TEXT,
+                payload BLOB
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at);
+            CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs (finished_at);
+            """
+        )
+        self._db.commit()
+        logger.info(f"İş deposu açıldı: {path}")
+
+    def _row_to_job(self, row):
+        job_id, status, priority, params, attempts, created_at, started_at, finished_at, result, error = row
+        return {
+            "id": job_id,
+            "status": status,
+            "priority": priority,
+            "params": json.loads(params),
+            "attempts": attempts,
+            "created_at": created_at,
+            "started_at": started_at,
+            "finished_at": finished_at,
+            "result": json.loads(result) if result is not None else None,
+            "error": json.loads(error) if error is not None else None,
+        }
+
+    def add(self, job, payload):
+        with self._lock, self._db:
+            self._db.execute(
+                f"INSERT INTO jobs ({self._COLUMNS}, payload) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job["id"], job["status"], job["priority"], json.dumps(job["params"], ensure_ascii=False),
+                    job["attempts"], job["created_at"], None, None, None, None, bytes(payload),
+                ),
+            )
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._db.execute(f"SELECT {self._COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row is not None else None
+
+    def load_payload(self, job_id):
+        with self._lock:
+            row = self._db.execute("SELECT payload FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row[0] if row is not None else None
+
+    def mark_running(self, job_id, attempts):
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, attempts = ?, started_at = ? WHERE id = ?",
+                (RUNNING, attempts, time.time(), job_id),
+            )
+
+    def mark_queued(self, job_id):
+        with self._lock, self._db:
+            self._db.execute("UPDATE jobs SET status = ?, started_at = NULL WHERE id = ?", (QUEUED, job_id))
+
+    def finish(self, job_id, result=None, error=None):
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, payload = NULL WHERE id = ?",
+                (
+                    DONE if error is None else FAILED,
+                    json.dumps(result, ensure_ascii=False) if result is not None else None,
+                    json.dumps(error, ensure_ascii=False) if error is not None else None,
+                    time.time(),
+                    job_id,
+                ),
+            )
+
+    def unfinished(self):
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {self._COLUMNS} FROM jobs WHERE status IN (?, ?) ORDER BY created_at", (QUEUED, RUNNING)
+            ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def purge(self, finished_before):
+        with self._lock, self._db:
+            cursor = self._db.execute("DELETE FROM jobs WHERE finished_at < ?", (finished_before,))
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+class JobScheduler:
+    """
+    Asenkron iş kuyruğu: işler öncelik şeritlerinde bekler ve en fazla `concurrency` tanesi
+    aynı anda `run_job(job, payload)` ile çalıştırılır.
+
+    - Şeritler ağırlıklı sırayla (LANE_WEIGHTS) boşaltılır.
+    - Bekleyen işlerin girdi verisi toplamı `max_queued_bytes` baytı aşamaz (0: sınırsız); bellek
+      deposunda yüklenen görseller iş bitene kadar süreç belleğinde tutulur.
+    - `run_job` JobRetryError fırlatırsa iş depoda yeniden `queued` olur ve bekleme süresi dolunca
+      kendi şeridinin başına geri alınır; bekleme sırasında çalışan başka işleri alabilir.
+      Bekleme `retry_delay` ile başlar, her denemede ikiye katlanır (en fazla `max_retry_delay`).
+      İş, oluşturulmasından bu yana `max_retry_age` saniye geçtiyse deneme sayısından bağımsız
+      olarak 503 ile başarısız sayılır.
+    - `wait()` ile iş bitene kadar (en fazla verilen süre) beklenebilir (long polling).
+    - Bitmiş işler `result_ttl` saniye saklanır.
+    """
+
+    def __init__(self, backend, run_job, concurrency=2, max_queued=1000, max_queued_bytes=0,
+                 result_ttl=3600.0, retry_delay=0.5, max_retry_delay=10.0, max_retry_age=300.0):
+        if concurrency <= 0:
+            raise ValueError("Eşzamanlı iş sayısı pozitif olmalıdır.")
+        self.backend = backend
+        self.run_job = run_job
+        self.concurrency = concurrency
+        self.max_queued = max_queued
+        self.max_queued_bytes = max_queued_bytes
+        self.result_ttl = result_ttl
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.max_retry_age = max_retry_age
+
+        self._lanes = {lane: collections.deque() for lane in LANE_WEIGHTS}
+        self._schedule = [lane for lane, weight in LANE_WEIGHTS.items() for _ in range(weight)]
+        self._cursor = 0
+        self._attempts = {}
+        # Bitmemiş işlerin girdi verisi boyutları; yeniden başlatmada kurtarılan işler sayılmaz
+        self._payload_sizes = {}
+        self._queued_bytes = 0
+        self._available = None
+        self._done_events = {}
+        self._retry_timers = {}
+        self._workers = []
+        self._purge_task = None
+        self._running = 0
+        self._counters = {"submitted": 0, "done": 0, "failed": 0, "retried": 0, "rejected": 0}
+
+    @property
+    def queued(self):
+        # Yeniden deneme için bekleyen işler de kuyrukta sayılır
+        return sum(len(lane) for lane in self._lanes.values()) + len(self._retry_timers)
+
+    async def start(self):
+        """Çalışanları başlatır ve depoda bitmemiş işleri (yeniden başlatma sonrası) kuyruğa geri alır."""
+        self._available = asyncio.Semaphore(0)
+        recovered = await asyncio.to_thread(self.backend.unfinished)
+        for job in recovered:
+            self._enqueue(job["id"], job["priority"], job["attempts"])
+        if recovered:
+            logger.info(f"{len(recovered)} bitmemiş iş kuyruğa geri alındı.")
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        if self.result_ttl and self.result_ttl > 0:
+            self._purge_task = asyncio.create_task(self._purge_loop())
+
+    async def stop(self):
+        """Çalışanları durdurur. Çalışmakta olan işler depoda kalır ve bir sonraki başlatmada yeniden denenir."""
+        tasks = self._workers + ([self._purge_task] if self._purge_task is not None else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # Yeniden denemeyi bekleyen işler depoda `queued` kalır ve bir sonraki başlatmada kuyruğa alınır
+        for timer in self._retry_timers.values():
+            timer.cancel()
+        self._retry_timers.clear()
+        self._workers = []
+        self._purge_task = None
+
+    def _enqueue(self, job_id, lane, attempts=0, front=False):
+        lane = lane if lane in self._lanes else DEFAULT_LANE
+        if front:
+            self._lanes[lane].appendleft(job_id)
+        else:
+            self._lanes[lane].append(job_id)
+        self._attempts[job_id] = attempts
+        self._done_events.setdefault(job_id, asyncio.Event())
+        self._available.release()
+
+    async def submit(self, params, payload, priority=DEFAULT_LANE):
+        """Yeni iş oluşturup kuyruğa ekler ve iş kaydını döndürür."""
+        if priority not in LANE_WEIGHTS:
+            raise ValueError(f"Geçersiz öncelik: {priority}. Seçenekler: {', '.join(LANE_WEIGHTS)}")
+        if self.queued >= self.max_queued:
+            self._counters["rejected"] += 1
+            raise JobQueueFullError("İş kuyruğu dolu.")
+        size = len(payload)
+        if self.max_queued_bytes and self._queued_bytes + size > self.max_queued_bytes:
+            self._counters["rejected"] += 1
+            raise JobQueueFullError("İş kuyruğundaki girdi verisi sınırı dolu.")
+        job = _new_job(params, priority)
+        # Boyut depoya yazılmadan önce ayrılır; eşzamanlı gönderimler sınırı birlikte aşamaz
+        self._payload_sizes[job["id"]] = size
+        self._queued_bytes += size
+        try:
+            await asyncio.to_thread(self.backend.add, job, payload)
+        except BaseException:
+            self._release_payload(job["id"])
+            raise
+        self._counters["submitted"] += 1
+        self._enqueue(job["id"], priority)
+        return job
+
+    async def get(self, job_id):
+        return await asyncio.to_thread(self.backend.get, job_id)
+
+    async def wait(self, job_id, timeout):
+        """İş bitene veya `timeout` dolana kadar bekler; iş kaydını döndürür (yoksa None)."""
+        event = self._done_events.get(job_id)
+        if event is not None and timeout > 0:
+            try:
+                await asyncio.wait_for(event.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        return await self.get(job_id)
+
+    def _next_job(self):
+        for _ in range(len(self._schedule)):
+            lane = self._schedule[self._cursor]
+            self._cursor = (self._cursor + 1) % len(self._schedule)
+            if self._lanes[lane]:
+                return self._lanes[lane].popleft(), lane
+        raise RuntimeError("Kuyruk sayacı ile şeritler tutarsız.")
+
+    async def _worker(self):
+        while True:
+            await self._available.acquire()
+            job_id, lane = self._next_job()
+            attempts = self._attempts.pop(job_id, 0) + 1
+            self._running += 1
+            retry_scheduled = False
+            try:
+                retry_scheduled = await self._execute(job_id, lane, attempts)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Depo hatası vb.; çalışan ölmesin
+                logger.exception(f"İş çalıştırılırken beklenmedik hata ({job_id}): {e}")
+                try:
+                    await self._fail(job_id, {"status": 500, "detail": "İş sırasında sunucuda beklenmedik bir hata oluştu.", "reason": None})
+                except Exception as fail_error:
+                    logger.error(f"İş başarısız olarak işaretlenemedi ({job_id}): {fail_error}")
+            finally:
+                self._running -= 1
+                # Yeniden denemeye alınmayan her iş için (depo hatası dahil) ayrılan bayt sayısı
+                # bırakılır ve wait() ile bekleyenler uyandırılır
+                if not retry_scheduled:
+                    self._finish_event(job_id)
+
+    async def _execute(self, job_id, lane, attempts):
+        """İşi bir kez çalıştırır; iş yeniden denemeye alındıysa True döndürür."""
+        payload = await asyncio.to_thread(self.backend.load_payload, job_id)
+        job = await asyncio.to_thread(self.backend.get, job_id)
+        if job is None or payload is None:
+            logger.warning(f"İş veya girdi verisi bulunamadı, atlanıyor: {job_id}")
+            return False
+
+        await asyncio.to_thread(self.backend.mark_running, job_id, attempts)
+        try:
+            result = await self.run_job(job, payload)
+        except JobRetryError as e:
+            delay = min(self.retry_delay * 2 ** (attempts - 1), self.max_retry_delay)
+            if time.time() + delay - job["created_at"] <= self.max_retry_age:
+                self._counters["retried"] += 1
+                await asyncio.to_thread(self.backend.mark_queued, job_id)
+                # Çalışan beklemez, sıradaki işe geçer; iş süre dolunca şeridinin başına döner
+                self._retry_timers[job_id] = asyncio.get_running_loop().call_later(
+                    delay, self._requeue, job_id, lane, attempts
+                )
+                return True
+            await self._fail(job_id, {"status": 503, "detail": str(e), "reason": "retries_exhausted"})
+        except JobFailedError as e:
+            await self._fail(job_id, {"status": e.status, "detail": str(e), "reason": e.reason})
+        except Exception as e:
+            logger.exception(f"İş başarısız oldu ({job_id}): {e}")
+            await self._fail(job_id, {"status": 500, "detail": "İş sırasında sunucuda beklenmedik bir hata oluştu.", "reason": None})
+        else:
+            await asyncio.to_thread(self.backend.finish, job_id, result)
+            self._counters["done"] += 1
+        return False
+
+    def _requeue(self, job_id, lane, attempts):
+        self._retry_timers.pop(job_id, None)
+        self._enqueue(job_id, lane, attempts, front=True)
+
+    async def _fail(self, job_id, error):
+        await asyncio.to_thread(self.backend.finish, job_id, None, error)
+        self._counters["failed"] += 1
+
+    def _release_payload(self, job_id):
+        self._queued_bytes -= self._payload_sizes.pop(job_id, 0)
+
+    def _finish_event(self, job_id):
+        self._release_payload(job_id)
+        event = self._done_events.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    async def _purge_loop(self):
+        interval = min(self.result_ttl, 60.0)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                purged = await asyncio.to_thread(self.backend.purge, time.time() - self.result_ttl)
+                if purged:
+                    logger.info(f"Süresi dolan {purged} iş silindi.")
+            except Exception as e:
+                logger.error(f"Süresi dolan işler silinirken hata: {e}")
+
+    def stats(self):
+        return {
+            "concurrency": self.concurrency,
+            "running": self._running,
+            "queued": {lane: len(queue) for lane, queue in self._lanes.items()},
+            "retry_waiting": len(self._retry_timers),
+            "max_queued": self.max_queued,
+            "queued_bytes": self._queued_bytes,
+            "max_queued_bytes": self.max_queued_bytes,
+            **self._counters,
+        }
@@ -1,13 +1,32 @@
 import os
-import shutil
-import uuid
+import io
+import asyncio
+import hmac
 import logging
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Query
+import tempfile
+import time
+import zipfile
+from datetime import datetime, timezone
+from fastapi import Depends, FastAPI, File, UploadFile, HTTPException, Form, Header, Query, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Optional
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from typing import List, Optional
+from pydantic import BaseModel
 
-# Refaktör edilmiş body_analysis modülünü import et
-from body_analysis import analyze_body, BodyAnalysisError, calculate_bmi, calculate_bmr, calculate_daily_calories, calculate_body_fat_percentage, calculate_ideal_weight
+# Görüntü bağımlılıkları (cv2, mediapipe) burada yüklenmez: hesaplama fonksiyonları hafif
+# `calculations` modülünden gelir, görüntü/video analizi ilk istekte veya başlangıç ısınmasında yüklenir
+from calculations import BodyAnalysisError, calculate_bmi, calculate_bmr, calculate_daily_calories, calculate_body_fat_percentage, calculate_ideal_weight
+from pose_pool import PosePoolError
+from result_cache import ResultCache
+from measurement_store import SQLiteMeasurementStore, analysis_metrics
+from schemas import ANALYSIS_RESPONSES, COMPACT_LABELS, FastJSONResponse, dumps, format_result
+from job_queue import LANE_WEIGHTS, InMemoryJobBackend, JobFailedError, JobQueueFullError, JobRetryError, JobScheduler, SQLiteJobBackend
+from image_header import ImageRejectedError, check_image_header
+from upload_intake import MAX_UPLOAD_BYTES, MULTIPART_OVERHEAD_BYTES, REJECTION_STATUS, RequestSizeLimitMiddleware, read_image_upload, rejection_to_http
+from bulk_calculations import bulk_result_to_json, calculate_metrics_bulk, read_csv_columns, read_parquet_columns
+from inference import InferenceExecutor, InferenceSaturatedError, InferenceTimeoutError, analyze_image_bytes, analyze_image_bytes_timed, analyze_video_path, combine_people, people_crop_landmarks, prepare_people_image_bytes
+import metrics
+from metrics import stage_timer
 
 # Logger yapılandırması
 logging.basicConfig(level=logging.INFO)
@@ -19,7 +38,84 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Çıkarım ayarları (ortam değişkenleriyle yapılandırılabilir)
+# INFERENCE_MODE: 'thread' (ortak Pose havuzu) veya 'process' (çekirdek başına süreç)
+INFERENCE_MODE = os.getenv("INFERENCE_MODE", "thread")
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", str(os.cpu_count() or 2)))
+INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", str(INFERENCE_WORKERS * 4)))
+INFERENCE_TIMEOUT = float(os.getenv("INFERENCE_TIMEOUT", "30"))
+POSE_CHECKOUT_TIMEOUT = float(os.getenv("POSE_CHECKOUT_TIMEOUT", "30"))
+POSE_HEALTH_CHECK_INTERVAL = float(os.getenv("POSE_HEALTH_CHECK_INTERVAL", "60"))
+# POSE_TIERS: tek görüntü analizinde sırayla denenen model_complexity kademeleri (0: lite, 1: full,
+# 2: heavy). Ucuz kademenin sonucu yeterince görünürse ağır kademeler çalıştırılmaz (eşik:
+# POSE_TIER_MIN_VISIBILITY). Varsayılan "1": her istek tek (full) modelle çalışır. Kademeli çıkarım
+# isteğe bağlıdır; açmadan önce lite/heavy modeller derleme sırasında provision_pose_models.py ile
+# indirilmeli ve kazanç benchmarks.bench_tiers ile bu donanımda ölçülmelidir. Modeli olmayan kademe atlanır.
+POSE_TIERS = tuple(int(c) for c in os.getenv("POSE_TIERS", "1").split(",") if c.strip())
+if not POSE_TIERS or any(c not in (0, 1, 2) for c in POSE_TIERS):
+    raise ValueError("Geçersiz POSE_TIERS. 0, 1 ve 2 değerlerinden oluşan virgülle ayrılmış liste olmalıdır.")
+
+# Sonuç önbelleği: aynı görüntü + cinsiyet için MediaPipe tekrar çalıştırılmaz
+# RESULT_CACHE_SIZE=0 bellek katmanını kapatır; RESULT_CACHE_DB verilirse SQLite disk katmanı açılır
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "512"))
+RESULT_CACHE_DB = os.getenv("RESULT_CACHE_DB")
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", "86400"))
+RESULT_CACHE_DISK_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_DISK_MAX_ENTRIES", "10000"))
+
+result_cache = None
+if RESULT_CACHE_SIZE > 0 or RESULT_CACHE_DB:
+    result_cache = ResultCache(
+        max_entries=RESULT_CACHE_SIZE,
+        disk_path=RESULT_CACHE_DB,
+        ttl=RESULT_CACHE_TTL,
+        max_disk_entries=RESULT_CACHE_DISK_MAX_ENTRIES,
+    )
+
+# Ölçüm geçmişi: user_id ile yapılan analiz ve hesaplamalar kullanıcı başına saklanır.
+# İsteğe bağlıdır: MEASUREMENT_DB (ör. measurements.db) verilmezse depo kapalıdır ve import sırasında
+# dosya oluşturulmaz. MEASUREMENT_EMA_ALPHA trend ortalamasının ağırlığıdır.
+# Geçmiş okuma uç noktaları (/users/{user_id}/measurements...) ve `user_id` ile geçmişe yazan istekler
+# `Authorization: Bearer <MEASUREMENT_API_TOKEN>` ister; aksi halde herkes başka bir kullanıcının
+# geçmişini okuyabilir veya sahte ölçümlerle özetini bozabilirdi. Token ayarlanmamışsa 403 döner.
+MEASUREMENT_DB = os.getenv("MEASUREMENT_DB", "")
+MEASUREMENT_API_TOKEN = os.getenv("MEASUREMENT_API_TOKEN", "")
+MEASUREMENT_EMA_ALPHA = float(os.getenv("MEASUREMENT_EMA_ALPHA", "0.3"))
+MEASUREMENT_QUERY_MAX_ROWS = int(os.getenv("MEASUREMENT_QUERY_MAX_ROWS", "5000"))
+
+measurement_store = None
+if MEASUREMENT_DB:
+    measurement_store = SQLiteMeasurementStore(MEASUREMENT_DB, ema_alpha=MEASUREMENT_EMA_ALPHA)
+
+# Video analizi sınırları
+VIDEO_MAX_BYTES = int(os.getenv("VIDEO_MAX_BYTES", str(200 * 1024 * 1024)))
+VIDEO_TIMEOUT = float(os.getenv("VIDEO_TIMEOUT", "120"))
+VIDEO_MAX_STREAMS = int(os.getenv("VIDEO_MAX_STREAMS", "4"))
+_active_video_streams = 0
+
+# Toplu analiz sınırları
+BATCH_MAX_IMAGES = int(os.getenv("BATCH_MAX_IMAGES", "64"))
+BATCH_MAX_TOTAL_BYTES = int(os.getenv("BATCH_MAX_TOTAL_BYTES", str(256 * 1024 * 1024)))
+BATCH_IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+# Toplu hesaplama sınırları (/calculate/bulk)
+BULK_MAX_ROWS = int(os.getenv("BULK_MAX_ROWS", "500000"))
+BULK_MAX_FILE_BYTES = int(os.getenv("BULK_MAX_FILE_BYTES", str(64 * 1024 * 1024)))
+
+# Gövde boyutu sınırları multipart ayrıştırılmadan önce uygulanır (bkz. upload_intake)
+app.add_middleware(
+    RequestSizeLimitMiddleware,
+    limits={
+        "/analyze_image/": MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES,
+        "/analyze_images/batch": BATCH_MAX_TOTAL_BYTES + MULTIPART_OVERHEAD_BYTES,
+        "/analyze_video/": VIDEO_MAX_BYTES + MULTIPART_OVERHEAD_BYTES,
+        "/calculate/bulk": BULK_MAX_FILE_BYTES + MULTIPART_OVERHEAD_BYTES,
+        "/jobs/analyze": MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES,
+    },
+)
+
 # CORS ayarları (Mobil uygulamadan ve webden erişim için gerekli olabilir)
+# Son eklenen ara katman en dışta çalışır: CORS boyut sınırından sonra eklenir ki 413 yanıtları
+# da CORS başlıklarını taşısın (aksi halde tarayıcı istemcileri nedeni göremez)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Geliştirme için tüm kaynaklara izin ver, produksiyonda kısıtla
@@ -28,52 +124,750 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-TEMP_IMAGE_DIR = "temp_images"
-if not os.path.exists(TEMP_IMAGE_DIR):
-    os.makedirs(TEMP_IMAGE_DIR)
+inference_executor = InferenceExecutor(
+    mode=INFERENCE_MODE,
+    max_workers=INFERENCE_WORKERS,
+    max_queue=INFERENCE_MAX_QUEUE,
+    timeout=INFERENCE_TIMEOUT,
+    pose_checkout_timeout=POSE_CHECKOUT_TIMEOUT,
+    pose_tiers=POSE_TIERS,
+)
+_health_check_task: Optional[asyncio.Task] = None
+_warmup_task: Optional[asyncio.Task] = None
+
+# Asenkron iş modu (/jobs/analyze): JOB_BACKEND 'memory' veya 'sqlite' (JOB_DB dosyasında, yeniden
+# başlatmada bekleyen işler devam eder). JOB_CONCURRENCY aynı anda çıkarıma gönderilen iş sayısıdır;
+# varsayılan çalışan sayısı kadardır, böylece iş modu senkron isteklerin kuyruk kapasitesini doldurmaz.
+# JOB_MAX_QUEUED_BYTES bekleyen işlerin yüklenen görsellerinin toplam boyut sınırıdır (0: sınırsız).
+# Çıkarım kapasitesi doluyken iş JOB_RETRY_DELAY'den başlayıp JOB_RETRY_MAX_DELAY'e kadar artan
+# aralıklarla yeniden denenir; oluşturulmasından JOB_RETRY_MAX_AGE saniye sonra 503 ile başarısız olur.
+JOB_BACKEND = os.getenv("JOB_BACKEND", "memory")
+JOB_DB = os.getenv("JOB_DB", "jobs.db")
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", str(INFERENCE_WORKERS)))
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", "1000"))
+JOB_MAX_QUEUED_BYTES = int(os.getenv("JOB_MAX_QUEUED_BYTES", str(256 * 1024 * 1024)))
+JOB_RETRY_DELAY = float(os.getenv("JOB_RETRY_DELAY", "0.5"))
+JOB_RETRY_MAX_DELAY = float(os.getenv("JOB_RETRY_MAX_DELAY", "10"))
+JOB_RETRY_MAX_AGE = float(os.getenv("JOB_RETRY_MAX_AGE", "300"))
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "3600"))
+JOB_MAX_WAIT = float(os.getenv("JOB_MAX_WAIT", "30"))
+
+if JOB_BACKEND not in ("memory", "sqlite"):
+    raise ValueError("Geçersiz JOB_BACKEND. 'memory' veya 'sqlite' olmalıdır.")
+job_backend = SQLiteJobBackend(JOB_DB) if JOB_BACKEND == "sqlite" else InMemoryJobBackend()
+job_scheduler: Optional[JobScheduler] = None
+
+# INFERENCE_WARMUP=1 (varsayılan): mediapipe/cv2 ve Pose modelleri başlangıçta arka planda yüklenir;
+# sunucu bu sırada isteklere yanıt vermeye başlar. 0 ise ilk görüntü isteğinde yüklenir.
+INFERENCE_WARMUP = os.getenv("INFERENCE_WARMUP", "1").lower() in ("1", "true", "yes")
+
+# SERVER_TIMING=1 ile analiz yanıtlarına aşama sürelerini içeren `Server-Timing` başlığı eklenir
+SERVER_TIMING = os.getenv("SERVER_TIMING", "0").lower() in ("1", "true", "yes")
+
+
+def _collect_runtime_metrics():
+    """/metrics isteğinde yürütücü, Pose havuzu ve önbellek durumunu göstergelere yansıtır."""
+    stats = inference_executor.stats()
+    metrics.QUEUE_DEPTH.set(stats["pending"])
+    metrics.QUEUE_CAPACITY.set(stats["capacity"])
+    metrics.INFERENCE_REJECTED.set_total(stats["rejected"])
+    metrics.INFERENCE_TIMED_OUT.set_total(stats["timed_out"])
+    pose_pool_stats = stats.get("pose_pool")
+    if pose_pool_stats:
+        metrics.POSE_POOL_IN_USE.set(pose_pool_stats["in_use"])
+        metrics.POSE_POOL_SIZE.set(pose_pool_stats["size"])
+    pose_tier_stats = stats.get("pose_tiers")
+    if pose_tier_stats:
+        for entry in pose_tier_stats["outcomes"]:
+            metrics.POSE_TIER_OUTCOMES.set_total(entry["count"], complexity=entry["complexity"], outcome=entry["outcome"])
+    if job_scheduler is not None:
+        job_stats = job_scheduler.stats()
+        for lane, depth in job_stats["queued"].items():
+            metrics.JOB_QUEUE_DEPTH.set(depth, lane=lane)
+        metrics.JOBS_RUNNING.set(job_stats["running"])
+        for event in ("submitted", "done", "failed", "retried", "rejected"):
+            metrics.JOB_EVENTS.set_total(job_stats[event], event=event)
+    if result_cache is not None:
+        cache_stats = result_cache.stats()
+        for event in ("memory_hits", "disk_hits", "misses", "memory_evictions", "disk_evictions", "expirations"):
+            metrics.CACHE_EVENTS.set_total(cache_stats[event], event=event)
+
+
+metrics.REGISTRY.add_collector(_collect_runtime_metrics)
+
+
+# İstek metrikleri saf ASGI ara katmanıyla toplanır; ölçüm kapalıyken hiç eklenmez
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.RequestMetricsMiddleware)
+
+
+async def _periodic_pose_health_check():
+    while True:
+        await asyncio.sleep(POSE_HEALTH_CHECK_INTERVAL)
+        try:
+            healthy = await asyncio.to_thread(inference_executor.health_check)
+            if healthy is not None:
+                logger.info(f"Pose havuzu sağlık kontrolü: {healthy}/{INFERENCE_WORKERS} sağlıklı")
+        except Exception as e:
+            logger.error(f"Pose havuzu sağlık kontrolü sırasında hata: {e}")
+
+
+async def _warm_up_inference():
+    start = time.perf_counter()
+    try:
+        await asyncio.to_thread(inference_executor.warm_up)
+        logger.info(f"Çıkarım ısınması tamamlandı: {time.perf_counter() - start:.2f} sn")
+    except Exception as e:
+        # Isınma başarısız olsa da ilk istek yürütücüyü yeniden başlatmayı dener
+        logger.error(f"Çıkarım ısınması sırasında hata: {e}")
+
+
+@app.on_event("startup")
+async def startup_inference():
+    global _health_check_task, _warmup_task, job_scheduler
+    job_scheduler = JobScheduler(
+        job_backend,
+        _run_analysis_job,
+        concurrency=JOB_CONCURRENCY,
+        max_queued=JOB_MAX_QUEUED,
+        max_queued_bytes=JOB_MAX_QUEUED_BYTES,
+        result_ttl=JOB_RESULT_TTL,
+        retry_delay=JOB_RETRY_DELAY,
+        max_retry_delay=JOB_RETRY_MAX_DELAY,
+        max_retry_age=JOB_RETRY_MAX_AGE,
+    )
+    await job_scheduler.start()
+    if INFERENCE_WARMUP:
+        _warmup_task = asyncio.create_task(_warm_up_inference())
+    if POSE_HEALTH_CHECK_INTERVAL > 0 and INFERENCE_MODE == "thread":
+        _health_check_task = asyncio.create_task(_periodic_pose_health_check())
+
+
+@app.on_event("shutdown")
+async def shutdown_inference():
+    if _health_check_task is not None:
+        _health_check_task.cancel()
+    if _warmup_task is not None:
+        _warmup_task.cancel()
+    if job_scheduler is not None:
+        await job_scheduler.stop()
+    job_backend.close()
+    inference_executor.shutdown()
+    if result_cache is not None:
+        result_cache.close()
+    if measurement_store is not None:
+        measurement_store.close()
+
+
+async def _analyze_image_cached(contents, gender, timings=None):
+    """
+    Önbellek ana süreçte, çalışan havuzunun önünde tutulur: isabet eden istekler
+    kuyruğa hiç girmez (süreç modunda da tüm çalışanlar aynı önbelleği paylaşır).
+    `timings` verilirse çalışan içindeki aşama süreleri ve kuyrukta bekleme süresi eklenir.
+    """
+    cache_key = None
+    if result_cache is not None and contents:
+        with stage_timer(timings, "cache_lookup"):
+            cache_key = result_cache.make_key(contents, gender)
+            cached = await result_cache.aget(cache_key)
+        if cached is not None:
+            return cached
+
+    if timings is None:
+        result = await inference_executor.run(analyze_image_bytes, contents, gender)
+    else:
+        start = time.perf_counter()
+        result, worker_stages = await inference_executor.run(analyze_image_bytes_timed, contents, gender)
+        # Çalışanda ölçülmeyen süre: kuyrukta bekleme, Pose havuzundan tahminleyici alma ve süreçler arası kopyalama
+        overhead = time.perf_counter() - start - sum(worker_stages.values())
+        timings.merge(worker_stages)
+        timings.merge({"executor_wait": max(overhead, 0.0)})
+    if cache_key is not None:
+        await result_cache.aput(cache_key, result)
+    return result
+
+
+async def _record_measurements(user_id, values, source):
+    """
+    Sonucu kullanıcının ölçüm geçmişine ekler. Kayıt hatası isteği başarısız kılmaz;
+    depo kapalıysa veya `user_id` verilmediyse hiçbir şey yapılmaz.
+    """
+    if measurement_store is None or not user_id or not values:
+        return
+    try:
+        await asyncio.to_thread(measurement_store.record, user_id, values, source)
+    except Exception as e:
+        logger.error(f"Ölçüm kaydedilemedi (kullanıcı: {user_id}, kaynak: {source}): {e}")
+
+
+def _check_measurement_token(authorization):
+    """Ölçüm geçmişine erişen isteğin `Authorization: Bearer <MEASUREMENT_API_TOKEN>` taşıdığını doğrular."""
+    if not MEASUREMENT_API_TOKEN:
+        raise HTTPException(status_code=403, detail="Ölçüm geçmişi uç noktaları için MEASUREMENT_API_TOKEN ayarlanmalıdır.")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.strip().encode(), MEASUREMENT_API_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Geçersiz veya eksik yetkilendirme.", headers={"WWW-Authenticate": "Bearer"})
+
+
+def _authorize_measurement_user(user_id, authorization):
+    """
+    Geçmişe yazılacak `user_id`'yi döndürür. Depo kapalıysa veya `user_id` verilmediyse None döner
+    (kayıt yapılmaz); aksi halde yazma da okuma gibi geçerli token ister.
+    """
+    if measurement_store is None or not user_id:
+        return None
+    _check_measurement_token(authorization)
+    return user_id
+
+
+_USER_ID_DESCRIPTION = "Verilirse sonuç kullanıcının ölçüm geçmişine eklenir (Authorization: Bearer token gerekir)"
+
+
+def _form_measurement_user(user_id: Optional[str] = Form(None, description=_USER_ID_DESCRIPTION),
+                           authorization: Optional[str] = Header(None)):
+    return _authorize_measurement_user(user_id, authorization)
+
+
+def _query_measurement_user(user_id: Optional[str] = Query(None, description=_USER_ID_DESCRIPTION),
+                            authorization: Optional[str] = Header(None)):
+    return _authorize_measurement_user(user_id, authorization)
+
 
-@app.post("/analyze_image/")
-async def create_upload_file_and_analyze(gender: str = Form("male"), file: UploadFile = File(...) ):
+_COMPACT_QUERY = Query(False, description="true ise kısa anahtarlı, sadece sayı içeren yanıt (etiketler: GET /schema/labels)")
+
+
+@app.post("/analyze_image/", responses=ANALYSIS_RESPONSES)
+async def create_upload_file_and_analyze(gender: str = Form("male"), file: UploadFile = File(...), user_id: Optional[str] = Depends(_form_measurement_user), compact: bool = _COMPACT_QUERY ):
     """
     Yüklenen bir resmi kullanarak vücut analizini gerçekleştirir.
 
     - **gender**: Analiz için cinsiyet ('male' veya 'female'). Varsayılan: 'male'.
     - **file**: Analiz edilecek resim dosyası.
+    - **user_id**: Verilirse sonuç kullanıcının ölçüm geçmişine eklenir (`Authorization: Bearer <token>` gerekir).
+    - **compact**: true ise sonuç kısa makine anahtarlarıyla ve etiketsiz döner.
     """
     if not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="Yüklenen dosya bir resim değil.")
 
-    temp_file_path = None
+    timings = metrics.StageTimings() if SERVER_TIMING else metrics.new_timings()
     try:
-        # Geçici bir dosya adı oluştur
-        file_extension = os.path.splitext(file.filename)[1]
-        temp_filename = f"{uuid.uuid4()}{file_extension}"
-        temp_file_path = os.path.join(TEMP_IMAGE_DIR, temp_filename)
-
-        # Dosyayı geçici yola kaydet
-        with open(temp_file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        logger.info(f"Resim geçici olarak şuraya kaydedildi: {temp_file_path}")
+        # Yükleme parçalar halinde sınırlı tampona okunur; diske yazılmaz. Resim olmayan,
+        # çok büyük veya boyutları aşırı yüklemeler çözme ve çıkarımdan önce reddedilir.
+        with stage_timer(timings, "upload_read"):
+            contents, _ = await read_image_upload(file)
+    except ImageRejectedError as e:
+        logger.warning(f"Yükleme reddedildi ({e.reason}): {e}")
+        metrics.ANALYSIS_FAILURES.inc(reason=e.reason)
+        raise rejection_to_http(e)
 
+    try:
         # Vücut analizini yap
-        analysis_results = analyze_body(temp_file_path, gender)
-        return analysis_results
+        # Analiz çalışan havuzunda yürütülür, olay döngüsü diğer isteklere hizmet etmeye devam eder
+        analysis_results = await _analyze_image_cached(contents, gender, timings)
+        metrics.observe_stages(timings)
+        await _record_measurements(user_id, analysis_metrics(analysis_results), "image")
+        headers = {"Server-Timing": timings.server_timing_header()} if SERVER_TIMING else None
+        # Sonuç zaten JSON uyumlu; jsonable_encoder ve doğrulama atlanarak doğrudan yazılır
+        return FastJSONResponse(format_result(analysis_results, compact), headers=headers)
         
     except BodyAnalysisError as e:
         logger.error(f"Vücut analizi hatası: {e}")
+        metrics.ANALYSIS_FAILURES.inc(reason=e.reason)
         raise HTTPException(status_code=400, detail=str(e))
+    except (InferenceSaturatedError, PosePoolError) as e:
+        logger.warning(f"Analiz kapasitesi dolu: {e}")
+        raise HTTPException(status_code=503, detail="Sunucu şu anda yoğun, lütfen daha sonra tekrar deneyin.", headers={"Retry-After": "1"})
+    except InferenceTimeoutError as e:
+        logger.error(f"Analiz zaman aşımı: {e}")
+        raise HTTPException(status_code=504, detail="Görüntü analizi zaman aşımına uğradı.")
     except Exception as e:
         logger.exception(f"Beklenmedik bir sunucu hatası oluştu: {e}") # exc_info=True gibi davranır
         raise HTTPException(status_code=500, detail="Görüntü analizi sırasında sunucuda beklenmedik bir hata oluştu.")
+
+async def _run_analysis_job(job, payload):
+    """İş zamanlayıcısının çalıştırdığı analiz; hatalar iş kaydına yazılacak durum kodlarına çevrilir."""
+    params = job["params"]
+    try:
+        timings = metrics.new_timings()
+        result = await _analyze_image_cached(bytes(payload), params["gender"], timings)
+        metrics.observe_stages(timings)
+    except BodyAnalysisError as e:
+        metrics.ANALYSIS_FAILURES.inc(reason=e.reason)
+        raise JobFailedError(str(e), status=400, reason=e.reason)
+    except (InferenceSaturatedError, PosePoolError) as e:
+        # Senkron istekler kapasiteyi doldurduysa iş kuyrukta bekler, başarısız sayılmaz
+        raise JobRetryError(str(e))
+    except InferenceTimeoutError:
+        raise JobFailedError("Görüntü analizi zaman aşımına uğradı.", status=504, reason="timeout")
+    await _record_measurements(params.get("user_id"), analysis_metrics(result), "job")
+    return result
+
+
+def _job_view(job, compact=False):
+    view = {
+        "id": job["id"],
+        "status": job["status"],
+        "priority": job["priority"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+    }
+    if job["result"] is not None:
+        view["result"] = format_result(job["result"], compact)
+    if job["error"] is not None:
+        view["error"] = job["error"]
+    return view
+
+
+@app.post("/jobs/analyze", status_code=202)
+async def submit_analysis_job(gender: str = Form("male"), file: UploadFile = File(...),
+                              priority: str = Form("normal"), user_id: Optional[str] = Depends(_form_measurement_user)):
+    """
+    Vücut analizini asenkron iş olarak kuyruğa ekler ve iş kimliğini hemen döndürür (202).
+
+    - **gender**: Analiz için cinsiyet ('male' veya 'female'). Varsayılan: 'male'.
+    - **file**: Analiz edilecek resim dosyası.
+    - **priority**: Öncelik şeridi: 'high', 'normal' veya 'low'. Varsayılan: 'normal'.
+    - **user_id**: Verilirse sonuç kullanıcının ölçüm geçmişine eklenir (`Authorization: Bearer <token>` gerekir).
+
+    Sonuç `GET /jobs/{id}` ile alınır; `wait` parametresiyle iş bitene kadar beklenebilir.
+    """
+    if priority not in LANE_WEIGHTS:
+        raise HTTPException(status_code=400, detail=f"Geçersiz öncelik. Seçenekler: {', '.join(LANE_WEIGHTS)}")
+    if not (file.content_type or "").startswith("image/"):
+        raise HTTPException(status_code=400, detail="Yüklenen dosya bir resim değil.")
+    try:
+        contents, _ = await read_image_upload(file)
+    except ImageRejectedError as e:
+        logger.warning(f"Yükleme reddedildi ({e.reason}): {e}")
+        metrics.ANALYSIS_FAILURES.inc(reason=e.reason)
+        raise rejection_to_http(e)
+
+    try:
+        job = await job_scheduler.submit({"gender": gender, "user_id": user_id}, contents, priority)
+    except JobQueueFullError:
+        raise HTTPException(status_code=503, detail="İş kuyruğu dolu, lütfen daha sonra tekrar deneyin.", headers={"Retry-After": "5"})
+    return FastJSONResponse(_job_view(job), status_code=202, headers={"Location": f"/jobs/{job['id']}"})
+
+
+@app.get("/jobs/{job_id}")
+async def get_analysis_job(job_id: str, wait: float = Query(0, ge=0, description="İş bitene kadar en fazla bu kadar saniye bekle (long polling)"),
+                           compact: bool = _COMPACT_QUERY):
+    """
+    İşin durumunu döndürür: queued, running, done (`result` ile) veya failed (`error` ile).
+    `wait` verilirse iş bitene veya süre dolana kadar yanıt bekletilir (üst sınır JOB_MAX_WAIT).
+    """
+    job = await job_scheduler.wait(job_id, min(wait, JOB_MAX_WAIT))
+    if job is None:
+        raise HTTPException(status_code=404, detail="İş bulunamadı veya süresi doldu.")
+    return FastJSONResponse(_job_view(job, compact))
+
+
+@app.get("/jobs")
+async def get_job_stats():
+    """İş kuyruğunun şerit başına derinliğini ve sayaçlarını döndürür."""
+    return {"backend": JOB_BACKEND, **job_scheduler.stats()}
+
+
+def _expand_batch_uploads(uploads):
+    """
+    (dosya adı, içerik) listesini açar: zip arşivlerinin içindeki resimleri ayrı öğeler olarak ekler.
+    Sınırlar aşılırsa HTTPException fırlatır.
+    """
+    items = []
+    total_bytes = 0
+
+    def add(name, data):
+        nonlocal total_bytes
+        total_bytes += len(data)
+        if len(items) >= BATCH_MAX_IMAGES:
+            raise HTTPException(status_code=413, detail=f"Bir toplu istekte en fazla {BATCH_MAX_IMAGES} resim gönderilebilir.")
+        if total_bytes > BATCH_MAX_TOTAL_BYTES:
+            raise HTTPException(status_code=413, detail="Toplu istek boyutu sınırı aşıldı.")
+        items.append((name, data))
+
+    for filename, content_type, data in uploads:
+        is_zip = content_type in ("application/zip", "application/x-zip-compressed") or (filename or "").lower().endswith(".zip")
+        if not is_zip:
+            if not content_type.startswith("image/"):
+                raise HTTPException(status_code=400, detail=f"Yüklenen dosya bir resim değil: {filename}")
+            add(filename, data)
+            continue
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                for info in archive.infolist():
+                    if info.is_dir() or not info.filename.lower().endswith(BATCH_IMAGE_EXTENSIONS):
+                        continue
+                    # Sıkıştırma bombalarına karşı açmadan önce beyan edilen boyutu kontrol et
+                    if total_bytes + info.file_size > BATCH_MAX_TOTAL_BYTES:
+                        raise HTTPException(status_code=413, detail="Toplu istek boyutu sınırı aşıldı.")
+                    add(info.filename, archive.read(info))
+        except zipfile.BadZipFile:
+            raise HTTPException(status_code=400, detail=f"Zip arşivi okunamadı: {filename}")
+    if not items:
+        raise HTTPException(status_code=400, detail="Analiz edilecek resim bulunamadı.")
+    return items
+
+
+async def _analyze_batch_item(index, filename, data, gender, semaphore, user_id=None, compact=False):
+    try:
+        if len(data) > MAX_UPLOAD_BYTES:
+            raise ImageRejectedError("Resim boyutu sınırı aşıldı.", reason="too_large")
+        check_image_header(data)
+    except ImageRejectedError as e:
+        # Geçersiz öğeler kuyruğa ve semafora hiç girmez
+        metrics.ANALYSIS_FAILURES.inc(reason=e.reason)
+        return {"index": index, "filename": filename, "status": REJECTION_STATUS.get(e.reason, 400), "error": str(e)}
+
+    async with semaphore:
+        try:
+            timings = metrics.new_timings()
+            result = await _analyze_image_cached(data, gender, timings)
+            metrics.observe_stages(timings)
+            await _record_measurements(user_id, analysis_metrics(result), "image_batch")
+            return {"index": index, "filename": filename, "status": 200, "result": format_result(result, compact)}
+        except BodyAnalysisError as e:
+            metrics.ANALYSIS_FAILURES.inc(reason=e.reason)
+            return {"index": index, "filename": filename, "status": 400, "error": str(e)}
+        except (InferenceSaturatedError, PosePoolError):
+            return {"index": index, "filename": filename, "status": 503, "error": "Sunucu şu anda yoğun, lütfen daha sonra tekrar deneyin."}
+        except InferenceTimeoutError:
+            return {"index": index, "filename": filename, "status": 504, "error": "Görüntü analizi zaman aşımına uğradı."}
+        except Exception as e:
+            logger.exception(f"Toplu analizde beklenmedik hata ({filename}): {e}")
+            return {"index": index, "filename": filename, "status": 500, "error": "Görüntü analizi sırasında sunucuda beklenmedik bir hata oluştu."}
+
+
+async def _batch_item_line(index, filename, data, gender, semaphore, user_id=None, compact=False):
+    """
+    Bir öğenin NDJSON satırını üretir. Öğe içindeki beklenmedik hatalar (başlık kontrolü,
+    kayıt veya JSON'a yazma dahil) akışı kesmez; o öğe için 500 satırı döner.
+    """
+    try:
+        line = await _analyze_batch_item(index, filename, data, gender, semaphore, user_id, compact)
+        return dumps(line) + b"\n"
+    except Exception as e:
+        logger.exception(f"Toplu analizde öğe satırı üretilemedi ({filename}): {e}")
+        return dumps({"index": index, "filename": filename, "status": 500,
+                      "error": "Görüntü analizi sırasında sunucuda beklenmedik bir hata oluştu."}) + b"\n"
+
+
+async def _analyze_people(contents, gender):
+    """
+    Çok kişili analiz: çözme ve kişi tespiti, her bölgenin Pose çıkarımı ve birleştirme ayrı
+    yürütücü işleridir. Bölgeler paralel çalışsa da her biri yürütücüde bir yer tutar; bir istek
+    aynı anda en fazla çalışan sayısı kadar bölge gönderir ve kuyruğu tek başına dolduramaz.
+    """
+    original_shape, crops = await inference_executor.run(prepare_people_image_bytes, contents)
+    semaphore = asyncio.Semaphore(inference_executor.max_workers)
+
+    async def detect(crop, wider, score):
+        async with semaphore:
+            found = await inference_executor.run(people_crop_landmarks, crop, wider)
+        roi, landmarks = found if found is not None else (crop.roi, None)
+        return roi, score, landmarks
+
+    tasks = [asyncio.create_task(detect(crop, wider, score)) for crop, wider, score in crops]
+    try:
+        detections = await asyncio.gather(*tasks)
+    finally:
+        # Bir bölge başarısız olursa (ör. kapasite dolu) diğerleri boşuna beklemesin
+        for task in tasks:
+            task.cancel()
+    return await inference_executor.run(combine_people, original_shape, detections, gender)
+
+
+@app.post("/analyze_image/people")
+async def analyze_image_people(gender: str = Form("male"), file: UploadFile = File(...), compact: bool = _COMPACT_QUERY):
+    """
+    Grup fotoğrafı veya yan yana kolajdaki tüm kişileri tek yüklemede analiz eder.
+
+    - **gender**: Tüm kişiler için cinsiyet ('male' veya 'female'). Varsayılan: 'male'.
+    - **file**: Analiz edilecek resim dosyası.
+    - **compact**: true ise kişi sonuçları kısa makine anahtarlarıyla döner.
+
+    Görüntü bir kez çözülür, kişi bölgeleri bulunur ve her bölge paralel olarak analiz edilir.
+    Yanıt: `count` ve soldan sağa `people` listesi (`bbox` [x, y, w, h] orijinal piksel
+    koordinatlarında, `score`, `result` ya da `error`).
+    """
+    if not (file.content_type or "").startswith("image/"):
+        raise HTTPException(status_code=400, detail="Yüklenen dosya bir resim değil.")
+    try:
+        contents, _ = await read_image_upload(file)
+    except ImageRejectedError as e:
+        logger.warning(f"Yükleme reddedildi ({e.reason}): {e}")
+        metrics.ANALYSIS_FAILURES.inc(reason=e.reason)
+        raise rejection_to_http(e)
+
+    try:
+        cache_key = result_cache.make_key(contents, f"{gender}:people") if result_cache is not None else None
+        analysis = await result_cache.aget(cache_key) if cache_key is not None else None
+        if analysis is None:
+            analysis = await _analyze_people(contents, gender)
+            if cache_key is not None:
+                await result_cache.aput(cache_key, analysis)
+    except BodyAnalysisError as e:
+        logger.error(f"Çok kişili analiz hatası: {e}")
+        metrics.ANALYSIS_FAILURES.inc(reason=e.reason)
+        raise HTTPException(status_code=400, detail=str(e))
+    except (InferenceSaturatedError, PosePoolError) as e:
+        logger.warning(f"Analiz kapasitesi dolu: {e}")
+        raise HTTPException(status_code=503, detail="Sunucu şu anda yoğun, lütfen daha sonra tekrar deneyin.", headers={"Retry-After": "1"})
+    except InferenceTimeoutError as e:
+        logger.error(f"Analiz zaman aşımı: {e}")
+        raise HTTPException(status_code=504, detail="Görüntü analizi zaman aşımına uğradı.")
+    except Exception as e:
+        logger.exception(f"Çok kişili analizde beklenmedik hata: {e}")
+        raise HTTPException(status_code=500, detail="Görüntü analizi sırasında sunucuda beklenmedik bir hata oluştu.")
+
+    people = [
+        {**person, "result": format_result(person["result"], compact)} if "result" in person else person
+        for person in analysis["people"]
+    ]
+    return FastJSONResponse({"count": analysis["count"], "people": people})
+
+
+@app.post("/analyze_images/batch")
+async def analyze_images_batch(gender: str = Form("male"), files: List[UploadFile] = File(...), user_id: Optional[str] = Depends(_form_measurement_user),
+                               compact: bool = _COMPACT_QUERY):
+    """
+    Birden fazla resmi (veya resim içeren zip arşivlerini) tek istekte analiz eder.
+
+    - **gender**: Tüm resimler için cinsiyet ('male' veya 'female'). Varsayılan: 'male'.
+    - **files**: Resim dosyaları ve/veya zip arşivleri.
+    - **user_id**: Verilirse başarılı her sonuç kullanıcının ölçüm geçmişine eklenir (`Authorization: Bearer <token>` gerekir).
+
+    Sonuçlar bittikçe NDJSON (satır başına bir JSON) olarak akıtılır; her satır
+    `index`, `filename`, `status` ve `result` ya da `error` alanlarını içerir.
+    """
+    uploads = [(f.filename, f.content_type or "", await f.read()) for f in files]
+    items = _expand_batch_uploads(uploads)
+    logger.info(f"Toplu analiz başladı: {len(items)} resim")
+
+    # Bir toplu istek kuyruğu tek başına doldurup diğer istemcileri 503'e düşürmesin
+    semaphore = asyncio.Semaphore(inference_executor.max_workers)
+
+    async def result_stream():
+        tasks = [
+            asyncio.create_task(_batch_item_line(index, name, data, gender, semaphore, user_id, compact))
+            for index, (name, data) in enumerate(items)
+        ]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            # İstemci bağlantıyı koparırsa bekleyen işleri iptal et
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
+
+@app.post("/analyze_video/")
+async def analyze_video(gender: str = Form("male"), file: UploadFile = File(...), user_id: Optional[str] = Depends(_form_measurement_user),
+                        compact: bool = _COMPACT_QUERY):
+    """
+    Kısa bir dönüş (turn-around) videosundan tek ve kararlı bir vücut analizi üretir.
+
+    - **gender**: Analiz için cinsiyet ('male' veya 'female'). Varsayılan: 'male'.
+    - **file**: Analiz edilecek video dosyası (mp4, mov, webm...).
+    - **user_id**: Verilirse sonuç kullanıcının ölçüm geçmişine eklenir (`Authorization: Bearer <token>` gerekir).
+
+    Pose takip modunda çalışır, kareler uyarlamalı olarak alt örneklenir ve kare
+    ölçümleri aykırı değerler ayıklanarak birleştirilir.
+    """
+    if file.content_type and not file.content_type.startswith("video/"):
+        raise HTTPException(status_code=400, detail="Yüklenen dosya bir video değil.")
+
+    # cv2.VideoCapture bellekten okuyamadığı için video geçici dosyaya yazılır
+    suffix = os.path.splitext(file.filename or "")[1] or ".mp4"
+    temp = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
+    try:
+        written = 0
+        with temp:
+            while True:
+                chunk = await file.read(1024 * 1024)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > VIDEO_MAX_BYTES:
+                    raise HTTPException(status_code=413, detail="Video boyutu sınırı aşıldı.")
+                temp.write(chunk)
+
+        summary = await inference_executor.run(analyze_video_path, temp.name, gender, timeout=VIDEO_TIMEOUT)
+        await _record_measurements(user_id, analysis_metrics(summary["result"]), "video")
+        return FastJSONResponse({"result": format_result(summary["result"], compact), "frames": summary["frames"]})
+    except BodyAnalysisError as e:
+        logger.error(f"Video analizi hatası: {e}")
+        metrics.ANALYSIS_FAILURES.inc(reason=e.reason)
+        raise HTTPException(status_code=400, detail=str(e))
+    except (InferenceSaturatedError, PosePoolError) as e:
+        logger.warning(f"Analiz kapasitesi dolu: {e}")
+        raise HTTPException(status_code=503, detail="Sunucu şu anda yoğun, lütfen daha sonra tekrar deneyin.", headers={"Retry-After": "1"})
+    except InferenceTimeoutError as e:
+        logger.error(f"Video analizi zaman aşımı: {e}")
+        raise HTTPException(status_code=504, detail="Video analizi zaman aşımına uğradı.")
+    finally:
+        try:
+            os.remove(temp.name)
+        except OSError as e:
+            logger.error(f"Geçici video silinirken hata: {temp.name}, Hata: {e}")
+
+
+def _new_video_analyzer(gender):
+    # video_analysis (cv2 + mediapipe) ilk canlı akış isteğinde yüklenir
+    from video_analysis import VideoBodyAnalyzer
+    return VideoBodyAnalyzer(gender)
+
+
+@app.websocket("/ws/analyze_video/")
+async def analyze_video_stream(websocket: WebSocket, gender: str = "male", user_id: Optional[str] = None, compact: bool = False):
+    """
+    Canlı kare akışı ile vücut analizi.
+
+    İstemci her kareyi ikili (JPEG/PNG) mesaj olarak gönderir; analiz edilen her kare için
+    `{"frame", "detected"}`, atlanan kareler için `{"frame", "skipped": true}` döner.
+    İstemci "end" metin mesajı gönderdiğinde birleştirilmiş sonuç gönderilir ve bağlantı kapanır.
+    `user_id` sorgu parametresi verilirse birleştirilmiş sonuç ölçüm geçmişine eklenir; bunun için
+    bağlantı isteği `Authorization: Bearer <token>` başlığını taşımalıdır.
+    """
+    global _active_video_streams
+    await websocket.accept()
+    try:
+        user_id = _authorize_measurement_user(user_id, websocket.headers.get("authorization"))
+    except HTTPException as e:
+        await websocket.send_json({"error": e.detail})
+        await websocket.close(code=1008)  # Policy Violation
+        return
+    if _active_video_streams >= VIDEO_MAX_STREAMS:
+        await websocket.send_json({"error": "Sunucu şu anda yoğun, lütfen daha sonra tekrar deneyin."})
+        await websocket.close(code=1013)  # Try Again Later
+        return
+
+    _active_video_streams += 1
+    analyzer = None
+    try:
+        # Yuva sayacı artırıldıktan sonraki her şey try içinde: analizci oluşturulamazsa da yuva bırakılır
+        try:
+            analyzer = await asyncio.to_thread(_new_video_analyzer, gender)
+        except Exception as e:
+            logger.error(f"Canlı video analizcisi oluşturulamadı: {e}")
+            await websocket.send_json({"error": "Video analizi başlatılamadı, lütfen daha sonra tekrar deneyin."})
+            await websocket.close(code=1011)  # Internal Error
+            return
+        started = time.monotonic()
+        frame_index = 0
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("text") is not None:
+                if message["text"].strip().lower() == "end":
+                    try:
+                        summary = await asyncio.to_thread(analyzer.summary)
+                        await _record_measurements(user_id, analysis_metrics(summary["result"]), "video_stream")
+                        summary["result"] = format_result(summary["result"], compact)
+                        await websocket.send_json(summary)
+                    except BodyAnalysisError as e:
+                        await websocket.send_json({"error": str(e)})
+                    await websocket.close()
+                    break
+                continue
+
+            data = message.get("bytes")
+            if not data:
+                continue
+            # Kareler geliş zamanına göre alt örneklenir; takip durumu bağlantıya özel
+            # olduğu için kareler sırayla (aynı anda tek kare) işlenir
+            if not analyzer.should_process(time.monotonic() - started):
+                await websocket.send_json({"frame": frame_index, "skipped": True})
+            else:
+                try:
+                    detected = await asyncio.to_thread(analyzer.process_encoded_frame, data)
+                    await websocket.send_json({"frame": frame_index, "detected": detected})
+                except BodyAnalysisError as e:
+                    await websocket.send_json({"frame": frame_index, "error": str(e)})
+            frame_index += 1
+    except WebSocketDisconnect:
+        pass
     finally:
-        # Geçici dosyayı sil
-        if temp_file_path and os.path.exists(temp_file_path):
-            try:
-                os.remove(temp_file_path)
-                logger.info(f"Geçici resim silindi: {temp_file_path}")
-            except Exception as e:
-                logger.error(f"Geçici resim silinirken hata: {temp_file_path}, Hata: {e}")
+        _active_video_streams -= 1
+        if analyzer is not None:
+            await asyncio.to_thread(analyzer.close)
+
+
+@app.get("/schema/labels")
+async def get_schema_labels():
+    """
+    Kompakt yanıt anahtarlarının birimlerini ve dillere göre görüntü etiketlerini döndürür.
+    İstemciler bu tabloyu bir kez alıp etiketleri kendi tarafında yerelleştirir.
+    """
+    return FastJSONResponse(COMPACT_LABELS, headers={"Cache-Control": "public, max-age=86400"})
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """İstek, aşama süresi, hata, kuyruk ve havuz metriklerini Prometheus metin formatında döndürür."""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Sonuç önbelleğinin isabet/ıska/tahliye sayaçlarını döndürür."""
+    if result_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **result_cache.stats()}
+
+def _require_measurement_store(authorization: Optional[str] = Header(None)):
+    """Ölçüm geçmişi uç noktalarının bağımlılığı: depo açık olmalı ve istek geçerli token taşımalıdır."""
+    if measurement_store is None:
+        raise HTTPException(status_code=404, detail="Ölçüm geçmişi kapalı (MEASUREMENT_DB ayarlanmamış).")
+    _check_measurement_token(authorization)
+    return measurement_store
+
+
+def _to_timestamp(value):
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        # Saat dilimi belirtilmeyen zamanlar UTC kabul edilir
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+@app.get("/users/{user_id}/measurements")
+async def get_user_measurements(user_id: str,
+                                metric: Optional[str] = Query(None, description="Metrik adı (ör. bmi, image_body_fat_percentage)"),
+                                start: Optional[datetime] = Query(None, description="Başlangıç zamanı (ISO 8601 veya epoch sn, dahil)"),
+                                end: Optional[datetime] = Query(None, description="Bitiş zamanı (ISO 8601 veya epoch sn, hariç)"),
+                                limit: int = Query(1000, gt=0, description="En fazla döndürülecek kayıt sayısı"),
+                                store=Depends(_require_measurement_store)):
+    """Kullanıcının [start, end) aralığındaki ham ölçümlerini zamana göre artan sırada döndürür."""
+    rows = await asyncio.to_thread(
+        store.query, user_id, metric, _to_timestamp(start), _to_timestamp(end), min(limit, MEASUREMENT_QUERY_MAX_ROWS)
+    )
+    return {"user_id": user_id, "count": len(rows), "measurements": rows}
+
+
+@app.get("/users/{user_id}/measurements/summary")
+async def get_user_measurement_summary(user_id: str, metric: Optional[str] = Query(None, description="Metrik adı (boşsa hepsi)"),
+                                       store=Depends(_require_measurement_store)):
+    """
+    Metrik başına artımlı tutulan özeti döndürür: adet, ortalama, min/max, son değer ve
+    üstel hareketli ortalama (ema). Ham kayıtlar taranmaz.
+    """
+    summary = await asyncio.to_thread(store.summary, user_id, metric)
+    return {"user_id": user_id, "metrics": summary}
+
+
+@app.get("/users/{user_id}/measurements/weekly")
+async def get_user_measurement_weekly(user_id: str,
+                                      metric: str = Query(..., description="Metrik adı"),
+                                      start: Optional[datetime] = Query(None, description="Başlangıç zamanı (ISO 8601 veya epoch sn)"),
+                                      end: Optional[datetime] = Query(None, description="Bitiş zamanı (ISO 8601 veya epoch sn, hariç)"),
+                                      store=Depends(_require_measurement_store)):
+    """Haftalık kovaları (Pazartesi 00:00 UTC başlangıçlı; adet, ortalama, min, max) döndürür."""
+    weeks = await asyncio.to_thread(store.weekly, user_id, metric, _to_timestamp(start), _to_timestamp(end))
+    return {"user_id": user_id, "metric": metric, "weeks": weeks}
 
 # Diğer hesaplama fonksiyonları için de endpoint'ler eklenebilir (isteğe bağlı)
 # Bu fonksiyonlar `body_analysis.py` içinde zaten var ve import edildi.
@@ -81,9 +875,11 @@ async def create_upload_file_and_analyze(gender: str = Form("male"), file: Uploa
 
 @app.get("/calculate/bmi/")
 async def get_bmi(weight: float = Query(..., gt=0, description="Kilogram cinsinden ağırlık"), 
-                height: float = Query(..., gt=0, description="Santimetre cinsinden boy") ):
+                height: float = Query(..., gt=0, description="Santimetre cinsinden boy"), 
+                user_id: Optional[str] = Depends(_query_measurement_user) ):
     try:
         bmi = calculate_bmi(weight, height)
+        await _record_measurements(user_id, {"bmi": bmi}, "calculate")
         return {"bmi": bmi, "unit": "kg/m^2"}
     except BodyAnalysisError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -92,18 +888,22 @@ async def get_bmi(weight: float = Query(..., gt=0, description="Kilogram cinsind
 async def get_bmr(weight: float = Query(..., gt=0, description="Kilogram cinsinden ağırlık"), 
                 height: float = Query(..., gt=0, description="Santimetre cinsinden boy"), 
                 age: int = Query(..., gt=0, description="Yıl cinsinden yaş"), 
-                gender: str = Query(..., description="Cinsiyet: 'male' veya 'female'") ):
+                gender: str = Query(..., description="Cinsiyet: 'male' veya 'female'"), 
+                user_id: Optional[str] = Depends(_query_measurement_user) ):
     try:
         bmr = calculate_bmr(weight, height, age, gender)
+        await _record_measurements(user_id, {"bmr": bmr}, "calculate")
         return {"bmr": bmr, "unit": "calories/day"}
     except BodyAnalysisError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/calculate/daily_calories/")
 async def get_daily_calories(bmr: float = Query(..., gt=0, description="Bazal Metabolizma Hızı (kalori/gün)"), 
-                           activity_level: str = Query(..., description="Aktivite Seviyesi: sedentary, light, moderate, very, extra") ):
+                           activity_level: str = Query(..., description="Aktivite Seviyesi: sedentary, light, moderate, very, extra"), 
+                           user_id: Optional[str] = Depends(_query_measurement_user) ):
     try:
         calories = calculate_daily_calories(bmr, activity_level)
+        await _record_measurements(user_id, {"daily_calories": calories}, "calculate")
         return {"daily_calories": calories, "unit": "calories/day"}
     except BodyAnalysisError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -111,23 +911,93 @@ async def get_daily_calories(bmr: float = Query(..., gt=0, description="Bazal Me
 @app.get("/calculate/body_fat_percentage/")
 async def get_body_fat_percentage(bmi: float = Query(..., description="Vücut Kitle İndeksi (kg/m^2)"), 
                                 age: int = Query(..., gt=0, description="Yıl cinsinden yaş"), 
-                                gender: str = Query(..., description="Cinsiyet: 'male' veya 'female'") ):
+                                gender: str = Query(..., description="Cinsiyet: 'male' veya 'female'"), 
+                                user_id: Optional[str] = Depends(_query_measurement_user) ):
     try:
         bfp = calculate_body_fat_percentage(bmi, age, gender)
+        await _record_measurements(user_id, {"body_fat_percentage": bfp}, "calculate")
         return {"body_fat_percentage": bfp, "unit": "%"}
     except BodyAnalysisError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/calculate/ideal_weight/")
 async def get_ideal_weight(height: float = Query(..., gt=0, description="Santimetre cinsinden boy"), 
-                         gender: str = Query(..., description="Cinsiyet: 'male' veya 'female'") ):
+                         gender: str = Query(..., description="Cinsiyet: 'male' veya 'female'"), 
+                         user_id: Optional[str] = Depends(_query_measurement_user) ):
     try:
         iw = calculate_ideal_weight(height, gender)
+        await _record_measurements(user_id, {"ideal_weight": iw}, "calculate")
         return {"ideal_weight": iw, "unit": "kg"}
     except BodyAnalysisError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+class BulkCalculationRequest(BaseModel):
+    """Sütun halinde girdiler; her liste bir sütundur ve tüm listeler aynı uzunlukta olmalıdır."""
+    weight: Optional[List[Optional[float]]] = None
+    height: Optional[List[Optional[float]]] = None
+    age: Optional[List[Optional[float]]] = None
+    gender: Optional[List[Optional[str]]] = None
+    activity_level: Optional[List[Optional[str]]] = None
+    metrics: Optional[List[str]] = None
+
+
+def _run_bulk_calculation(columns, metrics_filter=None):
+    try:
+        result = calculate_metrics_bulk(**columns, metrics=metrics_filter)
+    except BodyAnalysisError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return bulk_result_to_json(result)
+
+
+@app.post("/calculate/bulk")
+async def calculate_bulk(request: BulkCalculationRequest):
+    """
+    BMI, BMR, günlük kalori, vücut yağ oranı ve ideal kiloyu sütun halindeki girdiler için tek
+    istekte, vektörleştirilmiş olarak hesaplar.
+
+    Geçersiz satırlar tüm isteği başarısız kılmaz: o satırın etkilenen metrikleri `null` olur ve
+    `errors` listesinde satır numarası ile hata kodları döner.
+    """
+    columns = request.model_dump(exclude={"metrics"})
+    lengths = [len(v) for v in columns.values() if v is not None]
+    if lengths and max(lengths) > BULK_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"Bir toplu istekte en fazla {BULK_MAX_ROWS} satır gönderilebilir.")
+    return await asyncio.to_thread(_run_bulk_calculation, columns, request.metrics)
+
+
+@app.post("/calculate/bulk/file")
+async def calculate_bulk_file(file: UploadFile = File(...), metric_names: Optional[str] = Form(None, alias="metrics")):
+    """
+    CSV veya Parquet dosyasındaki tüm satırlar için metrikleri hesaplar.
+
+    - **file**: weight, height, age, gender, activity_level sütunlarından gerekenleri içeren CSV/Parquet.
+    - **metrics**: Virgülle ayrılmış metrik listesi (varsayılan: hepsi). Seçenekler: bmi, bmr,
+      daily_calories, body_fat_percentage, ideal_weight.
+    """
+    contents = await file.read(BULK_MAX_FILE_BYTES + 1)
+    if len(contents) > BULK_MAX_FILE_BYTES:
+        raise HTTPException(status_code=413, detail="Dosya boyutu sınırı aşıldı.")
+
+    filename = (file.filename or "").lower()
+    is_parquet = filename.endswith(".parquet") or contents[:4] == b"PAR1"
+    # Form alanı "metrics" adını korur; parametre adı metrics modülünü gölgelemesin diye farklıdır
+    metrics_filter = [m.strip() for m in metric_names.split(",") if m.strip()] if metric_names else None
+
+    def run():
+        try:
+            if is_parquet:
+                columns = read_parquet_columns(contents, max_rows=BULK_MAX_ROWS)
+            else:
+                columns = read_csv_columns(contents, max_rows=BULK_MAX_ROWS)
+        except BodyAnalysisError as e:
+            status = {"too_many_rows": 413, "parquet_unavailable": 415}.get(e.reason, 400)
+            raise HTTPException(status_code=status, detail=str(e))
+        return _run_bulk_calculation(columns, metrics_filter)
+
+    return await asyncio.to_thread(run)
+
+
 if __name__ == "__main__":
     import uvicorn
     # Geliştirme sunucusunu 0.0.0.0 üzerinde çalıştırarak yerel ağdan erişime izin ver
@@ -0,0 +1,254 @@
+import logging
+import math
+from abc import ABC, abstractmethod
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Görüntü analizi sonucundaki (eski, Türkçe) anahtarlar -> kalıcı metrik adları
+ANALYSIS_METRIC_KEYS = {
+    "Vücut Yağ Oranı (%)": "image_body_fat_percentage",
+    "Kalça/Omuz Genişlik Oranı": "hip_shoulder_ratio",
+    "Omuz Genişliği (px)": "shoulder_width_px",
+    "Kalça Genişliği (px)": "hip_width_px",
+    "Boy Uzunluğu (px)": "height_px",
+}
+
+_WEEK_SECONDS = 7 * 86400
+# 1970-01-01 Perşembe'dir; haftalar Pazartesi 00:00 UTC'de başlar
+_EPOCH_MONDAY_OFFSET = 3 * 86400
+
+
+def week_start(timestamp):
+    """Zaman damgasının (epoch sn) içinde bulunduğu haftanın başlangıcı (Pazartesi 00:00 UTC)."""
+    return math.floor((timestamp + _EPOCH_MONDAY_OFFSET) / _WEEK_SECONDS) * _WEEK_SECONDS - _EPOCH_MONDAY_OFFSET
+
+
+def analysis_metrics(result):
+    """Analiz sonucundaki sayısal değerleri metrik adı -> değer sözlüğüne çevirir ("Hesaplanamadı" atlanır)."""
+    values = {}
+    for key, metric in ANALYSIS_METRIC_KEYS.items():
+        value = result.get(key)
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+            values[metric] = float(value)
+    return values
+
+
+class MeasurementStore(ABC):
+    """
+    Kullanıcı başına ölçüm zaman serisi deposu arayüzü.
+
+    Her kayıt eklenirken metrik başına özet (adet, ortalama, min/max, son değer, üstel hareketli
+    ortalama) ve haftalık kovalar artımlı olarak güncellenir; trend sorguları ham kayıtları
+    yeniden taramadan tek satır okumayla yanıtlanır.
+    """
+
+    @abstractmethod
+    def record(self, user_id, values, source, recorded_at=None):
+        """`values` (metrik -> değer) ölçümlerini tek işlemde ekler; eklenen kayıt sayısını döndürür."""
+
+    @abstractmethod
+    def query(self, user_id, metric=None, start=None, end=None, limit=1000):
+        """[start, end) aralığındaki ham ölçümleri zamana göre artan sırada döndürür."""
+
+    @abstractmethod
+    def summary(self, user_id, metric=None):
+        """Metrik özetlerini döndürür (O(1) okuma)."""
+
+    @abstractmethod
+    def weekly(self, user_id, metric, start=None, end=None):
+        """Haftalık kovaları (adet, ortalama, min, max) hafta başlangıcına göre artan sırada döndürür."""
+
+    def close(self):
+        pass
+
+
+class SQLiteMeasurementStore(MeasurementStore):
+    """
+    SQLite tabanlı ölçüm deposu.
+
+    - `measurements`: ham kayıtlar; (user_id, metric, recorded_at) indeksiyle aralık sorguları
+    - `measurement_summary`: metrik başına artımlı özet (EMA dahil)
+    - `measurement_weekly`: haftalık kovalar
+
+    EMA zaman sırasına bağlıdır: son kayıttan daha eski tarihli (geriye dönük) bir ölçüm eklenirse
+    adet/ortalama/min/max ve haftalık kovalar güncellenir, EMA ve son değer değişmez.
+    """
+
+    def __init__(self, path="measurements.db", ema_alpha=0.3):
+        if not 0 < ema_alpha <= 1:
+            raise ValueError("EMA katsayısı (0, 1] aralığında olmalıdır.")
+        self.path = path
+        self.ema_alpha = ema_alpha
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            # Okuyucular yazıcıyı beklemesin; her eklemede fsync yapılmaz
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS measurements (
+                id INTEGER PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                metric TEXT NOT NULL,
+                value REAL NOT NULL,
+                recorded_at REAL NOT NULL,
+                source TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_measurements_user_metric_time
+                ON measurements (user_id, metric, recorded_at);
+            CREATE INDEX IF NOT EXISTS idx_measurements_user_time
+                ON measurements (user_id, recorded_at);
+            CREATE TABLE IF NOT EXISTS measurement_summary (
+                user_id TEXT NOT NULL,
+                metric TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                total REAL NOT NULL,
+                min_value REAL NOT NULL,
+                max_value REAL NOT NULL,
+                first_at REAL NOT NULL,
+                last_at REAL NOT NULL,
+                last_value REAL NOT NULL,
+                ema REAL NOT NULL,
+                PRIMARY KEY (user_id, metric)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS measurement_weekly (
+                user_id TEXT NOT NULL,
+                metric TEXT NOT NULL,
+                week_start REAL NOT NULL,
+                count INTEGER NOT NULL,
+                total REAL NOT NULL,
+                min_value REAL NOT NULL,
+                max_value REAL NOT NULL,
+                PRIMARY KEY (user_id, metric, week_start)
+            ) WITHOUT ROWID;
+            """
+        )
+        self._db.commit()
+        logger.info(f"Ölçüm deposu açıldı: {path}")
+
+    def record(self, user_id, values, source, recorded_at=None):
+        if not user_id:
+            raise ValueError("Kullanıcı kimliği boş olamaz.")
+        recorded_at = time.time() if recorded_at is None else float(recorded_at)
+        week = week_start(recorded_at)
+        rows = [(user_id, metric, float(value)) for metric, value in values.items()]
+        if not rows:
+            return 0
+
+        with self._lock:
+            # Ham kayıt, özet ve haftalık kova aynı işlemde güncellenir; özet hiçbir zaman kayıtlardan sapmaz
+            with self._db:
+                self._db.executemany(
+                    "INSERT INTO measurements (user_id, metric, value, recorded_at, source) VALUES (?, ?, ?, ?, ?)",
+                    [(user, metric, value, recorded_at, source) for user, metric, value in rows],
+                )
+                self._db.executemany(
+                    """
+                    INSERT INTO measurement_summary
+                        (user_id, metric, count, total, min_value, max_value, first_at, last_at, last_value, ema)
+                    VALUES (:user_id, :metric, 1, :value, :value, :value, :at, :at, :value, :value)
+                    ON CONFLICT (user_id, metric) DO UPDATE SET
+                        count = count + 1,
+                        total = total + excluded.total,
+                        min_value = MIN(min_value, excluded.min_value),
+                        max_value = MAX(max_value, excluded.max_value),
+                        first_at = MIN(first_at, excluded.first_at),
+                        ema = CASE WHEN excluded.last_at >= last_at
+                                   THEN ema + :alpha * (excluded.last_value - ema) ELSE ema END,
+                        last_value = CASE WHEN excluded.last_at >= last_at
+                                          THEN excluded.last_value ELSE last_value END,
+                        last_at = MAX(last_at, excluded.last_at)
+                    """,
+                    [
+                        {"user_id": user, "metric": metric, "value": value, "at": recorded_at, "alpha": self.ema_alpha}
+                        for user, metric, value in rows
+                    ],
+                )
+                self._db.executemany(
+                    """
+                    INSERT INTO measurement_weekly (user_id, metric, week_start, count, total, min_value, max_value)
+                    VALUES (?, ?, ?, 1, ?, ?, ?)
+                    ON CONFLICT (user_id, metric, week_start) DO UPDATE SET
+                        count = count + 1,
+                        total = total + excluded.total,
+                        min_value = MIN(min_value, excluded.min_value),
+                        max_value = MAX(max_value, excluded.max_value)
+                    """,
+                    [(user, metric, week, value, value, value) for user, metric, value in rows],
+                )
+        return len(rows)
+
+    def query(self, user_id, metric=None, start=None, end=None, limit=1000):
+        sql = "SELECT metric, value, recorded_at, source FROM measurements WHERE user_id = ?"
+        params = [user_id]
+        if metric is not None:
+            sql += " AND metric = ?"
+            params.append(metric)
+        if start is not None:
+            sql += " AND recorded_at >= ?"
+            params.append(float(start))
+        if end is not None:
+            sql += " AND recorded_at < ?"
+            params.append(float(end))
+        sql += " ORDER BY recorded_at, id LIMIT ?"
+        params.append(int(limit))
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [
+            {"metric": metric, "value": value, "recorded_at": recorded_at, "source": source}
+            for metric, value, recorded_at, source in rows
+        ]
+
+    def summary(self, user_id, metric=None):
+        sql = (
+            "SELECT metric, count, total, min_value, max_value, first_at, last_at, last_value, ema"
+            " FROM measurement_summary WHERE user_id = ?"
+        )
+        params = [user_id]
+        if metric is not None:
+            sql += " AND metric = ?"
+            params.append(metric)
+        with self._lock:
+            rows = self._db.execute(sql + " ORDER BY metric", params).fetchall()
+        return {
+            name: {
+                "count": count,
+                "mean": round(total / count, 4),
+                "min": min_value,
+                "max": max_value,
+                "first_at": first_at,
+                "last_at": last_at,
+                "last": last_value,
+                "ema": round(ema, 4),
+            }
+            for name, count, total, min_value, max_value, first_at, last_at, last_value, ema in rows
+        }
+
+    def weekly(self, user_id, metric, start=None, end=None):
+        sql = (
+            "SELECT week_start, count, total, min_value, max_value FROM measurement_weekly"
+            " WHERE user_id = ? AND metric = ?"
+        )
+        params = [user_id, metric]
+        if start is not None:
+            sql += " AND week_start >= ?"
+            params.append(week_start(float(start)))
+        if end is not None:
+            sql += " AND week_start < ?"
+            params.append(float(end))
+        with self._lock:
+            rows = self._db.execute(sql + " ORDER BY week_start", params).fetchall()
+        return [
+            {"week_start": week, "count": count, "mean": round(total / count, 4), "min": min_value, "max": max_value}
+            for week, count, total, min_value, max_value in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,272 @@
+import bisect
+import os
+import threading
+import time
+
+# METRICS_ENABLED=0 ile tüm ölçümler kapatılır; zamanlayıcılar boş bağlam yöneticisine döner
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1").lower() not in ("0", "false", "no")
+
+# Saniye cinsinden varsayılan histogram kovaları (1 ms - 30 sn)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _NullStage:
+    """Ölçüm kapalıyken kullanılan, hiçbir şey yapmayan paylaşılan bağlam yöneticisi."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("_timings", "_name", "_start")
+
+    def __init__(self, timings, name):
+        self._timings = timings
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._start
+        stages = self._timings.stages
+        stages[self._name] = stages.get(self._name, 0.0) + elapsed
+        return False
+
+
+class StageTimings:
+    """
+    Tek bir isteğin aşama sürelerini (saniye) toplar. Düz bir sözlük tuttuğu için
+    süreç havuzundaki çalışanlardan ana sürece pickle ile taşınabilir.
+    """
+
+    __slots__ = ("stages",)
+
+    def __init__(self, stages=None):
+        self.stages = dict(stages) if stages else {}
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def merge(self, other):
+        for name, value in (other.items() if isinstance(other, dict) else other.stages.items()):
+            self.stages[name] = self.stages.get(name, 0.0) + value
+
+    def server_timing_header(self):
+        """`Server-Timing` yanıt başlığı değerini üretir (süreler milisaniye)."""
+        return ", ".join(f"{name};dur={value * 1000.0:.2f}" for name, value in self.stages.items())
+
+
+def stage_timer(timings, name):
+    """`timings` None ise sıfıra yakın maliyetli boş bağlam döner; hot-path'te güvenle kullanılabilir."""
+    if timings is None:
+        return _NULL_STAGE
+    return timings.stage(name)
+
+
+def new_timings():
+    """Ölçüm açıksa yeni bir StageTimings, kapalıysa None döndürür."""
+    return StageTimings() if METRICS_ENABLED else None
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in pairs) + "}"
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} için etiketler {self.labelnames} olmalıdır.")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key, value):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}"]
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount=1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set_total(self, value, **labels):
+        """Başka bir bileşenin kendi tuttuğu toplam sayacı aynen yansıtır (collector'lar için)."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # [kova sayaçları (+Inf dahil), toplam, adet]
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def _render_value(self, key, value):
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', le))} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {total}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    """Prometheus metin formatında dışa aktarılan metrik kaydı."""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector):
+        """Her /metrics isteğinden önce çağrılan fonksiyon (ör. kuyruk derinliği göstergelerini günceller)."""
+        self._collectors.append(collector)
+
+    def render(self):
+        for collector in self._collectors:
+            collector()
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.counter("fitanaliz_requests_total", "Uç nokta ve durum koduna göre istek sayısı", ("endpoint", "status"))
+REQUEST_DURATION = REGISTRY.histogram("fitanaliz_request_duration_seconds", "Uç nokta başına istek süresi", ("endpoint",))
+STAGE_DURATION = REGISTRY.histogram("fitanaliz_stage_duration_seconds", "Analiz aşamalarının süresi", ("stage",))
+ANALYSIS_FAILURES = REGISTRY.counter("fitanaliz_analysis_failures_total", "BodyAnalysisError nedenine göre başarısız analizler", ("reason",))
+QUEUE_DEPTH = REGISTRY.gauge("fitanaliz_inference_queue_depth", "Çıkarım yürütücüsünde çalışan + bekleyen iş sayısı")
+QUEUE_CAPACITY = REGISTRY.gauge("fitanaliz_inference_queue_capacity", "Çıkarım yürütücüsünün toplam kapasitesi")
+INFERENCE_REJECTED = REGISTRY.counter("fitanaliz_inference_rejected_total", "Kuyruk dolu olduğu için reddedilen işler")
+INFERENCE_TIMED_OUT = REGISTRY.counter("fitanaliz_inference_timed_out_total", "Zaman aşımına uğrayan işler")
+POSE_POOL_IN_USE = REGISTRY.gauge("fitanaliz_pose_pool_in_use", "Kullanımdaki Pose tahminleyicisi sayısı")
+POSE_POOL_SIZE = REGISTRY.gauge("fitanaliz_pose_pool_size", "Pose havuzu boyutu")
+POSE_TIER_OUTCOMES = REGISTRY.counter(
+    "fitanaliz_pose_tier_outcomes_total",
+    "Kademeli çıkarımda model_complexity kademesine göre sonuçlar (accepted/escalated/low_visibility/no_pose)",
+    ("complexity", "outcome"),
+)
+CACHE_EVENTS = REGISTRY.counter("fitanaliz_result_cache_events_total", "Sonuç önbelleği isabet/ıska/tahliye sayaçları", ("event",))
+JOB_QUEUE_DEPTH = REGISTRY.gauge("fitanaliz_job_queue_depth", "Öncelik şeridine göre bekleyen asenkron iş sayısı", ("lane",))
+JOBS_RUNNING = REGISTRY.gauge("fitanaliz_jobs_running", "Çalışmakta olan asenkron iş sayısı")
+JOB_EVENTS = REGISTRY.counter("fitanaliz_job_events_total", "Asenkron iş olayları (submitted/done/failed/retried/rejected)", ("event",))
+
+
+def observe_stages(timings):
+    if timings is None:
+        return
+    for name, value in timings.stages.items():
+        STAGE_DURATION.observe(value, stage=name)
+
+
+class RequestMetricsMiddleware:
+    """
+    Uç nokta ve durum koduna göre istek sayısını ve süresini kaydeden saf ASGI ara katmanı.
+    Süre, yanıt gövdesi (akış/NDJSON dahil) tamamen gönderilene kadar ölçülür. Sadece
+    METRICS_ENABLED açıkken eklenmelidir.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def tracking_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, tracking_send)
+        finally:
+            # Etiket kardinalitesi sınırlı kalsın diye ham URL yerine route şablonu kullanılır;
+            # yönlendirici eşleşen route'u aynı scope sözlüğüne yazar
+            endpoint = getattr(scope.get("route"), "path", "unmatched")
+            REQUESTS.inc(endpoint=endpoint, status=status)
+            REQUEST_DURATION.observe(time.perf_counter() - start, endpoint=endpoint)
@@ -0,0 +1,136 @@
+import os
+import threading
+
+import cv2
+import numpy as np
+
+# Kişi tespiti küçültülmüş görüntüde yapılır; HOG penceresi 64x128 olduğu için bu boyutta
+# yaklaşık 130 pikselden kısa görünen kişiler bulunamaz.
+PERSON_DETECT_EDGE = int(os.getenv("PERSON_DETECT_EDGE", "640"))
+# 'auto': arka plan düzse (kenar pikselleri tek renkli) ucuz bağlı bölge sezgisi, değilse
+# veya bölge bulunamazsa HOG kişi dedektörü; 'hog' ve 'regions' tek yöntemi zorlar
+PERSON_DETECTOR = os.getenv("PERSON_DETECTOR", "auto")
+
+_HOG_MIN_SCORE = 0.5
+# Kenar piksellerinin kanal başına standart sapması bunun altındaysa arka plan düz kabul edilir
+_UNIFORM_BORDER_STD = 25.0
+_NMS_THRESHOLD = 0.4
+# Kutuların genişletilme oranları (x, y). HOG kutuları gövdeye sıkı oturur, Pose ise baş, kol ve
+# ayaklar için bağlam ister; bağlı bölgeler siluetin tamamını kapsadığından daha az genişletilir.
+_HOG_PAD = (0.35, 0.12)
+_REGION_PAD = (0.2, 0.08)
+
+_hog = None
+_hog_lock = threading.Lock()
+
+
+def _get_hog():
+    global _hog
+    with _hog_lock:
+        if _hog is None:
+            hog = cv2.HOGDescriptor()
+            hog.setSVMDetector(cv2.HOGDescriptor_getDefaultPeopleDetector())
+            _hog = hog
+    return _hog
+
+
+def _detect_hog(image):
+    rects, weights = _get_hog().detectMultiScale(image, winStride=(8, 8), padding=(8, 8), scale=1.05)
+    if len(rects) == 0:
+        return []
+    return [
+        (float(x), float(y), float(w), float(h), float(score))
+        for (x, y, w, h), score in zip(np.asarray(rects).tolist(), np.asarray(weights).reshape(-1).tolist())
+        if score >= _HOG_MIN_SCORE
+    ]
+
+
+def _border_pixels(image):
+    return np.concatenate([image[:4].reshape(-1, 3), image[-4:].reshape(-1, 3),
+                           image[:, :4].reshape(-1, 3), image[:, -4:].reshape(-1, 3)])
+
+
+def _detect_foreground_regions(image, border):
+    """
+    Düz veya az desenli arka plan (stüdyo, duvar önü, kolaj) için sezgisel tespit: kenar
+    piksellerinin medyan renginden belirgin ayrışan bölgeler birleştirilir; dik duran ve
+    yeterince büyük bağlı bölgeler kişi adayıdır.
+    """
+    h, w = image.shape[:2]
+    background = np.median(border, axis=0)
+    diff = np.abs(image.astype(np.int16) - background.astype(np.int16)).max(axis=2)
+    mask = (diff > 40).astype(np.uint8)
+
+    size = max(3, int(max(h, w) / 40) | 1)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, np.ones((3, 3), np.uint8))
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, np.ones((size, size), np.uint8))
+
+    _, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    regions = []
+    for x, y, bw, bh, area in stats[1:].tolist():
+        if area < 0.02 * h * w or bh < 0.25 * h or bh < bw:
+            continue
+        regions.append((float(x), float(y), float(bw), float(bh), area / float(h * w)))
+    return regions
+
+
+def _suppress(regions):
+    """Çakışan kutular için NMS; büyük bir kutunun içinde kalan parçalar (kol, bacak) da atılır."""
+    if not regions:
+        return []
+    boxes = [[int(x), int(y), int(w), int(h)] for x, y, w, h, _ in regions]
+    scores = [score for *_, score in regions]
+    keep = np.asarray(cv2.dnn.NMSBoxes(boxes, scores, 0.0, _NMS_THRESHOLD)).reshape(-1).tolist()
+    kept = sorted((regions[i] for i in keep), key=lambda r: r[2] * r[3], reverse=True)
+
+    result = []
+    for x, y, w, h, score in kept:
+        contained = False
+        for kx, ky, kw, kh, _ in result:
+            ix = max(0.0, min(x + w, kx + kw) - max(x, kx))
+            iy = max(0.0, min(y + h, ky + kh) - max(y, ky))
+            if ix * iy > 0.6 * w * h:
+                contained = True
+                break
+        if not contained:
+            result.append((x, y, w, h, score))
+    return result
+
+
+def detect_person_regions(image, max_people=8, method=None, detect_edge=None):
+    """
+    BGR görüntüdeki kişi bölgelerini bulur. Kutular verilen görüntünün piksel koordinatlarında,
+    Pose için kenarlarından genişletilmiş ve görüntü sınırlarına kırpılmış (x, y, w, h, skor)
+    olarak, soldan sağa sıralı döner. Kişi bulunamazsa boş liste döner.
+    """
+    method = method or PERSON_DETECTOR
+    detect_edge = PERSON_DETECT_EDGE if detect_edge is None else detect_edge
+    if method not in ("auto", "hog", "regions"):
+        raise ValueError("Geçersiz kişi tespit yöntemi. 'auto', 'hog' veya 'regions' olmalıdır.")
+
+    h, w = image.shape[:2]
+    scale = 1.0
+    small = image
+    if detect_edge > 0 and max(h, w) > detect_edge:
+        scale = detect_edge / max(h, w)
+        small = cv2.resize(image, (max(int(w * scale), 1), max(int(h * scale), 1)), interpolation=cv2.INTER_AREA)
+
+    regions = []
+    pad_x, pad_y = _REGION_PAD
+    border = _border_pixels(small)
+    uniform = float(border.std(axis=0).max()) < _UNIFORM_BORDER_STD
+    if method == "regions" or (method == "auto" and uniform):
+        regions = _suppress(_detect_foreground_regions(small, border))
+    if not regions and method in ("auto", "hog"):
+        regions = _suppress(_detect_hog(small))
+        pad_x, pad_y = _HOG_PAD
+
+    regions = sorted(regions, key=lambda r: r[4], reverse=True)[:max_people]
+    boxes = []
+    for x, y, bw, bh, score in regions:
+        x0 = max(0.0, (x - bw * pad_x) / scale)
+        y0 = max(0.0, (y - bh * pad_y) / scale)
+        x1 = min(float(w), (x + bw * (1 + pad_x)) / scale)
+        y1 = min(float(h), (y + bh * (1 + pad_y)) / scale)
+        boxes.append((int(x0), int(y0), max(int(round(x1 - x0)), 1), max(int(round(y1 - y0)), 1), round(float(score), 3)))
+    return sorted(boxes, key=lambda box: box[0])
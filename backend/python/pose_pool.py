@@ -0,0 +1,278 @@
+import importlib.util
+import logging
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Sağlık kontrolünde kullanılan küçük boş görüntü (kişi içermez, sadece grafiğin çalıştığını doğrular)
+_HEALTH_CHECK_IMAGE = np.zeros((64, 64, 3), dtype=np.uint8)
+
+
+class PosePoolError(Exception):
+    """Pose havuzundan tahminleyici alınamadığında fırlatılan hata"""
+    pass
+
+
+# model_complexity başına Pose landmark model dosyası (mediapipe/modules/pose_landmark altında).
+# Paketle sadece full (1) gelir; lite ve heavy provision_pose_models.py ile önceden indirilmelidir.
+POSE_MODEL_FILES = {0: "pose_landmark_lite.tflite", 1: "pose_landmark_full.tflite", 2: "pose_landmark_heavy.tflite"}
+
+
+def pose_model_path(complexity):
+    """Kademenin model dosyasının yolunu döndürür; mediapipe modülü içe aktarılmaz."""
+    spec = importlib.util.find_spec("mediapipe")
+    if spec is None or not spec.submodule_search_locations:
+        raise PosePoolError("mediapipe paketi bulunamadı.")
+    package_dir = list(spec.submodule_search_locations)[0]
+    return os.path.join(package_dir, "modules", "pose_landmark", POSE_MODEL_FILES[complexity])
+
+
+class PosePool:
+    """
+    Önceden ısıtılmış (warm) MediaPipe Pose tahminleyicilerinden oluşan havuz.
+
+    Her istekte yeni bir `mp_pose.Pose` oluşturmak model/graf başlatma maliyetini
+    tekrar tekrar ödetir. Bu havuz tahminleyicileri başlangıçta bir kez oluşturur,
+    istek başına ödünç verir (checkout) ve iş bitince geri alır. Hata veren
+    tahminleyiciler kapatılıp yenisiyle değiştirilir.
+    """
+
+    def __init__(self, size=2, checkout_timeout=30.0, **pose_kwargs):
+        if size <= 0:
+            raise ValueError("Havuz boyutu pozitif olmalıdır.")
+        self.size = size
+        self.checkout_timeout = checkout_timeout
+        self.pose_kwargs = {
+            "static_image_mode": True,
+            "min_detection_confidence": 0.5,
+            "min_tracking_confidence": 0.5,
+        }
+        self.pose_kwargs.update(pose_kwargs)
+
+        self._available = queue.LifoQueue(maxsize=size)  # LIFO: en son kullanılan (en sıcak) önce verilir
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._recreated = 0
+        self._closed = False
+
+        for _ in range(size):
+            self._available.put(self._create())
+        logger.info(f"Pose havuzu {size} tahminleyici ile hazırlandı.")
+
+    def _create(self):
+        # mediapipe ilk havuz oluşturulurken yüklenir; sadece PosePoolError'a ihtiyaç duyan modüller bedelini ödemez
+        import mediapipe as mp
+        return mp.solutions.pose.Pose(**self.pose_kwargs)
+
+    def _discard(self, pose):
+        try:
+            pose.close()
+        except Exception as e:
+            logger.warning(f"Pose tahminleyicisi kapatılırken hata: {e}")
+
+    def _replace(self, pose):
+        """Bozuk tahminleyiciyi kapatır ve yerine yenisini oluşturur."""
+        self._discard(pose)
+        with self._lock:
+            self._recreated += 1
+        return self._create()
+
+    @contextmanager
+    def checkout(self, timeout=None):
+        """
+        Havuzdan bir Pose tahminleyicisi ödünç alır.
+
+        Blok içinde bir istisna oluşursa tahminleyici güvenilmez kabul edilir,
+        kapatılır ve havuza yenisi konur.
+        """
+        if self._closed:
+            raise PosePoolError("Pose havuzu kapatılmış.")
+        try:
+            pose = self._available.get(timeout=self.checkout_timeout if timeout is None else timeout)
+        except queue.Empty:
+            raise PosePoolError("Uygun Pose tahminleyicisi bulunamadı (havuz dolu).")
+
+        with self._lock:
+            self._in_use += 1
+        failed = False
+        try:
+            yield pose
+        except Exception:
+            failed = True
+            raise
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            if failed:
+                logger.warning("Pose tahminleyicisi hata verdi, yeniden oluşturuluyor.")
+                try:
+                    pose = self._replace(pose)
+                except Exception as e:
+                    # Yeniden oluşturma da başarısızsa bir sonraki sağlık kontrolü tekrar dener
+                    logger.error(f"Pose tahminleyicisi yeniden oluşturulamadı: {e}")
+                    pose = None
+            self._return(pose)
+
+    def _return(self, pose):
+        if self._closed:
+            if pose is not None:
+                self._discard(pose)
+            return
+        if pose is None:
+            try:
+                pose = self._create()
+            except Exception as e:
+                logger.error(f"Pose tahminleyicisi oluşturulamadı: {e}")
+                return
+        self._available.put(pose)
+
+    def health_check(self):
+        """
+        Boşta bekleyen tahminleyicileri küçük bir görüntüyle çalıştırır, hata verenleri
+        yeniden oluşturur ve eksik kalan kapasiteyi tamamlar. Sağlıklı tahminleyici
+        sayısını döndürür.
+        """
+        healthy = 0
+        checked = []
+        while True:
+            try:
+                checked.append(self._available.get_nowait())
+            except queue.Empty:
+                break
+
+        for pose in checked:
+            try:
+                pose.process(_HEALTH_CHECK_IMAGE)
+                healthy += 1
+            except Exception as e:
+                logger.warning(f"Sağlık kontrolü başarısız, tahminleyici yenileniyor: {e}")
+                try:
+                    pose = self._replace(pose)
+                    healthy += 1
+                except Exception as create_error:
+                    logger.error(f"Pose tahminleyicisi yeniden oluşturulamadı: {create_error}")
+                    continue
+            self._available.put(pose)
+
+        # Daha önce yeniden oluşturulamayan tahminleyicilerin yerini doldur
+        with self._lock:
+            missing = self.size - self._available.qsize() - self._in_use
+        for _ in range(max(missing, 0)):
+            try:
+                self._available.put(self._create())
+                healthy += 1
+            except Exception as e:
+                logger.error(f"Eksik Pose tahminleyicisi oluşturulamadı: {e}")
+                break
+        return healthy
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self.size,
+                "in_use": self._in_use,
+                "available": self._available.qsize(),
+                "recreated": self._recreated,
+            }
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._discard(self._available.get_nowait())
+            except queue.Empty:
+                break
+        logger.info("Pose havuzu kapatıldı.")
+
+
+class TieredPosePool:
+    """
+    model_complexity kademelerine (0: lite, 1: full, 2: heavy) göre ayrı Pose havuzları.
+
+    Kademeli çıkarımda önce en ucuz kademe çalıştırılır, sonuç yeterince güvenilir değilse
+    sıradaki kademeye geçilir. Kademe havuzları ilk ihtiyaçta (veya `prepare` ile ısınmada)
+    oluşturulur. Model dosyası diskte olmayan kademe devre dışı bırakılır ve atlanır: mediapipe eksik
+    modeli çalışma anında atomik olmayan bir yazmayla indirir ve aynı dosyaya yazan süreçler
+    yarışabilir. lite/heavy modeller derleme sırasında provision_pose_models.py ile indirilmelidir.
+    """
+
+    def __init__(self, complexities=(0, 1, 2), size=2, checkout_timeout=30.0, base_pool=None):
+        complexities = tuple(dict.fromkeys(int(c) for c in complexities))
+        if not complexities or any(c not in (0, 1, 2) for c in complexities):
+            raise ValueError("Pose kademeleri 0, 1 veya 2 olmalıdır.")
+        self.complexities = complexities
+        self.size = size
+        self.checkout_timeout = checkout_timeout
+        self._pools = {}
+        self._unavailable = set()
+        self._lock = threading.Lock()
+        # Kademe ve sonuç (accepted/escalated/no_pose/low_visibility) başına sayaçlar
+        self._outcomes = {}
+        self._base_pool = base_pool
+        if base_pool is not None:
+            # Varsayılan havuz kendi kademesinde yeniden kullanılır; aynı model iki kez yüklenmez
+            self._pools[base_pool.pose_kwargs.get("model_complexity", 1)] = base_pool
+
+    def pool(self, complexity):
+        """Kademenin havuzunu döndürür (gerekirse oluşturur); kademe kullanılamıyorsa None."""
+        pool = self._pools.get(complexity)
+        if pool is not None or complexity in self._unavailable:
+            return pool
+        with self._lock:
+            if complexity in self._pools or complexity in self._unavailable:
+                return self._pools.get(complexity)
+            if not os.path.exists(pose_model_path(complexity)):
+                logger.warning(
+                    f"model_complexity={complexity} Pose modeli bulunamadı ({POSE_MODEL_FILES[complexity]}), kademe atlanacak. "
+                    "Modeli provision_pose_models.py ile önceden indirin."
+                )
+                self._unavailable.add(complexity)
+                return None
+            try:
+                pool = PosePool(size=self.size, checkout_timeout=self.checkout_timeout, model_complexity=complexity)
+            except Exception as e:
+                logger.warning(f"model_complexity={complexity} Pose kademesi yüklenemedi, atlanacak: {e}")
+                self._unavailable.add(complexity)
+                return None
+            self._pools[complexity] = pool
+            return pool
+
+    def prepare(self):
+        """Tüm kademe havuzlarını oluşturur; kullanılabilir kademeleri döndürür."""
+        return [c for c in self.complexities if self.pool(c) is not None]
+
+    def record(self, complexity, outcome):
+        key = (complexity, outcome)
+        with self._lock:
+            self._outcomes[key] = self._outcomes.get(key, 0) + 1
+
+    def _own_pools(self):
+        # Varsayılan havuzun sağlık kontrolü ve kapatılması sahibine (çalışan) aittir
+        return [pool for pool in list(self._pools.values()) if pool is not self._base_pool]
+
+    def health_check(self):
+        """Bu nesnenin oluşturduğu kademe havuzlarını kontrol eder; sağlıklı tahminleyici sayısını döndürür."""
+        return sum(pool.health_check() for pool in self._own_pools())
+
+    def stats(self):
+        with self._lock:
+            outcomes = dict(self._outcomes)
+        return {
+            "complexities": list(self.complexities),
+            "loaded": sorted(self._pools),
+            "unavailable": sorted(self._unavailable),
+            "outcomes": [
+                {"complexity": complexity, "outcome": outcome, "count": count}
+                for (complexity, outcome), count in sorted(outcomes.items())
+            ],
+        }
+
+    def close(self):
+        for pool in self._own_pools():
+            pool.close()
+        self._pools.clear()
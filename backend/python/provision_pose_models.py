@@ -0,0 +1,81 @@
+"""
+Kademeli çıkarım (POSE_TIERS) için Pose landmark modellerini derleme/kurulum sırasında indirir.
+
+mediapipe paketiyle sadece full (model_complexity=1) modeli gelir. lite (0) ve heavy (2) modelleri
+mediapipe ilk kullanımda indirir, fakat dosyayı doğrudan hedefe `open(..., 'wb')` ile yazar. Aynı
+anda başlayan süreç modundaki çalışanlar aynı dosyaya yazarak birbirini bozabilir ve yarım kalmış
+bir dosya bir sonraki başlatmada "mevcut" sayılır. Bu betik modelleri geçici dosyaya indirip
+`os.replace` ile atomik olarak yerine koyar. POSE_TIERS 1 dışında bir kademe içeriyorsa imaj
+derlenirken (pip install'dan sonra) çalıştırılmalıdır. Modeli diskte olmayan kademeler çalışma
+anında indirilmez, atlanır (bkz. pose_pool.TieredPosePool).
+
+Kullanım (backend/python dizininden):
+    python provision_pose_models.py --tiers 0,2
+"""
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import urllib.request
+
+from pose_pool import POSE_MODEL_FILES, pose_model_path
+
+logger = logging.getLogger(__name__)
+
+# mediapipe'ın kendi indirme adresi (mediapipe/python/solutions/download_utils.py)
+MODEL_URL_PREFIX = os.getenv("POSE_MODEL_URL_PREFIX", "https://storage.googleapis.com/mediapipe-assets/")
+
+
+def provision(complexity, timeout=60.0):
+    """Kademenin modelini yoksa indirir; model dosyasının yolunu döndürür."""
+    path = pose_model_path(complexity)
+    if os.path.exists(path):
+        logger.info(f"model_complexity={complexity} modeli zaten mevcut: {path}")
+        return path
+
+    url = MODEL_URL_PREFIX + POSE_MODEL_FILES[complexity]
+    logger.info(f"model_complexity={complexity} modeli indiriliyor: {url}")
+    fd, tmp_path = tempfile.mkstemp(prefix=".download-", suffix=".tflite", dir=os.path.dirname(path))
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response, os.fdopen(fd, "wb") as out:
+            shutil.copyfileobj(response, out)
+            out.flush()
+            os.fsync(out.fileno())
+        if os.path.getsize(tmp_path) == 0:
+            raise OSError(f"Boş model dosyası indirildi: {url}")
+        # Aynı dizinde yeniden adlandırma atomiktir; okuyucular ya eski durumu ya tam dosyayı görür
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    logger.info(f"model_complexity={complexity} modeli kaydedildi: {path}")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tiers", default="0,2", help="İndirilecek model_complexity kademeleri")
+    parser.add_argument("--timeout", type=float, default=60.0, help="İndirme başına ağ zaman aşımı (sn)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    complexities = [int(c) for c in args.tiers.split(",") if c.strip()]
+    if any(c not in POSE_MODEL_FILES for c in complexities):
+        parser.error("Kademeler 0, 1 veya 2 olmalıdır.")
+    failed = []
+    for complexity in complexities:
+        try:
+            provision(complexity, args.timeout)
+        except Exception as e:
+            logger.error(f"model_complexity={complexity} modeli indirilemedi: {e}")
+            failed.append(complexity)
+    # Derleme adımının başarısız olması için sıfırdan farklı çıkış kodu
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """
+    Görüntü içeriğine göre anahtarlanan analiz sonucu önbelleği.
+
+    Aynı fotoğrafın tekrar yüklenmesi (mobil istemcilerin yeniden denemeleri, aynı ilerleme
+    fotoğrafının yeniden analizi) MediaPipe'ı tekrar çalıştırmaz. İki katmanlıdır:
+    - Bellek içi LRU (her zaman açık, `max_entries` ile sınırlı)
+    - İsteğe bağlı SQLite disk katmanı (`disk_path` verilirse); TTL ve kayıt sayısı sınırıyla
+
+    Anahtar: görüntü baytlarının BLAKE2b özeti + cinsiyet.
+
+    Olay döngüsünden `aget`/`aput` kullanılmalıdır: bellek katmanı doğrudan, disk katmanı
+    `asyncio.to_thread` ile çalışır. Disk isabetlerinin son erişim zamanları `access_flush_size`
+    kayıtta bir (ve tahliyeden önce) toplu yazılır.
+    """
+
+    def __init__(self, max_entries=512, disk_path=None, ttl=86400.0, max_disk_entries=10000, access_flush_size=64):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_disk_entries = max_disk_entries
+        self.access_flush_size = access_flush_size
+        self._memory = OrderedDict()  # key -> (oluşturulma zamanı, sonuç)
+        # _lock bellek katmanını ve sayaçları, _db_lock SQLite bağlantısını korur. Disk işlemi sürerken
+        # bellek isabetleri beklemesin diye ayrıdırlar; sıralama her zaman _db_lock -> _lock'tur.
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+            "expirations": 0,
+        }
+
+        self._db = None
+        self._disk_entries = 0
+        # Disk isabetlerinin son erişim zamanları her isabette yazılmaz; toplu olarak güncellenir
+        self._pending_access = {}
+        if disk_path:
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS analysis_cache ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_analysis_cache_last_access ON analysis_cache (last_access)")
+            self._db.commit()
+            # Kayıt sayısı bir kez okunur, sonra bellekte tutulur; her eklemede COUNT(*) yapılmaz
+            (self._disk_entries,) = self._db.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()
+            logger.info(f"Sonuç önbelleği disk katmanı açıldı: {disk_path}")
+
+    @staticmethod
+    def make_key(buf, gender):
+        digest = hashlib.blake2b(buf, digest_size=20).hexdigest()
+        return f"{digest}:{(gender or '').lower()}"
+
+    @property
+    def has_disk(self):
+        return self._db is not None
+
+    def _expired(self, created_at, now):
+        return self.ttl is not None and self.ttl > 0 and now - created_at > self.ttl
+
+    def _get_memory(self, key, now):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            created_at, value = entry
+            if not self._expired(created_at, now):
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return dict(value)
+            del self._memory[key]
+            self._counters["expirations"] += 1
+            return None
+
+    def _get_disk(self, key, now):
+        with self._db_lock:
+            if self._db is None:
+                return None
+            row = self._db.execute("SELECT value, created_at FROM analysis_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value_json, created_at = row
+            if self._expired(created_at, now):
+                cursor = self._db.execute("DELETE FROM analysis_cache WHERE key = ?", (key,))
+                self._db.commit()
+                self._pending_access.pop(key, None)
+                self._disk_entries -= cursor.rowcount
+                with self._lock:
+                    self._counters["expirations"] += 1
+                return None
+            self._pending_access[key] = now
+            if len(self._pending_access) >= self.access_flush_size:
+                self._flush_access()
+        value = json.loads(value_json)
+        with self._lock:
+            self._store_memory(key, created_at, value)
+            self._counters["disk_hits"] += 1
+        return dict(value)
+
+    def _count_miss(self):
+        with self._lock:
+            self._counters["misses"] += 1
+
+    def get(self, key):
+        """Önbellekteki sonucu (kopya olarak) döndürür; yoksa veya süresi dolmuşsa None."""
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is None and self._db is not None:
+            value = self._get_disk(key, now)
+        if value is None:
+            self._count_miss()
+        return value
+
+    async def aget(self, key):
+        """`get` ile aynı; bellek katmanında ıskalanırsa disk katmanı olay döngüsünü bloklamadan thread'de okunur."""
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is None and self._db is not None:
+            value = await asyncio.to_thread(self._get_disk, key, now)
+        if value is None:
+            self._count_miss()
+        return value
+
+    def _store_memory(self, key, created_at, value):
+        # _lock tutulurken çağrılır
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters["memory_evictions"] += 1
+
+    def _flush_access(self):
+        """Bekleyen son erişim zamanlarını tek işlemde yazar (_db_lock tutulurken çağrılır)."""
+        if not self._pending_access or self._db is None:
+            return
+        self._db.executemany(
+            "UPDATE analysis_cache SET last_access = MAX(last_access, ?) WHERE key = ?",
+            [(at, key) for key, at in self._pending_access.items()],
+        )
+        self._db.commit()
+        self._pending_access.clear()
+
+    def _put_disk(self, key, value, now):
+        value_json = json.dumps(value, ensure_ascii=False)
+        with self._db_lock:
+            if self._db is None:
+                return
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO analysis_cache (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, value_json, now, now),
+            )
+            if cursor.rowcount:
+                self._disk_entries += 1
+            else:
+                self._db.execute(
+                    "UPDATE analysis_cache SET value = ?, created_at = ?, last_access = ? WHERE key = ?",
+                    (value_json, now, now, key),
+                )
+            self._pending_access.pop(key, None)
+            # Boyut sınırı: en uzun süredir erişilmeyen kayıtları sil (önce bekleyen erişimler yazılır)
+            overflow = self._disk_entries - self.max_disk_entries
+            evicted = 0
+            if overflow > 0:
+                self._flush_access()
+                cursor = self._db.execute(
+                    "DELETE FROM analysis_cache WHERE key IN ("
+                    " SELECT key FROM analysis_cache ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,),
+                )
+                evicted = cursor.rowcount
+                self._disk_entries -= evicted
+            self._db.commit()
+        if evicted:
+            with self._lock:
+                self._counters["disk_evictions"] += evicted
+
+    def put(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._store_memory(key, now, dict(value))
+        if self._db is not None:
+            self._put_disk(key, value, now)
+
+    async def aput(self, key, value):
+        """`put` ile aynı; disk yazması olay döngüsünü bloklamadan thread'de yapılır."""
+        now = time.time()
+        with self._lock:
+            self._store_memory(key, now, dict(value))
+        if self._db is not None:
+            await asyncio.to_thread(self._put_disk, key, value, now)
+
+    def purge_expired(self):
+        """Süresi dolmuş disk kayıtlarını toplu olarak siler; silinen kayıt sayısını döndürür."""
+        if self._db is None or not self.ttl or self.ttl <= 0:
+            return 0
+        with self._db_lock:
+            if self._db is None:
+                return 0
+            self._flush_access()
+            cursor = self._db.execute("DELETE FROM analysis_cache WHERE created_at < ?", (time.time() - self.ttl,))
+            self._db.commit()
+            self._disk_entries -= cursor.rowcount
+        with self._lock:
+            self._counters["expirations"] += cursor.rowcount
+        return cursor.rowcount
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["hits"] = stats["memory_hits"] + stats["disk_hits"]
+            stats["memory_entries"] = len(self._memory)
+        if self._db is not None:
+            stats["disk_entries"] = self._disk_entries
+        return stats
+
+    def clear(self):
+        with self._db_lock:
+            if self._db is not None:
+                self._db.execute("DELETE FROM analysis_cache")
+                self._db.commit()
+                self._pending_access.clear()
+                self._disk_entries = 0
+        with self._lock:
+            self._memory.clear()
+
+    def close(self):
+        with self._db_lock:
+            if self._db is not None:
+                self._flush_access()
+                self._db.close()
+                self._db = None
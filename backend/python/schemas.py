@@ -0,0 +1,94 @@
+import json
+from typing import Dict, Optional, Union
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+
+try:
+    import orjson
+except ImportError:  # orjson isteğe bağlıdır; yoksa standart json kullanılır
+    orjson = None
+
+# Analiz sonucunun eski (Türkçe, görüntülemeye yönelik) anahtarları -> kısa makine anahtarları.
+# "Bel-Kalça Oranı (WHR)" ve "Kalça/Omuz Genişlik Oranı" aynı değeri taşıdığından
+# kompakt yanıtta tek anahtarla (hip_shoulder) döner.
+LEGACY_TO_COMPACT = {
+    "Vücut Yağ Oranı (%)": "body_fat",
+    "Kalça/Omuz Genişlik Oranı": "hip_shoulder",
+    "Bel-Kalça Oranı (WHR)": "hip_shoulder",
+    "Omuz Genişliği (px)": "shoulder_px",
+    "Kalça Genişliği (px)": "hip_px",
+    "Boy Uzunluğu (px)": "height_px",
+}
+
+# İstemci tarafı yerelleştirme için etiketler ve birimler (GET /schema/labels)
+COMPACT_LABELS = {
+    "body_fat": {"unit": "%", "labels": {"tr": "Vücut Yağ Oranı", "en": "Body Fat"}},
+    "hip_shoulder": {"unit": None, "labels": {"tr": "Kalça/Omuz Genişlik Oranı", "en": "Hip/Shoulder Width Ratio"}},
+    "shoulder_px": {"unit": "px", "labels": {"tr": "Omuz Genişliği", "en": "Shoulder Width"}},
+    "hip_px": {"unit": "px", "labels": {"tr": "Kalça Genişliği", "en": "Hip Width"}},
+    "height_px": {"unit": "px", "labels": {"tr": "Boy Uzunluğu", "en": "Height"}},
+}
+
+
+class BodyAnalysisCompact(BaseModel):
+    """
+    Kompakt analiz sonucunun OpenAPI belgesi: sadece sayılar, kısa ve kararlı anahtarlar.
+    Hesaplanamayan değerler null. Yanıtlar bu modelle doğrulanmaz (bkz. FastJSONResponse);
+    to_compact her zaman COMPACT_LABELS'taki anahtarların tamamını üretir.
+    """
+    body_fat: Optional[float] = Field(None, description="Vücut yağ oranı (%)")
+    hip_shoulder: Optional[float] = Field(None, description="Kalça/omuz genişlik oranı")
+    shoulder_px: Optional[float] = Field(None, description="Omuz genişliği (piksel)")
+    hip_px: Optional[float] = Field(None, description="Kalça genişliği (piksel)")
+    height_px: Optional[float] = Field(None, description="Boy uzunluğu (piksel)")
+
+
+# Eski biçim: Türkçe etiket -> sayı veya "Hesaplanamadı"
+LegacyBodyAnalysis = Dict[str, Union[float, str]]
+
+# Analiz uç noktalarının OpenAPI açıklaması (yanıtlar doğrulanmadan, doğrudan JSON'a yazılır)
+ANALYSIS_RESPONSES = {
+    200: {
+        "model": Union[BodyAnalysisCompact, LegacyBodyAnalysis],
+        "description": "Varsayılan olarak eski (Türkçe etiketli) biçim; compact=true ile BodyAnalysisCompact biçimi "
+                       "(anahtarları GET /schema/labels ile aynıdır).",
+    }
+}
+
+
+def to_compact(result):
+    """
+    Eski biçimdeki analiz sonucunu kısa anahtarlı, sadece sayı içeren sözlüğe çevirir.
+    Sonuçta bulunmayan anahtarlar da null olarak yer alır; anahtar kümesi sabittir.
+    """
+    compact = dict.fromkeys(COMPACT_LABELS)
+    seen = set()
+    for key, value in result.items():
+        short = LEGACY_TO_COMPACT.get(key)
+        if short is None or short in seen:
+            continue
+        seen.add(short)
+        compact[short] = value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+    return compact
+
+
+def format_result(result, compact):
+    return to_compact(result) if compact else result
+
+
+def dumps(content):
+    """JSON baytları üretir: orjson kuruluysa onunla, değilse standart json ile (aynı çıktı biçimi)."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    İçeriği `jsonable_encoder` ve yanıt modeli doğrulamasından geçirmeden doğrudan JSON'a yazan yanıt.
+    Sadece zaten JSON uyumlu (dict/list/str/sayı/None) içerikle kullanılmalıdır.
+    """
+
+    def render(self, content):
+        return dumps(content)
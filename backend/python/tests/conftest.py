@@ -0,0 +1,12 @@
+import os
+import sys
+
+# main.py ortam değişkenlerini import sırasında okur: testler dosya oluşturmasın ve ağır
+# modelleri arka planda yüklemesin
+os.environ.setdefault("MEASUREMENT_DB", "")
+os.environ.setdefault("JOB_BACKEND", "memory")
+os.environ.setdefault("INFERENCE_WARMUP", "0")
+os.environ.setdefault("POSE_HEALTH_CHECK_INTERVAL", "0")
+
+# Testler backend/python modüllerini (main.py ile aynı şekilde) düz import eder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
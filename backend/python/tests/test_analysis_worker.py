@@ -0,0 +1,65 @@
+import io
+import json
+import os
+import struct
+import subprocess
+import sys
+
+from analysis_worker import _read_exact, _write_frame
+
+WORKER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "analysis_worker.py")
+
+
+def _request_frame(request_id, meta, image_bytes):
+    header = json.dumps(meta).encode("utf-8")
+    body = struct.pack(">II", request_id, len(header)) + header + image_bytes
+    return struct.pack(">I", len(body)) + body
+
+
+def _read_response(stream):
+    (length,) = struct.unpack(">I", _read_exact(stream, 4))
+    frame = _read_exact(stream, length)
+    (request_id,) = struct.unpack(">I", frame[:4])
+    return request_id, json.loads(frame[4:].decode("utf-8"))
+
+
+def test_write_frame_round_trips_through_reader():
+    stream = io.BytesIO()
+    _write_frame(stream, 7, {"success": True, "results": {"Boy Uzunluğu (px)": 900}})
+    stream.seek(0)
+    assert _read_response(stream) == (7, {"success": True, "results": {"Boy Uzunluğu (px)": 900}})
+
+
+def test_read_exact_returns_none_on_short_stream():
+    assert _read_exact(io.BytesIO(b"abc"), 4) is None
+    assert _read_exact(io.BytesIO(b"abcd"), 4) == b"abcd"
+
+
+def test_worker_process_serves_frames_until_stdin_closes():
+    process = subprocess.Popen(
+        [sys.executable, WORKER_PATH],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        cwd=os.path.dirname(WORKER_PATH),
+    )
+    try:
+        request_id, ready = _read_response(process.stdout)
+        assert request_id == 0 and ready["ready"] is True
+
+        # Yanıtlar istek kimliğiyle eşleşir; çözülemeyen görsel hata çerçevesi döndürür
+        process.stdin.write(_request_frame(41, {"gender": "female"}, b"resim degil"))
+        process.stdin.write(_request_frame(42, {}, b""))
+        process.stdin.flush()
+        first_id, first = _read_response(process.stdout)
+        second_id, second = _read_response(process.stdout)
+        assert (first_id, second_id) == (41, 42)
+        assert first["success"] is False and first["reason"] == "decode_failed"
+        assert second["success"] is False and second["reason"] == "empty_image"
+
+        process.stdin.close()
+        assert process.wait(timeout=30) == 0
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import cv2
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from inference import InferenceSaturatedError
+
+
+def _png(value):
+    ok, buf = cv2.imencode(".png", np.full((8, 8, 3), value, dtype=np.uint8))
+    assert ok
+    return buf.tobytes()
+
+
+@pytest.fixture
+def client():
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+def _stream_lines(client, images):
+    files = [("files", (name, data, "image/png")) for name, data in images]
+    with client.stream("POST", "/analyze_images/batch", files=files) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.iter_lines() if line]
+    return {line["filename"]: line for line in lines}
+
+
+def test_batch_streams_every_item_when_analysis_raises(client, monkeypatch):
+    bad = _png(1)
+
+    async def fake_analysis(contents, gender, timings=None):
+        if contents == bad:
+            raise RuntimeError("beklenmedik")
+        return {"Boy Uzunluğu (px)": 900}
+
+    monkeypatch.setattr(main, "_analyze_image_cached", fake_analysis)
+    lines = _stream_lines(client, [("a.png", _png(0)), ("b.png", bad), ("c.png", _png(2))])
+    assert lines["a.png"]["status"] == 200
+    assert lines["c.png"]["result"] == {"Boy Uzunluğu (px)": 900}
+    assert lines["b.png"]["status"] == 500
+    assert lines["b.png"]["index"] == 1
+
+
+def test_batch_streams_error_line_for_failure_outside_item_handler(client, monkeypatch):
+    bad = _png(1)
+    check_image_header = main.check_image_header
+
+    def flaky_header_check(data, *args, **kwargs):
+        if data == bad:
+            raise ValueError("başlık okunamadı")
+        return check_image_header(data, *args, **kwargs)
+
+    async def fake_analysis(contents, gender, timings=None):
+        return {"Boy Uzunluğu (px)": 900}
+
+    monkeypatch.setattr(main, "check_image_header", flaky_header_check)
+    monkeypatch.setattr(main, "_analyze_image_cached", fake_analysis)
+    lines = _stream_lines(client, [("a.png", _png(0)), ("b.png", bad), ("c.png", _png(2))])
+    # Akış kesilmez; hatalı öğe kendi 500 satırını alır, diğerleri sonuçlanır
+    assert set(lines) == {"a.png", "b.png", "c.png"}
+    assert lines["b.png"]["status"] == 500
+    assert lines["a.png"]["status"] == lines["c.png"]["status"] == 200
+
+
+def test_batch_reports_full_executor_per_item_and_bounds_concurrency(client, monkeypatch):
+    busy = _png(1)
+    active = 0
+    peak = 0
+
+    async def fake_analysis(contents, gender, timings=None):
+        nonlocal active, peak
+        if contents == busy:
+            raise InferenceSaturatedError("Çıkarım kuyruğu dolu.")
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return {"Boy Uzunluğu (px)": 900}
+
+    monkeypatch.setattr(main, "_analyze_image_cached", fake_analysis)
+    images = [(f"{i}.png", _png(10 + i)) for i in range(8)] + [("busy.png", busy)]
+    lines = _stream_lines(client, images)
+    assert lines["busy.png"]["status"] == 503
+    assert all(lines[f"{i}.png"]["status"] == 200 for i in range(8))
+    # Bir toplu istek aynı anda en fazla çalışan sayısı kadar öğe gönderir
+    assert peak <= main.inference_executor.max_workers
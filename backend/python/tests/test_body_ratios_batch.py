@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from body_analysis import BodyAnalysisError, calculate_body_ratios, calculate_body_ratios_batch
+
+
+def _random_poses(count, seed=0):
+    rng = np.random.default_rng(seed)
+    poses = rng.uniform(0.05, 0.95, size=(count, 33, 4))
+    poses[:, :, 3] = rng.uniform(0.3, 1.0, size=(count, 33))
+    return poses
+
+
+@pytest.mark.parametrize("gender", ["male", "female"])
+def test_batch_matches_single_pose_results(gender):
+    poses = _random_poses(16)
+    shape = (1280, 720, 3)
+    batch = calculate_body_ratios_batch(poses, shape, gender)
+    assert batch == [calculate_body_ratios(pose.copy(), shape, gender) for pose in poses]
+
+
+def test_batch_accepts_per_row_shapes_and_genders():
+    poses = _random_poses(3, seed=1)
+    shapes = np.array([(1280, 720), (640, 480), (1920, 1080)])
+    genders = ["male", "female", "male"]
+    batch = calculate_body_ratios_batch(poses, shapes, genders)
+    assert batch == [calculate_body_ratios(pose.copy(), shape, g) for pose, shape, g in zip(poses, shapes, genders)]
+
+
+def test_bad_rows_are_marked_without_stopping_the_batch():
+    poses = _random_poses(3, seed=2)
+    poses[1, :, 3] = 0.0  # Görünür nokta yok
+    batch = calculate_body_ratios_batch(poses, (1280, 720))
+    assert batch[1] == {"error": "Yükseklik hesaplamak için görünür nokta bulunamadı."}
+    assert "error" not in batch[0] and "error" not in batch[2]
+
+
+def test_batch_rejects_wrong_landmark_shape():
+    with pytest.raises(BodyAnalysisError):
+        calculate_body_ratios_batch(np.zeros((2, 32, 4)), (100, 100))
@@ -0,0 +1,136 @@
+import importlib.util
+import math
+
+import numpy as np
+import pytest
+
+from bulk_calculations import bulk_result_to_json, calculate_metrics_bulk, read_csv_columns, read_parquet_columns
+from calculations import BodyAnalysisError, calculate_bmi, calculate_bmr, calculate_body_fat_percentage, calculate_daily_calories, calculate_ideal_weight
+
+
+def test_matches_scalar_calculations():
+    result = bulk_result_to_json(calculate_metrics_bulk(
+        weight=[70, 55.5], height=[175, 160], age=[30, 45], gender=["male", "Female"],
+        activity_level=["moderate", "light"],
+    ))
+    assert result["error_count"] == 0
+    for row, (weight, height, age, gender, activity) in enumerate(
+        [(70, 175, 30, "male", "moderate"), (55.5, 160, 45, "female", "light")]
+    ):
+        bmi = calculate_bmi(weight, height)
+        bmr = calculate_bmr(weight, height, age, gender)
+        assert result["metrics"]["bmi"][row] == bmi
+        assert result["metrics"]["bmr"][row] == bmr
+        assert result["metrics"]["daily_calories"][row] == calculate_daily_calories(bmr, activity)
+        assert result["metrics"]["body_fat_percentage"][row] == calculate_body_fat_percentage(bmi, age, gender)
+        assert result["metrics"]["ideal_weight"][row] == calculate_ideal_weight(height, gender)
+
+
+@pytest.mark.parametrize("bad", ["inf", "-inf", float("inf"), "abc", "-5", 0])
+def test_bad_cells_are_row_errors(bad):
+    result = calculate_metrics_bulk(weight=[bad, "70"], height=["175", "175"], age=["30", "30"],
+                                    gender=["male", "male"], metrics=["bmi", "bmr"])
+    as_json = bulk_result_to_json(result)
+    assert as_json["metrics"]["bmi"][0] is None
+    assert as_json["metrics"]["bmr"][0] is None
+    assert as_json["metrics"]["bmi"][1] == calculate_bmi(70, 175)
+    assert as_json["errors"] == [{"row": 0, "codes": ["invalid_weight"]}]
+
+
+def test_missing_cells_and_text_codes():
+    result = bulk_result_to_json(calculate_metrics_bulk(
+        weight=["", "70", "70"], height=["175", "175", "175"], age=["30", "30", "30"],
+        gender=["male", "other", "male"], activity_level=["light", "light", "lazy"],
+    ))
+    assert result["errors"] == [
+        {"row": 0, "codes": ["missing_weight"]},
+        {"row": 1, "codes": ["invalid_gender"]},
+        {"row": 2, "codes": ["invalid_activity_level"]},
+    ]
+    assert result["metrics"]["daily_calories"] == [None, None, None]
+    assert result["metrics"]["bmr"][2] is not None
+
+
+def test_overflowing_result_serializes_as_null():
+    result = bulk_result_to_json(calculate_metrics_bulk(weight=[1e308], height=[1e-300], metrics=["bmi"]))
+    assert result["metrics"]["bmi"] == [None]
+
+
+def test_only_requested_and_computable_metrics_are_returned():
+    result = calculate_metrics_bulk(height=[175], gender=["male"], metrics=["ideal_weight", "bmi"])
+    # bmi için weight sütunu yok: hesaplanamaz, hata da sayılmaz
+    assert set(result["metrics"]) == {"ideal_weight"}
+    result = calculate_metrics_bulk(weight=[70], height=[175], age=[30], gender=["male"], metrics=["body_fat_percentage"])
+    assert set(result["metrics"]) == {"body_fat_percentage"}
+    assert not math.isnan(result["metrics"]["body_fat_percentage"][0])
+
+
+def test_invalid_requests():
+    with pytest.raises(BodyAnalysisError) as e:
+        calculate_metrics_bulk()
+    assert e.value.reason == "invalid_columns"
+    with pytest.raises(BodyAnalysisError) as e:
+        calculate_metrics_bulk(weight=[70, 80], height=[175])
+    assert e.value.reason == "invalid_columns"
+    with pytest.raises(BodyAnalysisError) as e:
+        calculate_metrics_bulk(weight=[70], height=[175], metrics=["bmi", "vo2max"])
+    assert e.value.reason == "invalid_metric"
+
+
+def test_read_csv_columns():
+    csv_bytes = "﻿Weight,height,notes,gender\n70,175,x,male\n,160\n".encode("utf-8")
+    columns = read_csv_columns(csv_bytes)
+    # Bilinmeyen sütunlar atlanır, kısa satırlar boş hücreyle tamamlanır
+    assert columns == {"weight": ["70", ""], "height": ["175", "160"], "gender": ["male", ""]}
+    result = calculate_metrics_bulk(**columns, metrics=["bmi"])
+    assert result["row_errors"] == {1: ["missing_weight"]}
+
+
+def test_read_csv_columns_rejects_bad_files():
+    for data, reason in [(b"", "invalid_file"), (b"\xff\xfe\x00", "invalid_file"),
+                         (b"weight\n1\n2\n3\n", "too_many_rows")]:
+        with pytest.raises(BodyAnalysisError) as e:
+            read_csv_columns(data, max_rows=2)
+        assert e.value.reason == reason
+
+
+@pytest.mark.skipif(importlib.util.find_spec("pyarrow") is not None, reason="pyarrow kurulu")
+def test_read_parquet_without_pyarrow():
+    with pytest.raises(BodyAnalysisError) as e:
+        read_parquet_columns(b"PAR1")
+    assert e.value.reason == "parquet_unavailable"
+
+
+def test_read_parquet_columns():
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    sink = pa.BufferOutputStream()
+    pq.write_table(pa.table({"Weight": [70.0, None], "height": [175.0, 160.0], "gender": ["male", None]}), sink)
+    data = sink.getvalue().to_pybytes()
+
+    columns = read_parquet_columns(data)
+    assert set(columns) == {"weight", "height", "gender"}
+    assert np.isnan(columns["weight"][1])
+    assert columns["gender"] == ["male", ""]
+    with pytest.raises(BodyAnalysisError) as e:
+        read_parquet_columns(data, max_rows=1)
+    assert e.value.reason == "too_many_rows"
+    with pytest.raises(BodyAnalysisError) as e:
+        read_parquet_columns(b"PAR1 not parquet")
+    assert e.value.reason == "invalid_file"
+
+
+def test_bulk_endpoint_reports_non_finite_cell_as_row_error():
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with TestClient(main.app) as client:
+        response = client.post("/calculate/bulk", json={
+            "weight": ["inf", 70], "height": [175, 175], "age": [30, 30], "gender": ["male", "male"],
+            "metrics": ["bmi", "bmr"],
+        })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["metrics"]["bmi"] == [None, calculate_bmi(70, 175)]
+    assert body["errors"] == [{"row": 0, "codes": ["invalid_weight"]}]
@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+
+from image_io import decode_for_inference
+
+
+def _encode(ext, width, height):
+    # Yatay gradyan: kırpma ve ölçekleme sonrası renkler konumla kontrol edilebilir
+    row = np.linspace(0, 255, width, dtype=np.uint8)
+    image = np.repeat(np.repeat(row[None, :, None], height, axis=0), 3, axis=2)
+    ok, buf = cv2.imencode(ext, image)
+    assert ok
+    return buf.tobytes()
+
+
+@pytest.mark.parametrize("ext", [".jpg", ".png"])
+def test_large_image_is_decoded_at_reduced_size(ext):
+    prepared = decode_for_inference(_encode(ext, 4000, 3000), max_long_edge=1000)
+    assert prepared.image.shape == (750, 1000, 3)
+    # Piksel çıktıları orijinal ölçekte verilir
+    assert prepared.original_shape == (3000, 4000, 3)
+    assert prepared.roi is None
+
+
+def test_small_image_and_disabled_limit_keep_full_size():
+    assert decode_for_inference(_encode(".png", 640, 480), max_long_edge=1000).image.shape == (480, 640, 3)
+    assert decode_for_inference(_encode(".jpg", 2000, 1000), max_long_edge=0).image.shape == (1000, 2000, 3)
+
+
+def test_roi_is_cropped_from_reduced_image_and_remapped():
+    roi = (1000, 600, 2000, 1200)
+    prepared = decode_for_inference(_encode(".png", 4000, 3000), max_long_edge=1000, roi=roi)
+    assert prepared.original_shape == (3000, 4000, 3)
+    assert prepared.image.shape == (300, 500, 3)
+    assert prepared.roi == pytest.approx(roi)
+    # Kırpılan bölge orijinal görüntüde aynı yere denk gelir (yatay gradyan)
+    assert abs(int(prepared.image[150, 0, 0]) - round(1000 / 3999 * 255)) <= 3
+
+    corners = [SimpleNamespace(x=0.0, y=0.0), SimpleNamespace(x=1.0, y=1.0)]
+    prepared.remap_landmarks(corners)
+    assert (corners[0].x, corners[0].y) == pytest.approx((0.25, 0.2))
+    assert (corners[1].x, corners[1].y) == pytest.approx((0.75, 0.6))
+
+    array = np.array([[0.0, 0.0, 0.0, 1.0], [1.0, 1.0, 0.0, 1.0]])
+    prepared.remap_landmark_array(array)
+    assert array[:, :2] == pytest.approx(np.array([[0.25, 0.2], [0.75, 0.6]]))
+
+
+def test_roi_is_clipped_to_image_bounds():
+    prepared = decode_for_inference(_encode(".png", 400, 300), max_long_edge=1000, roi=(-50, 250, 1000, 1000))
+    x, y, w, h = prepared.roi
+    assert (x, y) == (0, 250)
+    assert x + w <= 400 and y + h <= 300
+    assert prepared.image.shape[:2] == (50, 400)
+
+
+def test_undecodable_bytes_return_none():
+    assert decode_for_inference(b"\x89PNG\r\n\x1a\n" + b"\x00" * 64, max_long_edge=1000) is None
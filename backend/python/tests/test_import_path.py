@@ -0,0 +1,12 @@
+import pytest
+
+from benchmarks.import_budget import DEFAULT_CHECKS, measure
+
+
+@pytest.mark.parametrize("module", sorted(DEFAULT_CHECKS))
+def test_module_does_not_load_heavy_dependencies(module):
+    # Süre bütçesi makineye bağlı olduğu için burada sadece yasak modüller kontrol edilir
+    _, forbidden = DEFAULT_CHECKS[module]
+    total_us, imports = measure(module)
+    assert total_us is not None
+    assert sorted(name for name in forbidden if name in imports) == []
@@ -0,0 +1,126 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from inference import InferenceExecutor, InferenceSaturatedError, InferenceTimeoutError
+
+
+@pytest.fixture
+def make_executor():
+    executors = []
+
+    def make(max_workers=1, max_queue=0, timeout=5.0):
+        executor = InferenceExecutor(mode="thread", max_workers=max_workers, max_queue=max_queue, timeout=timeout)
+        # Ortak Pose havuzu (mediapipe) kurulmasın: sadece thread havuzu yeterli
+        executor._executor = ThreadPoolExecutor(max_workers=max_workers)
+        executors.append(executor)
+        return executor
+
+    yield make
+    for executor in executors:
+        if executor.started:
+            executor._executor.shutdown(wait=True, cancel_futures=True)
+
+
+async def _wait_for(predicate, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.005)
+
+
+def test_rejects_when_capacity_is_full(make_executor):
+    executor = make_executor(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.create_task(executor.run(release.wait))
+        queued = asyncio.create_task(executor.run(lambda: "sırada"))
+        await _wait_for(lambda: executor.stats()["pending"] == 2)
+        with pytest.raises(InferenceSaturatedError):
+            await executor.run(lambda: "reddedilir")
+        release.set()
+        return await running, await queued
+
+    assert asyncio.run(scenario()) == (True, "sırada")
+    stats = executor.stats()
+    assert stats["capacity"] == 2
+    assert stats["pending"] == 0
+    assert stats["rejected"] == 1
+
+
+def test_timeout_keeps_slot_until_work_finishes(make_executor):
+    executor = make_executor(max_workers=1)
+    release = threading.Event()
+
+    async def scenario():
+        with pytest.raises(InferenceTimeoutError):
+            await executor.run(release.wait, timeout=0.05)
+        # Arka planda süren iş kapasiteyi tutmaya devam eder
+        assert executor.stats()["pending"] == 1
+        with pytest.raises(InferenceSaturatedError):
+            await executor.run(lambda: None)
+        release.set()
+        await _wait_for(lambda: executor.stats()["pending"] == 0)
+        return await executor.run(lambda: "tamam")
+
+    assert asyncio.run(scenario()) == "tamam"
+    assert executor.stats()["timed_out"] == 1
+
+
+def test_worker_errors_propagate_and_release_the_slot(make_executor):
+    executor = make_executor(max_workers=1)
+
+    def failing():
+        raise ValueError("çözülemedi")
+
+    with pytest.raises(ValueError):
+        asyncio.run(executor.run(failing))
+    assert executor.stats()["pending"] == 0
+
+
+def _png(value):
+    ok, buf = cv2.imencode(".png", np.full((8, 8, 3), value, dtype=np.uint8))
+    assert ok
+    return buf.tobytes()
+
+
+def test_analyze_image_maps_full_executor_to_503_and_timeout_to_504(make_executor, monkeypatch):
+    executor = make_executor(max_workers=1, max_queue=1, timeout=0.05)
+    release = threading.Event()
+    monkeypatch.setattr(main, "inference_executor", executor)
+
+    def occupy():
+        # Ayrı bir olay döngüsünden yuva tutan uzun bir iş
+        thread = threading.Thread(target=lambda: asyncio.run(executor.run(release.wait, timeout=10)))
+        thread.start()
+        return thread
+
+    def wait_pending(count):
+        asyncio.run(_wait_for(lambda: executor.stats()["pending"] == count))
+
+    threads = [occupy()]
+    try:
+        wait_pending(1)
+        with TestClient(main.app) as client:
+            # Çalışan meşgul, iş kuyrukta zaman aşımına uğrar
+            timed_out = client.post("/analyze_image/", files={"file": ("a.png", _png(10), "image/png")})
+            wait_pending(1)
+            threads.append(occupy())
+            wait_pending(2)
+            saturated = client.post("/analyze_image/", files={"file": ("b.png", _png(20), "image/png")})
+            # Uygulama kapanırken yürütücü işlerin bitmesini bekler
+            release.set()
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join()
+    assert timed_out.status_code == 504
+    assert saturated.status_code == 503
+    assert saturated.headers["retry-after"] == "1"
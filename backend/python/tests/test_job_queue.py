@@ -0,0 +1,155 @@
+import asyncio
+
+import pytest
+
+from job_queue import DONE, FAILED, QUEUED, InMemoryJobBackend, JobBackend, JobQueueFullError, JobRetryError, JobScheduler
+
+
+def _scheduler(run_job, **kwargs):
+    return JobScheduler(InMemoryJobBackend(), run_job, concurrency=1, result_ttl=0, **kwargs)
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        JobBackend()
+
+
+def test_retry_then_done():
+    calls = []
+
+    async def run_job(job, payload):
+        calls.append(payload)
+        if len(calls) < 3:
+            raise JobRetryError("Çıkarım kapasitesi dolu.")
+        return {"ok": True}
+
+    async def scenario():
+        scheduler = _scheduler(run_job, retry_delay=0.01, max_retry_delay=0.02, max_retry_age=5)
+        await scheduler.start()
+        try:
+            job = await scheduler.submit({}, b"img")
+            return await scheduler.wait(job["id"], 5), scheduler.stats()
+        finally:
+            await scheduler.stop()
+
+    job, stats = asyncio.run(scenario())
+    assert job["status"] == DONE
+    assert job["result"] == {"ok": True}
+    assert job["attempts"] == 3
+    assert stats["retried"] == 2
+    assert stats["queued_bytes"] == 0
+
+
+def test_retries_exhausted_by_age_not_attempts():
+    attempts = []
+
+    async def run_job(job, payload):
+        attempts.append(job["attempts"])
+        raise JobRetryError("Çıkarım kapasitesi dolu.")
+
+    async def scenario():
+        scheduler = _scheduler(run_job, retry_delay=0.01, max_retry_delay=0.02, max_retry_age=0.3)
+        await scheduler.start()
+        try:
+            job = await scheduler.submit({}, b"img")
+            return await scheduler.wait(job["id"], 5), scheduler.stats()
+        finally:
+            await scheduler.stop()
+
+    job, stats = asyncio.run(scenario())
+    assert job["status"] == FAILED
+    assert job["error"]["status"] == 503
+    assert job["error"]["reason"] == "retries_exhausted"
+    # Bekleme 0.02 sn ile sınırlı: 0.3 sn içinde sabit bir deneme sayısından çok daha fazla deneme yapılır
+    assert len(attempts) > 5
+    assert job["finished_at"] - job["created_at"] <= 0.3 + 0.1
+    assert stats["failed"] == 1
+
+
+def test_queued_bytes_limit_rejects_and_releases():
+    release = None
+
+    async def run_job(job, payload):
+        await release.wait()
+        return {"size": len(payload)}
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        scheduler = _scheduler(run_job, max_queued_bytes=10)
+        await scheduler.start()
+        try:
+            first = await scheduler.submit({}, b"x" * 6)
+            with pytest.raises(JobQueueFullError):
+                await scheduler.submit({}, b"y" * 6)
+            rejected = scheduler.stats()
+            release.set()
+            await scheduler.wait(first["id"], 5)
+            second = await scheduler.submit({}, b"y" * 6)
+            return rejected, await scheduler.wait(second["id"], 5), scheduler.stats()
+        finally:
+            await scheduler.stop()
+
+    rejected, second, stats = asyncio.run(scenario())
+    assert rejected["rejected"] == 1
+    assert rejected["queued_bytes"] == 6
+    assert second["status"] == DONE
+    assert stats["queued_bytes"] == 0
+
+
+def test_retry_wait_frees_the_worker_and_shows_queued():
+    order = []
+
+    async def run_job(job, payload):
+        order.append(payload)
+        if order.count(b"a") == 1 and payload == b"a":
+            raise JobRetryError("Çıkarım kapasitesi dolu.")
+        return {"payload": payload.decode()}
+
+    async def scenario():
+        scheduler = _scheduler(run_job, retry_delay=0.3, max_retry_age=5)
+        await scheduler.start()
+        try:
+            first = await scheduler.submit({}, b"a")
+            await asyncio.sleep(0.05)
+            # Tek çalışan, ilk iş yeniden denemeyi beklerken ikinci işi çalıştırabilmeli
+            second = await scheduler.submit({}, b"b")
+            second_done = await scheduler.wait(second["id"], 0.2)
+            waiting = await scheduler.get(first["id"])
+            waiting_stats = scheduler.stats()
+            first_done = await scheduler.wait(first["id"], 5)
+            return second_done, waiting, waiting_stats, first_done
+        finally:
+            await scheduler.stop()
+
+    second_done, waiting, waiting_stats, first_done = asyncio.run(scenario())
+    assert second_done["status"] == DONE
+    assert waiting["status"] == QUEUED
+    assert waiting_stats["retry_waiting"] == 1
+    assert waiting_stats["running"] == 0
+    assert first_done["status"] == DONE
+    assert order == [b"a", b"b", b"a"]
+
+
+def test_backend_error_releases_bytes_and_wakes_waiters():
+    class BrokenBackend(InMemoryJobBackend):
+        def load_payload(self, job_id):
+            raise OSError("disk hatası")
+
+    async def run_job(job, payload):
+        raise AssertionError("Girdi okunamayan iş çalıştırılmamalı")
+
+    async def scenario():
+        scheduler = JobScheduler(BrokenBackend(), run_job, concurrency=1, result_ttl=0, max_queued_bytes=10)
+        await scheduler.start()
+        try:
+            job = await scheduler.submit({}, b"x" * 8)
+            finished = await scheduler.wait(job["id"], 5)
+            return finished, scheduler.stats()
+        finally:
+            await scheduler.stop()
+
+    finished, stats = asyncio.run(scenario())
+    assert finished["status"] == FAILED
+    assert finished["error"]["status"] == 500
+    assert stats["queued_bytes"] == 0
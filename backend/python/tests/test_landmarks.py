@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from mediapipe.framework.formats import landmark_pb2
+
+import body_analysis
+from body_analysis import _landmark_list_from_wire, pose_landmarks_to_array
+
+
+def _landmark_list(values, presence=None, skip_visibility=False):
+    message = landmark_pb2.NormalizedLandmarkList()
+    for i, (x, y, z, visibility) in enumerate(values):
+        landmark = message.landmark.add(x=x, y=y, z=z)
+        if not skip_visibility:
+            landmark.visibility = visibility
+        if presence is not None:
+            landmark.presence = presence[i]
+    return message
+
+
+def _fieldwise(message):
+    return np.array([(lm.x, lm.y, lm.z, lm.visibility) for lm in message.landmark], dtype=np.float32)
+
+
+@pytest.fixture
+def values():
+    rng = np.random.default_rng(7)
+    array = rng.uniform(-1.5, 1.5, (33, 4)).astype(np.float32)
+    # Sıfır ve negatif sıfır da açıkça serileştirilir (proto2 optional alanlar)
+    array[0] = [0.0, -0.0, 0.0, 0.0]
+    return array
+
+
+def test_installed_mediapipe_matches_wire_layout():
+    assert body_analysis._landmark_descriptor_matches()
+    assert body_analysis._LANDMARK_WIRE_ENABLED
+
+
+@pytest.mark.parametrize("with_presence", [False, True])
+def test_wire_decoding_round_trips_real_message(values, with_presence):
+    presence = np.linspace(0, 1, 33).tolist() if with_presence else None
+    message = _landmark_list(values.tolist(), presence)
+
+    decoded = _landmark_list_from_wire(message)
+    assert decoded is not None, "Hızlı yol bu mediapipe sürümünün ikili formatını tanımadı"
+    assert decoded.dtype == np.float32 and decoded.shape == (33, 4) and decoded.flags["C_CONTIGUOUS"]
+    np.testing.assert_array_equal(decoded, _fieldwise(message))
+    np.testing.assert_array_equal(decoded, values)
+
+
+def test_unexpected_layout_falls_back_to_fields(values):
+    # visibility alanı olmayan kayıtlar farklı uzunluktadır: hızlı yol None döner, sonuç yine doğru
+    message = _landmark_list(values.tolist(), skip_visibility=True)
+    assert _landmark_list_from_wire(message) is None
+    np.testing.assert_array_equal(pose_landmarks_to_array(message), _fieldwise(message))
+
+
+def test_disabled_wire_path_uses_fields(values, monkeypatch):
+    monkeypatch.setattr(body_analysis, "_LANDMARK_WIRE_ENABLED", False)
+    message = _landmark_list(values.tolist())
+    assert _landmark_list_from_wire(message) is None
+    np.testing.assert_array_equal(pose_landmarks_to_array(message), values)
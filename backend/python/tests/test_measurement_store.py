@@ -0,0 +1,139 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from measurement_store import MeasurementStore, SQLiteMeasurementStore, analysis_metrics, week_start
+
+# 2024-01-01 Pazartesi 00:00 UTC
+MONDAY = 1704067200.0
+DAY = 86400.0
+
+
+@pytest.fixture
+def store():
+    measurement_store = SQLiteMeasurementStore(":memory:", ema_alpha=0.5)
+    yield measurement_store
+    measurement_store.close()
+
+
+def test_interface_is_abstract():
+    class Incomplete(MeasurementStore):
+        def record(self, user_id, values, source, recorded_at=None):
+            return 0
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_week_start_is_monday_utc():
+    assert week_start(MONDAY) == MONDAY
+    assert week_start(MONDAY + 6 * DAY + 3600) == MONDAY
+    assert week_start(MONDAY - 1) == MONDAY - 7 * DAY
+
+
+def test_summary_tracks_count_mean_min_max_and_ema(store):
+    for i, value in enumerate([20.0, 22.0, 18.0]):
+        store.record("u1", {"bmi": value}, "calculate", recorded_at=MONDAY + i * DAY)
+
+    summary = store.summary("u1")["bmi"]
+    assert summary["count"] == 3
+    assert summary["mean"] == 20.0
+    assert (summary["min"], summary["max"]) == (18.0, 22.0)
+    assert summary["last"] == 18.0
+    # 20 -> 20 + 0.5 * (22 - 20) = 21 -> 21 + 0.5 * (18 - 21) = 19.5
+    assert summary["ema"] == 19.5
+    assert (summary["first_at"], summary["last_at"]) == (MONDAY, MONDAY + 2 * DAY)
+
+
+def test_backdated_record_updates_aggregates_but_not_ema(store):
+    store.record("u1", {"bmi": 20.0}, "calculate", recorded_at=MONDAY + 2 * DAY)
+    store.record("u1", {"bmi": 30.0}, "calculate", recorded_at=MONDAY)
+
+    summary = store.summary("u1", "bmi")["bmi"]
+    assert summary["count"] == 2
+    assert summary["max"] == 30.0
+    assert summary["first_at"] == MONDAY
+    assert summary["last"] == 20.0
+    assert summary["ema"] == 20.0
+
+
+def test_weekly_buckets_and_range_query(store):
+    store.record("u1", {"bmi": 20.0}, "calculate", recorded_at=MONDAY + DAY)
+    store.record("u1", {"bmi": 24.0}, "calculate", recorded_at=MONDAY + 5 * DAY)
+    store.record("u1", {"bmi": 22.0}, "calculate", recorded_at=MONDAY + 8 * DAY)
+    store.record("u2", {"bmi": 40.0}, "calculate", recorded_at=MONDAY + DAY)
+
+    weeks = store.weekly("u1", "bmi")
+    assert weeks == [
+        {"week_start": MONDAY, "count": 2, "mean": 22.0, "min": 20.0, "max": 24.0},
+        {"week_start": MONDAY + 7 * DAY, "count": 1, "mean": 22.0, "min": 22.0, "max": 22.0},
+    ]
+    assert store.weekly("u1", "bmi", start=MONDAY + 7 * DAY) == weeks[1:]
+
+    rows = store.query("u1", "bmi", start=MONDAY + 2 * DAY, end=MONDAY + 8 * DAY)
+    assert [row["value"] for row in rows] == [24.0]
+
+
+def test_analysis_metrics_skips_uncomputable_values():
+    result = {"Vücut Yağ Oranı (%)": "Hesaplanamadı", "Omuz Genişliği (px)": 200.5, "Boy Uzunluğu (px)": 900}
+    assert analysis_metrics(result) == {"shoulder_width_px": 200.5, "height_px": 900.0}
+
+
+@pytest.fixture
+def history_client(store, monkeypatch):
+    monkeypatch.setattr(main, "measurement_store", store)
+    monkeypatch.setattr(main, "MEASUREMENT_API_TOKEN", "secret")
+    store.record("u1", {"bmi": 21.0}, "calculate", recorded_at=MONDAY)
+    with TestClient(main.app) as client:
+        yield client
+
+
+def test_history_endpoints_require_token(history_client, monkeypatch):
+    assert history_client.get("/users/u1/measurements/summary").status_code == 401
+    response = history_client.get("/users/u1/measurements/summary", headers={"Authorization": "Bearer wrong"})
+    assert response.status_code == 401
+
+    response = history_client.get("/users/u1/measurements/summary", headers={"Authorization": "Bearer secret"})
+    assert response.status_code == 200
+    assert response.json()["metrics"]["bmi"]["count"] == 1
+
+    monkeypatch.setattr(main, "MEASUREMENT_API_TOKEN", "")
+    response = history_client.get("/users/u1/measurements", headers={"Authorization": "Bearer secret"})
+    assert response.status_code == 403
+
+
+def test_unauthenticated_write_with_user_id_is_rejected(history_client, store):
+    response = history_client.get("/calculate/bmi/", params={"weight": 70, "height": 175, "user_id": "u2"})
+    assert response.status_code == 401
+    response = history_client.get("/calculate/bmi/", params={"weight": 70, "height": 175, "user_id": "u2"},
+                                  headers={"Authorization": "Bearer wrong"})
+    assert response.status_code == 401
+    assert store.query("u2") == []
+
+    # user_id olmadan hesaplama herkese açık kalır ve geçmişe yazmaz
+    response = history_client.get("/calculate/bmi/", params={"weight": 70, "height": 175})
+    assert response.status_code == 200
+    assert store.query("u2") == []
+
+    response = history_client.get("/calculate/bmi/", params={"weight": 70, "height": 175, "user_id": "u2"},
+                                  headers={"Authorization": "Bearer secret"})
+    assert response.status_code == 200
+    assert [row["metric"] for row in store.query("u2")] == ["bmi"]
+
+
+def test_unauthenticated_upload_with_user_id_is_rejected_before_analysis(history_client, store, monkeypatch):
+    async def fail_analysis(*args, **kwargs):
+        raise AssertionError("Yetkisiz istek analiz edilmemeli")
+
+    monkeypatch.setattr(main, "_analyze_image_cached", fail_analysis)
+    response = history_client.post("/analyze_image/", data={"user_id": "u1"},
+                                   files={"file": ("a.png", b"\x89PNG\r\n\x1a\n", "image/png")})
+    assert response.status_code == 401
+    assert len(store.query("u1")) == 1
+
+
+def test_websocket_with_user_id_requires_token(history_client):
+    with history_client.websocket_connect("/ws/analyze_video/?user_id=u1") as websocket:
+        message = websocket.receive_json()
+    assert message == {"error": "Geçersiz veya eksik yetkilendirme."}
+    assert main._active_video_streams == 0
@@ -0,0 +1,48 @@
+import asyncio
+
+import metrics
+
+
+def _run_request(app, path="/items/1"):
+    scope = {"type": "http", "path": path, "method": "GET", "headers": []}
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(metrics.RequestMetricsMiddleware(app)(scope, receive, send))
+    return sent
+
+
+def _count(endpoint, status):
+    return metrics.REQUESTS._values.get(metrics.REQUESTS._key({"endpoint": endpoint, "status": status}), 0)
+
+
+def test_request_metrics_use_route_template_and_response_status():
+    class Route:
+        path = "/items/{item_id}"
+
+    async def app(scope, receive, send):
+        scope["route"] = Route()
+        await send({"type": "http.response.start", "status": 201, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    before = _count("/items/{item_id}", 201)
+    sent = _run_request(app)
+    assert [message["type"] for message in sent] == ["http.response.start", "http.response.body"]
+    assert _count("/items/{item_id}", 201) == before + 1
+
+
+def test_request_metrics_count_unhandled_errors_as_500():
+    async def app(scope, receive, send):
+        raise RuntimeError("boom")
+
+    before = _count("unmatched", 500)
+    try:
+        _run_request(app)
+    except RuntimeError:
+        pass
+    assert _count("unmatched", 500) == before + 1
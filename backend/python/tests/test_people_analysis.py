@@ -0,0 +1,163 @@
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import body_analysis
+import main
+from body_analysis import combine_people, people_crop_landmarks, prepare_people_crops
+from image_io import PreparedImage
+
+
+def _encode(image):
+    ok, buf = cv2.imencode(".png", image)
+    assert ok
+    return buf.tobytes()
+
+
+def _standing_figures(count, width=1600, height=800):
+    """Düz arka plan önünde `count` dik dikdörtgen (kişi adayı bölgeleri)."""
+    image = np.full((height, width, 3), 230, dtype=np.uint8)
+    step = width // count
+    for i in range(count):
+        x = i * step + step // 4
+        image[100:700, x:x + step // 3] = 40
+    return image
+
+
+def _person(center_x, visibility=0.9, width=0.1):
+    """Orijinal görüntüye göre normalize, `center_x` etrafında dik duran bir iskelet."""
+    landmarks = np.zeros((33, 4), dtype=np.float32)
+    landmarks[:, 0] = center_x + np.linspace(-width / 2, width / 2, 33)
+    landmarks[:, 1] = np.linspace(0.1, 0.9, 33)
+    landmarks[:, 3] = visibility
+    return landmarks
+
+
+class FakePosePool:
+    def __init__(self, found_on=None):
+        # found_on: landmark döndürülecek kırpıntı genişlikleri (None: hepsi)
+        self.found_on = found_on
+        self.seen = []
+
+    @contextmanager
+    def checkout(self):
+        yield self
+
+    def process(self, image):
+        assert image.flags["C_CONTIGUOUS"]
+        self.seen.append(image.shape)
+        if self.found_on is not None and image.shape[1] not in self.found_on:
+            return SimpleNamespace(pose_landmarks=None)
+        points = [SimpleNamespace(x=0.5, y=0.5, z=0.0, visibility=0.9) for _ in range(33)]
+        return SimpleNamespace(pose_landmarks=points)
+
+
+def test_box_iou():
+    assert body_analysis._box_iou((0, 0, 10, 10), (0, 0, 10, 10)) == 1.0
+    assert body_analysis._box_iou((0, 0, 10, 10), (20, 0, 30, 10)) == 0.0
+    assert body_analysis._box_iou((0, 0, 10, 10), (5, 0, 15, 10)) == pytest.approx(50 / 150)
+
+
+def test_combine_people_removes_duplicates_and_sorts_left_to_right():
+    shape = (800, 1600, 3)
+    detections = [
+        ((900, 0, 400, 800), 0.8, _person(0.7)),
+        # Aynı kişi, daha az görünür ikinci kırpıntı: atılır
+        ((850, 0, 500, 800), 0.9, _person(0.7, visibility=0.6)),
+        ((100, 0, 400, 800), 0.7, _person(0.2)),
+        ((500, 0, 100, 800), 0.5, None),
+    ]
+    result = combine_people(shape, detections, "male")
+    assert result["count"] == 2
+    assert [person["bbox"] for person in result["people"]] == [[100, 0, 400, 800], [900, 0, 400, 800]]
+    assert [person["score"] for person in result["people"]] == [0.7, 0.8]
+
+
+def test_combine_people_without_landmarks_raises():
+    with pytest.raises(body_analysis.BodyAnalysisError) as e:
+        combine_people((10, 10, 3), [((0, 0, 10, 10), None, None)])
+    assert e.value.reason == "no_pose_detected"
+
+
+def test_prepare_people_crops_respects_max_people():
+    buf = _encode(_standing_figures(4))
+    _, crops = prepare_people_crops(buf, max_people=4)
+    assert len(crops) == 4
+    _, crops = prepare_people_crops(buf, max_people=2)
+    assert len(crops) == 2
+
+
+def test_prepare_people_crops_maps_downscaled_regions_to_original(monkeypatch):
+    monkeypatch.setattr(body_analysis, "detect_person_regions", lambda image, max_people: [(100, 50, 200, 300, 0.9)])
+    # 1600x800 görüntü 800 piksele küçültülerek çözülür: bölge koordinatları x2 ölçeklenir
+    original_shape, crops = prepare_people_crops(_encode(_standing_figures(2)), max_long_edge=800)
+    assert original_shape[:2] == (800, 1600)
+    crop, wider, score = crops[0]
+    assert crop.image.shape[:2] == (300, 200)
+    assert crop.roi == (200.0, 100.0, 400.0, 600.0)
+    assert score == 0.9
+    # Geniş kadraj her yönde %25 büyür ve görüntü sınırlarına kırpılır
+    assert wider.roi == (100.0, 0.0, 600.0, 400 * 2.0)
+
+
+def test_prepare_people_crops_falls_back_to_whole_image(monkeypatch):
+    monkeypatch.setattr(body_analysis, "detect_person_regions", lambda image, max_people: [])
+    _, crops = prepare_people_crops(_encode(_standing_figures(1, width=400, height=800)), max_long_edge=0)
+    assert [(crop.roi, score) for crop, _, score in crops] == [((0.0, 0.0, 400.0, 800.0), None)]
+
+
+def test_people_crop_landmarks_remaps_and_retries_wider_crop():
+    image = np.zeros((800, 1600, 3), dtype=np.uint8)
+    crop = PreparedImage(image[0:400, 400:800], image.shape, (400, 0, 400, 400))
+    wider = PreparedImage(image[0:800, 200:1000], image.shape, (200, 0, 800, 800))
+
+    pool = FakePosePool(found_on={800})
+    roi, landmarks = people_crop_landmarks(crop, wider, pose_pool=pool)
+    assert pool.seen == [(400, 400, 3), (800, 800, 3)]
+    assert roi == (200, 0, 800, 800)
+    # Kırpıntı merkezindeki nokta orijinal görüntüde (600, 400) piksele denk gelir
+    assert landmarks[0, 0] == pytest.approx(600 / 1600)
+    assert landmarks[0, 1] == pytest.approx(400 / 800)
+
+    assert people_crop_landmarks(crop, None, pose_pool=FakePosePool(found_on=set())) is None
+
+
+def test_people_endpoint_runs_each_crop_through_the_executor(monkeypatch):
+    calls = []
+    crops = [
+        (PreparedImage(None, (800, 1600, 3), (0, 0, 800, 800)), None, 0.9),
+        (PreparedImage(None, (800, 1600, 3), (800, 0, 800, 800)), None, 0.8),
+    ]
+
+    async def fake_run(fn, *args, timeout=None):
+        calls.append(fn.__name__)
+        if fn.__name__ == "prepare_people_image_bytes":
+            return (800, 1600, 3), crops
+        if fn.__name__ == "people_crop_landmarks":
+            crop = args[0]
+            return crop.roi, _person((crop.roi[0] + 400) / 1600)
+        return fn(*args)
+
+    monkeypatch.setattr(main, "result_cache", None)
+    with TestClient(main.app) as client:
+        monkeypatch.setattr(main.inference_executor, "run", fake_run)
+        response = client.post("/analyze_image/people", files={"file": ("a.png", _encode(_standing_figures(2)), "image/png")})
+    assert response.status_code == 200
+    assert response.json()["count"] == 2
+    assert calls == ["prepare_people_image_bytes", "people_crop_landmarks", "people_crop_landmarks", "combine_people"]
+
+
+def test_people_endpoint_formats_unexpected_errors(monkeypatch):
+    async def failing_run(fn, *args, timeout=None):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(main, "result_cache", None)
+    with TestClient(main.app, raise_server_exceptions=False) as client:
+        monkeypatch.setattr(main.inference_executor, "run", failing_run)
+        response = client.post("/analyze_image/people", files={"file": ("a.png", _encode(_standing_figures(2)), "image/png")})
+    assert response.status_code == 500
+    assert response.json() == {"detail": "Görüntü analizi sırasında sunucuda beklenmedik bir hata oluştu."}
@@ -0,0 +1,104 @@
+import itertools
+
+import pytest
+
+from pose_pool import PosePool, PosePoolError
+
+
+class FakePose:
+    def __init__(self, ident):
+        self.ident = ident
+        self.closed = False
+        self.broken = False
+
+    def process(self, image):
+        if self.broken:
+            raise RuntimeError("graf bozuk")
+        return None
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def created(monkeypatch):
+    """mediapipe yüklemeden havuzun oluşturduğu sahte tahminleyicileri toplar."""
+    poses = []
+    counter = itertools.count()
+
+    def create(self):
+        pose = FakePose(next(counter))
+        poses.append(pose)
+        return pose
+
+    monkeypatch.setattr(PosePool, "_create", create)
+    return poses
+
+
+def test_estimators_are_created_once_and_reused(created):
+    pool = PosePool(size=2, checkout_timeout=0.01)
+    assert len(created) == 2
+    for _ in range(5):
+        with pool.checkout() as pose:
+            assert pool.stats()["in_use"] == 1
+        # LIFO: en son geri verilen (en sıcak) tahminleyici tekrar verilir
+        with pool.checkout() as again:
+            assert again is pose
+    assert len(created) == 2
+    assert pool.stats() == {"size": 2, "in_use": 0, "available": 2, "recreated": 0}
+
+
+def test_failing_estimator_is_replaced(created):
+    pool = PosePool(size=1, checkout_timeout=0.01)
+    with pytest.raises(RuntimeError):
+        with pool.checkout() as pose:
+            raise RuntimeError("çıkarım hatası")
+    assert pose.closed
+    with pool.checkout() as replacement:
+        assert replacement is not pose
+    assert pool.stats()["recreated"] == 1
+    assert pool.stats()["available"] == 1
+
+
+def test_exhausted_pool_raises_after_timeout(created):
+    pool = PosePool(size=1, checkout_timeout=0.01)
+    with pool.checkout():
+        with pytest.raises(PosePoolError):
+            with pool.checkout():
+                pass
+    # Tahminleyici geri verildikten sonra tekrar alınabilir
+    with pool.checkout():
+        pass
+
+
+def test_health_check_replaces_broken_estimators_and_refills_capacity(created, monkeypatch):
+    pool = PosePool(size=2, checkout_timeout=0.01)
+    created[0].broken = True
+    assert pool.health_check() == 2
+    assert created[0].closed
+    assert pool.stats()["recreated"] == 1
+
+    # Yeniden oluşturma başarısız olursa kapasite eksik kalır; sonraki kontrol tamamlar
+    def unavailable(self):
+        raise RuntimeError("model yok")
+
+    original_create = PosePool._create
+    monkeypatch.setattr(PosePool, "_create", unavailable)
+    with pytest.raises(ValueError):
+        with pool.checkout():
+            raise ValueError("çıkarım hatası")
+    assert pool.stats()["available"] == 1
+    monkeypatch.setattr(PosePool, "_create", original_create)
+    assert pool.health_check() == 2
+    assert pool.stats()["available"] == 2
+
+
+def test_closed_pool_rejects_checkout_and_discards_returned_estimators(created):
+    pool = PosePool(size=2, checkout_timeout=0.01)
+    with pool.checkout() as pose:
+        pool.close()
+    assert pose.closed
+    assert all(p.closed for p in created)
+    with pytest.raises(PosePoolError):
+        with pool.checkout():
+            pass
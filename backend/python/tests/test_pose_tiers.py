@@ -0,0 +1,128 @@
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import body_analysis
+import pose_pool
+from pose_pool import TieredPosePool
+
+IMAGE = np.zeros((8, 8, 3), dtype=np.uint8)
+
+
+class FakePosePool:
+    """Sabit görünürlükte 33 nokta (veya visibility None ise kişi yok) döndüren sahte havuz."""
+
+    def __init__(self, visibility):
+        self.visibility = visibility
+        self.calls = 0
+
+    @contextmanager
+    def checkout(self):
+        yield self
+
+    def process(self, image):
+        self.calls += 1
+        if self.visibility is None:
+            return SimpleNamespace(pose_landmarks=None)
+        landmarks = [SimpleNamespace(x=0.5, y=0.5, z=0.0, visibility=self.visibility) for _ in range(33)]
+        return SimpleNamespace(pose_landmarks=landmarks)
+
+
+def _tiers(pools, complexities=(0, 1, 2)):
+    tiers = TieredPosePool(complexities, size=1)
+    for complexity, pool in pools.items():
+        if pool is None:
+            tiers._unavailable.add(complexity)
+        else:
+            tiers._pools[complexity] = pool
+    return tiers
+
+
+def _outcomes(tiers):
+    return {(entry["complexity"], entry["outcome"]): entry["count"] for entry in tiers.stats()["outcomes"]}
+
+
+@pytest.fixture(autouse=True)
+def min_visibility(monkeypatch):
+    monkeypatch.setattr(body_analysis, "POSE_TIER_MIN_VISIBILITY", 0.6)
+
+
+def test_cheap_tier_accepted_without_escalation():
+    pools = {0: FakePosePool(0.9), 1: FakePosePool(0.9), 2: FakePosePool(0.9)}
+    tiers = _tiers(pools)
+    landmarks = body_analysis._tiered_pose_landmarks(IMAGE, tiers)
+    assert landmarks.shape == (33, 4)
+    assert [pool.calls for pool in pools.values()] == [1, 0, 0]
+    assert _outcomes(tiers) == {(0, "accepted"): 1}
+
+
+def test_low_visibility_escalates_to_next_tier():
+    pools = {0: FakePosePool(0.3), 1: FakePosePool(0.8), 2: FakePosePool(0.9)}
+    tiers = _tiers(pools)
+    landmarks = body_analysis._tiered_pose_landmarks(IMAGE, tiers)
+    assert landmarks[0, 3] == pytest.approx(0.8)
+    assert [pool.calls for pool in pools.values()] == [1, 1, 0]
+    assert _outcomes(tiers) == {(0, "escalated"): 1, (1, "accepted"): 1}
+
+
+def test_all_tiers_low_visibility_returns_most_visible():
+    pools = {0: FakePosePool(0.2), 1: FakePosePool(0.5), 2: FakePosePool(0.4)}
+    tiers = _tiers(pools)
+    landmarks = body_analysis._tiered_pose_landmarks(IMAGE, tiers)
+    assert landmarks[0, 3] == pytest.approx(0.5)
+    assert _outcomes(tiers) == {(0, "escalated"): 1, (1, "escalated"): 1, (2, "low_visibility"): 1}
+
+
+def test_no_pose_stops_escalation():
+    pools = {0: FakePosePool(None), 1: FakePosePool(0.9), 2: FakePosePool(0.9)}
+    tiers = _tiers(pools)
+    assert body_analysis._tiered_pose_landmarks(IMAGE, tiers) is None
+    assert [pool.calls for pool in pools.values()] == [1, 0, 0]
+    assert _outcomes(tiers) == {(0, "no_pose"): 1}
+
+
+def test_unavailable_tiers_are_skipped():
+    pools = {0: None, 1: FakePosePool(0.3), 2: None}
+    tiers = _tiers(pools)
+    landmarks = body_analysis._tiered_pose_landmarks(IMAGE, tiers)
+    assert landmarks[0, 3] == pytest.approx(0.3)
+    assert _outcomes(tiers) == {(1, "low_visibility"): 1}
+
+
+def test_falls_back_to_base_pool_when_no_tier_available():
+    base_pool = FakePosePool(0.9)
+    tiers = _tiers({0: None, 2: None}, complexities=(0, 2))
+    landmarks = body_analysis._tiered_pose_landmarks(IMAGE, tiers, pose_pool=base_pool)
+    assert landmarks.shape == (33, 4)
+    assert base_pool.calls == 1
+    assert _outcomes(tiers) == {}
+
+
+def test_missing_model_file_skips_tier_without_loading(monkeypatch, tmp_path):
+    def fail_to_load(*args, **kwargs):
+        raise AssertionError("Modeli olmayan kademe için Pose oluşturulmamalı")
+
+    monkeypatch.setattr(pose_pool, "pose_model_path", lambda complexity: str(tmp_path / f"missing{complexity}.tflite"))
+    monkeypatch.setattr(pose_pool, "PosePool", fail_to_load)
+    tiers = TieredPosePool((0, 2), size=1)
+    assert tiers.prepare() == []
+    assert tiers.stats()["unavailable"] == [0, 2]
+
+
+def test_flat_image_filter_only_rejects_uniform_images():
+    import cv2
+
+    flat = np.full((480, 320, 3), 30, dtype=np.uint8)
+    textured = np.random.default_rng(0).integers(0, 255, (480, 320, 3), dtype=np.uint8)
+    assert body_analysis._is_flat_image(flat)
+    assert not body_analysis._is_flat_image(textured)
+
+    ok, buf = cv2.imencode(".png", flat)
+    pool = FakePosePool(0.9)
+    with pytest.raises(body_analysis.BodyAnalysisError) as e:
+        body_analysis.analyze_body_bytes(buf.tobytes(), pose_pool=pool)
+    assert e.value.reason == "flat_image"
+    # Pose çalıştırılmadan reddedilir
+    assert pool.calls == 0
@@ -0,0 +1,82 @@
+import asyncio
+
+from result_cache import ResultCache
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", {"v": 1})
+    cache.put("b", {"v": 2})
+    assert cache.get("a") == {"v": 1}  # a en son kullanılan olur
+    cache.put("c", {"v": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1}
+    assert cache.get("c") == {"v": 3}
+    stats = cache.stats()
+    assert stats["memory_evictions"] == 1
+    assert stats["misses"] == 1
+
+
+def test_disk_tier_evicts_by_last_access_and_keeps_row_count(tmp_path):
+    cache = ResultCache(max_entries=0, disk_path=str(tmp_path / "cache.db"), max_disk_entries=2, access_flush_size=100)
+    cache.put("a", {"v": 1})
+    cache.put("b", {"v": 2})
+    # Erişim zamanı henüz yazılmadı (toplu); tahliyeden önce yazılmalı ki "a" tutulsun
+    assert cache.get("a") == {"v": 1}
+    cache.put("c", {"v": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1}
+    stats = cache.stats()
+    assert stats["disk_entries"] == 2
+    assert stats["disk_evictions"] == 1
+    assert stats["disk_hits"] == 2
+
+    # Aynı anahtarın yeniden yazılması kayıt sayısını artırmaz
+    cache.put("c", {"v": 4})
+    assert cache.stats()["disk_entries"] == 2
+    assert cache.get("c") == {"v": 4}
+    cache.close()
+
+
+def test_disk_row_count_survives_reopen(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = ResultCache(max_entries=0, disk_path=path)
+    for i in range(3):
+        cache.put(str(i), {"v": i})
+    cache.close()
+
+    reopened = ResultCache(max_entries=0, disk_path=path, max_disk_entries=2)
+    assert reopened.stats()["disk_entries"] == 3
+    reopened.put("3", {"v": 3})
+    assert reopened.stats()["disk_entries"] == 2
+    reopened.close()
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    cache = ResultCache(max_entries=4, disk_path=str(tmp_path / "cache.db"), ttl=10)
+    cache.put("a", {"v": 1})
+    cache._memory["a"] = (0.0, {"v": 1})
+    cache._db.execute("UPDATE analysis_cache SET created_at = 0")
+
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["expirations"] == 2
+    assert stats["disk_entries"] == 0
+    cache.close()
+
+
+def test_async_methods_use_both_tiers(tmp_path):
+    cache = ResultCache(max_entries=1, disk_path=str(tmp_path / "cache.db"))
+
+    async def scenario():
+        await cache.aput("a", {"v": 1})
+        await cache.aput("b", {"v": 2})  # "a" bellekten düşer, diskte kalır
+        return await cache.aget("a"), await cache.aget("missing")
+
+    assert asyncio.run(scenario()) == ({"v": 1}, None)
+    stats = cache.stats()
+    assert stats["disk_hits"] == 1
+    assert stats["misses"] == 1
+    cache.close()
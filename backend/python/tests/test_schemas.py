@@ -0,0 +1,50 @@
+import cv2
+import numpy as np
+from fastapi.testclient import TestClient
+
+import main
+from schemas import COMPACT_LABELS, LEGACY_TO_COMPACT, BodyAnalysisCompact, to_compact
+
+SAMPLE_RESULT = {
+    "Vücut Yağ Oranı (%)": 18.43,
+    "Bel-Kalça Oranı (WHR)": 0.87,
+    "Kalça/Omuz Genişlik Oranı": 0.87,
+    "Omuz Genişliği (px)": 241.52,
+    "Kalça Genişliği (px)": 210.17,
+    "Boy Uzunluğu (px)": 1104,
+}
+
+
+def test_compact_model_labels_and_mapping_share_keys():
+    assert set(BodyAnalysisCompact.model_fields) == set(COMPACT_LABELS)
+    assert set(LEGACY_TO_COMPACT.values()) == set(COMPACT_LABELS)
+
+
+def test_to_compact_keeps_every_key_and_nulls_missing_values():
+    compact = to_compact({"Vücut Yağ Oranı (%)": "Hesaplanamadı", "Boy Uzunluğu (px)": 900})
+    assert list(compact) == list(COMPACT_LABELS)
+    assert compact["body_fat"] is None
+    assert compact["height_px"] == 900
+    assert compact["shoulder_px"] is None
+    # Çıktı belgelenen modelle uyumlu olmalı
+    assert BodyAnalysisCompact.model_validate(compact).model_dump() == compact
+
+
+def test_compact_response_keys_match_schema_labels(monkeypatch):
+    async def fake_analysis(contents, gender, timings=None):
+        return dict(SAMPLE_RESULT)
+
+    monkeypatch.setattr(main, "_analyze_image_cached", fake_analysis)
+    ok, buf = cv2.imencode(".png", np.zeros((8, 8, 3), dtype=np.uint8))
+    assert ok
+    with TestClient(main.app) as client:
+        labels = client.get("/schema/labels").json()
+        response = client.post(
+            "/analyze_image/",
+            params={"compact": "true"},
+            files={"file": ("a.png", buf.tobytes(), "image/png")},
+        )
+    assert response.status_code == 200
+    body = response.json()
+    assert set(body) == set(labels)
+    assert body["hip_shoulder"] == 0.87
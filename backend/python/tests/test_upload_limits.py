@@ -0,0 +1,88 @@
+import asyncio
+import io
+
+import pytest
+from fastapi import FastAPI, Request, UploadFile
+from fastapi.testclient import TestClient
+
+import main
+from image_header import ImageRejectedError
+from upload_intake import RequestSizeLimitMiddleware, read_image_upload
+
+
+def _limited_app(limits):
+    app = FastAPI()
+
+    @app.post("/small/echo")
+    async def small_echo(request: Request):
+        return {"size": len(await request.body())}
+
+    @app.post("/big")
+    async def big(request: Request):
+        return {"size": len(await request.body())}
+
+    app.add_middleware(RequestSizeLimitMiddleware, limits=limits)
+    return app
+
+
+def _chunks(total, chunk_size=64):
+    for start in range(0, total, chunk_size):
+        yield b"x" * min(chunk_size, total - start)
+
+
+def test_content_length_over_limit_is_rejected_with_cors_headers():
+    with TestClient(main.app) as client:
+        limit = main.MAX_UPLOAD_BYTES + main.MULTIPART_OVERHEAD_BYTES
+        response = client.post(
+            "/analyze_image/",
+            content=b"x",
+            headers={"content-length": str(limit + 1), "origin": "https://example.com"},
+        )
+    assert response.status_code == 413
+    assert response.json() == {"detail": "İstek boyutu sınırı aşıldı."}
+    # Boyut sınırı CORS'un içinde kalmalı; aksi halde tarayıcı 413'ü göremez
+    assert "access-control-allow-origin" in response.headers
+
+
+def test_streamed_body_over_limit_is_rejected():
+    with TestClient(_limited_app({"/small": 100})) as client:
+        response = client.post("/small/echo", content=_chunks(500))
+    assert response.status_code == 413
+    assert response.json() == {"detail": "İstek boyutu sınırı aşıldı."}
+
+
+def test_limits_apply_per_route_prefix():
+    with TestClient(_limited_app({"/small": 100})) as client:
+        assert client.post("/small/echo", content=b"x" * 100).json() == {"size": 100}
+        assert client.post("/small/echo", content=b"x" * 101).status_code == 413
+        # Sınırı tanımlanmamış yol etkilenmez
+        assert client.post("/big", content=_chunks(500)).json() == {"size": 500}
+
+
+def test_longest_prefix_wins():
+    with TestClient(_limited_app({"/small": 100, "/small/echo": 1000})) as client:
+        assert client.post("/small/echo", content=b"x" * 500).json() == {"size": 500}
+
+
+def _upload(data, size=None):
+    return UploadFile(io.BytesIO(data), size=size, filename="a.png")
+
+
+def test_read_image_upload_rejects_oversized_without_reading():
+    upload = _upload(b"", size=1000)
+    with pytest.raises(ImageRejectedError) as exc_info:
+        asyncio.run(read_image_upload(upload, max_bytes=100))
+    assert exc_info.value.reason == "too_large"
+
+
+def test_read_image_upload_rejects_oversized_stream():
+    # Boyutu bilinmeyen yüklemede sınır okuma sırasında uygulanır
+    with pytest.raises(ImageRejectedError) as exc_info:
+        asyncio.run(read_image_upload(_upload(b"\x89PNG" + b"x" * 200), max_bytes=100))
+    assert exc_info.value.reason == "too_large"
+
+
+def test_read_image_upload_rejects_empty_file():
+    with pytest.raises(ImageRejectedError) as exc_info:
+        asyncio.run(read_image_upload(_upload(b"")))
+    assert exc_info.value.reason == "empty_image"
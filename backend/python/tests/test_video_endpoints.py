@@ -0,0 +1,62 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from pose_pool import PosePoolError
+
+
+@pytest.fixture
+def client():
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+def test_websocket_slot_released_when_analyzer_fails(client, monkeypatch):
+    def failing_analyzer(gender):
+        raise PosePoolError("Uygun Pose tahminleyicisi bulunamadı (havuz dolu).")
+
+    monkeypatch.setattr(main, "_new_video_analyzer", failing_analyzer)
+    monkeypatch.setattr(main, "VIDEO_MAX_STREAMS", 1)
+
+    for _ in range(3):
+        with client.websocket_connect("/ws/analyze_video/") as websocket:
+            message = websocket.receive_json()
+        # Yuva sızsaydı ikinci bağlantı "yoğun" yanıtı alırdı
+        assert message == {"error": "Video analizi başlatılamadı, lütfen daha sonra tekrar deneyin."}
+    assert main._active_video_streams == 0
+
+
+def test_websocket_slot_released_after_stream(client, monkeypatch):
+    closed = []
+
+    class FakeAnalyzer:
+        def should_process(self, elapsed):
+            return True
+
+        def process_encoded_frame(self, data):
+            return True
+
+        def summary(self):
+            return {"result": {"Boy Uzunluğu (px)": 900}, "frames": 1}
+
+        def close(self):
+            closed.append(True)
+
+    monkeypatch.setattr(main, "_new_video_analyzer", lambda gender: FakeAnalyzer())
+    with client.websocket_connect("/ws/analyze_video/") as websocket:
+        websocket.send_bytes(b"frame")
+        assert websocket.receive_json() == {"frame": 0, "detected": True}
+        websocket.send_text("end")
+        assert websocket.receive_json()["frames"] == 1
+    assert closed == [True]
+    assert main._active_video_streams == 0
+
+
+def test_analyze_video_maps_pose_pool_exhaustion_to_503(client, monkeypatch):
+    async def exhausted(*args, **kwargs):
+        raise PosePoolError("Uygun Pose tahminleyicisi bulunamadı (havuz dolu).")
+
+    monkeypatch.setattr(main.inference_executor, "run", exhausted)
+    response = client.post("/analyze_video/", files={"file": ("a.mp4", b"\x00" * 16, "video/mp4")})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
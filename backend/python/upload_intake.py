@@ -0,0 +1,126 @@
+import os
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+from image_header import ImageRejectedError, check_image_header
+
+# Tek bir resim yüklemesi için bayt sınırı
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# multipart sınırları ve form alanları için istek gövdesine tanınan pay
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# ImageRejectedError nedenlerinin HTTP durum kodları
+REJECTION_STATUS = {
+    "too_large": 413,
+    "dimensions_too_large": 413,
+    "unsupported_format": 415,
+    "invalid_header": 400,
+    "empty_image": 400,
+}
+
+
+async def read_image_upload(upload, max_bytes=None):
+    """
+    Yüklenen resmi parçalar halinde sınırlı bir tampona okur.
+
+    Biçim ve boyutlar ilk baytlardan (tam çözme yapılmadan) okunur; boyut sınırını aşan,
+    resim olmayan veya boyutları çok büyük yüklemeler okuma bitmeden ImageRejectedError ile
+    reddedilir. (tampon, (biçim, genişlik, yükseklik)) döndürür.
+
+    Not: Bu fonksiyon uç nokta içinde, Starlette multipart gövdeyi ayrıştırdıktan sonra çalışır;
+    1 MB'tan büyük dosya parçaları o sırada geçici diske yazılmış olur. Buradaki sınır ve başlık
+    kontrolleri çözme ve çıkarımı korur. Ayrıştırmadan önceki (bellek/disk) sınır
+    RequestSizeLimitMiddleware'in yol başına gövde sınırıdır.
+    """
+    max_bytes = MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+    # Boyut biliniyorsa hiç okumadan reddet
+    if upload.size is not None and upload.size > max_bytes:
+        raise ImageRejectedError("Resim boyutu sınırı aşıldı.", reason="too_large")
+
+    buffer = bytearray()
+    info = None
+    while True:
+        chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        if len(buffer) + len(chunk) > max_bytes:
+            raise ImageRejectedError("Resim boyutu sınırı aşıldı.", reason="too_large")
+        buffer += chunk
+        if info is None:
+            info = check_image_header(buffer, complete=False)
+
+    if not buffer:
+        raise ImageRejectedError("Yüklenen dosya boş.", reason="empty_image")
+    if info is None:
+        info = check_image_header(buffer)
+    return buffer, info
+
+
+def rejection_to_http(error):
+    return HTTPException(status_code=REJECTION_STATUS.get(error.reason, 400), detail=str(error))
+
+
+class RequestSizeLimitMiddleware:
+    """
+    Yol önekine göre istek gövdesi boyutunu sınırlayan ASGI ara katmanı.
+
+    Starlette multipart gövdeyi uç nokta çalışmadan önce tamamen ayrıştırıp biriktirdiği (1 MB'tan
+    büyük dosya parçalarını geçici diske yazdığı) için sınır burada uygulanır: Content-Length
+    sınırı aşıyorsa gövde hiç okunmadan, aşmıyorsa (veya chunked gönderimde) okunan bayt sayısı
+    sınırı geçtiği anda 413 döner. Böylece diske yazılan miktar da yolun sınırıyla kısıtlıdır.
+    Önekler yol başıyla eşleşir (en uzun önek önce); "/analyze_image/" alt yolları da kapsar.
+
+    CORS ara katmanından sonra eklenmelidir (yani onun içinde kalmalıdır); 413 yanıtları da
+    CORS başlıklarını taşır.
+    """
+
+    def __init__(self, app, limits):
+        self.app = app
+        # En uzun önek önce eşleşsin
+        self.limits = sorted(limits.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def _limit_for(self, path):
+        for prefix, limit in self.limits:
+            if path.startswith(prefix):
+                return limit
+        return None
+
+    async def __call__(self, scope, receive, send):
+        limit = self._limit_for(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        too_large = HTTPException(status_code=413, detail="İstek boyutu sınırı aşıldı.")
+        for name, value in scope.get("headers", ()):
+            if name == b"content-length" and value.isdigit() and int(value) > limit:
+                await JSONResponse({"detail": too_large.detail}, status_code=413)(scope, receive, send)
+                return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # FastAPI gövde ayrıştırırken HTTPException'ı olduğu gibi iletir
+                    raise too_large
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except HTTPException as e:
+            if e is not too_large or response_started:
+                raise
+            await JSONResponse({"detail": too_large.detail}, status_code=413)(scope, receive, send)
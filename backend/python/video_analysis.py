@@ -0,0 +1,193 @@
+import os
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from body_analysis import (
+    BodyAnalysisError,
+    _body_measurements_batch,
+    _calculate_internal_body_fat_from_measurements,
+    pose_landmarks_to_array,
+)
+from image_io import decode_for_inference
+
+mp_pose = mp.solutions.pose
+
+# Video ayarları (ortam değişkenleriyle yapılandırılabilir)
+VIDEO_TARGET_FPS = float(os.getenv("VIDEO_TARGET_FPS", "10"))
+VIDEO_MAX_EDGE = int(os.getenv("VIDEO_MAX_EDGE", "640"))
+VIDEO_MAX_ANALYZED_FRAMES = int(os.getenv("VIDEO_MAX_ANALYZED_FRAMES", "300"))
+VIDEO_MODEL_COMPLEXITY = int(os.getenv("VIDEO_MODEL_COMPLEXITY", "1"))
+VIDEO_MIN_VALID_FRAMES = int(os.getenv("VIDEO_MIN_VALID_FRAMES", "3"))
+
+# Aykırı değer eşiği (modifiye z-skoru, Iglewicz & Hoaglin önerisi)
+_OUTLIER_Z = 3.5
+
+
+def _robust_mean(values):
+    """Medyan mutlak sapma (MAD) ile aykırı değerleri ayıklayıp kalanların ortalamasını döndürür."""
+    median = np.median(values)
+    mad = np.median(np.abs(values - median))
+    if mad == 0:
+        inliers = values[values == median] if np.any(values == median) else values
+    else:
+        modified_z = 0.6745 * (values - median) / mad
+        inliers = values[np.abs(modified_z) <= _OUTLIER_Z]
+    return float(inliers.mean()), inliers.size
+
+
+class VideoBodyAnalyzer:
+    """
+    Video veya canlı kare akışından tek ve kararlı bir vücut analizi sonucu üretir.
+
+    Pose `static_image_mode=False` ile çalışır: takip (tracking) modu her karede kişiyi
+    yeniden tespit etmez, bu yüzden kare başına maliyet statik moddan çok daha düşüktür.
+    Kareler uyarlamalı olarak alt örneklenir: iki analiz arasındaki aralık, hedef FPS ile
+    ölçülen işlem süresinin büyüğüdür; böylece CPU yetişemediğinde kareler kuyruğa
+    birikmek yerine atlanır ve analiz gerçek zamanın gerisinde kalmaz.
+
+    Kare başına landmarklar (33, 4) diziler olarak saklanır; sonuç `summary()` ile
+    tüm karelerin ölçümleri tek geçişte hesaplanıp aykırı değerler ayıklanarak birleştirilir.
+    """
+
+    def __init__(self, gender="male", target_fps=None, max_long_edge=None, max_frames=None, model_complexity=None):
+        self.gender = gender
+        self.target_fps = target_fps or VIDEO_TARGET_FPS
+        self.max_long_edge = VIDEO_MAX_EDGE if max_long_edge is None else max_long_edge
+        self.max_frames = max_frames or VIDEO_MAX_ANALYZED_FRAMES
+        self._pose = mp_pose.Pose(
+            static_image_mode=False,
+            model_complexity=VIDEO_MODEL_COMPLEXITY if model_complexity is None else model_complexity,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5,
+        )
+        self._landmarks = []
+        self._shapes = []
+        self._last_timestamp = None
+        self._avg_process_time = 0.0
+        self.frames_seen = 0
+        self.frames_analyzed = 0
+        self.frames_detected = 0
+
+    @property
+    def min_interval(self):
+        return max(1.0 / self.target_fps, self._avg_process_time)
+
+    @property
+    def full(self):
+        return self.frames_analyzed >= self.max_frames
+
+    def should_process(self, timestamp):
+        """Verilen zaman damgasındaki (saniye) karenin analiz edilip edilmeyeceğine karar verir."""
+        self.frames_seen += 1
+        if self.full:
+            return False
+        if self._last_timestamp is not None and timestamp - self._last_timestamp < self.min_interval:
+            return False
+        self._last_timestamp = timestamp
+        return True
+
+    def _prepare(self, frame):
+        h, w = frame.shape[:2]
+        long_edge = max(h, w)
+        if self.max_long_edge > 0 and long_edge > self.max_long_edge:
+            scale = self.max_long_edge / long_edge
+            frame = cv2.resize(frame, (max(int(w * scale), 1), max(int(h * scale), 1)), interpolation=cv2.INTER_AREA)
+        return frame
+
+    def process_frame(self, frame, original_shape=None):
+        """
+        BGR kareyi analiz eder. `original_shape` verilmezse karenin kendi boyutu kullanılır
+        (piksel ölçümleri bu boyuta göre hesaplanır). Vücut bulunduysa True döndürür.
+        """
+        original_shape = original_shape or frame.shape
+        start = time.perf_counter()
+        image_rgb = cv2.cvtColor(self._prepare(frame), cv2.COLOR_BGR2RGB)
+        results = self._pose.process(image_rgb)
+        elapsed = time.perf_counter() - start
+        # Üstel hareketli ortalama: işlem süresindeki dalgalanmalara yumuşak tepki
+        self._avg_process_time = elapsed if self.frames_analyzed == 0 else 0.8 * self._avg_process_time + 0.2 * elapsed
+        self.frames_analyzed += 1
+
+        if not results.pose_landmarks:
+            return False
+        self._landmarks.append(pose_landmarks_to_array(results.pose_landmarks))
+        self._shapes.append(original_shape[:2])
+        self.frames_detected += 1
+        return True
+
+    def process_encoded_frame(self, buf):
+        """Canlı akıştan gelen JPEG/PNG kareyi çözüp analiz eder."""
+        prepared = decode_for_inference(buf, max_long_edge=self.max_long_edge)
+        if prepared is None:
+            raise BodyAnalysisError("Kare çözümlenemedi veya bozuk.", reason="decode_failed")
+        return self.process_frame(prepared.image, prepared.original_shape)
+
+    def summary(self):
+        """Tüm karelerin ölçümlerini aykırı değerleri ayıklayarak tek bir sonuçta birleştirir."""
+        stats = {
+            "frames_seen": self.frames_seen,
+            "frames_analyzed": self.frames_analyzed,
+            "frames_detected": self.frames_detected,
+        }
+        if not self._landmarks:
+            raise BodyAnalysisError("Videoda vücut noktaları tespit edilemedi.", reason="no_pose_detected")
+
+        m = _body_measurements_batch(np.stack(self._landmarks), np.asarray(self._shapes), self.gender)
+        valid = m["has_visible"] & (m["height_px"] > 0) & (m["hip_width"] > 0) & (m["shoulder_width"] > 0)
+        if valid.sum() < min(VIDEO_MIN_VALID_FRAMES, self.frames_detected):
+            raise BodyAnalysisError("Videoda yeterli sayıda geçerli kare bulunamadı.", reason="insufficient_frames")
+
+        shoulder_width, used_shoulder = _robust_mean(m["shoulder_width"][valid])
+        hip_width, used_hip = _robust_mean(m["hip_width"][valid])
+        height_px, used_height = _robust_mean(m["height_px"][valid])
+        # Yağ oranı kare başına değil, kararlı hale getirilmiş ölçümlerden hesaplanır
+        body_fat, whr = _calculate_internal_body_fat_from_measurements(hip_width, shoulder_width, height_px, self.gender)
+
+        stats["frames_used"] = int(min(used_shoulder, used_hip, used_height))
+        return {
+            "result": {
+                "Vücut Yağ Oranı (%)": float(body_fat) if body_fat != -1 else "Hesaplanamadı",
+                "Bel-Kalça Oranı (WHR)": float(whr),
+                "Kalça/Omuz Genişlik Oranı": float(whr),
+                "Omuz Genişliği (px)": round(shoulder_width, 2),
+                "Kalça Genişliği (px)": round(hip_width, 2),
+                "Boy Uzunluğu (px)": round(height_px, 2),
+            },
+            "frames": stats,
+        }
+
+    def close(self):
+        self._pose.close()
+
+
+def analyze_video_file(video_path, gender="male"):
+    """
+    Video dosyasını analiz eder. Atlanan kareler `grab()` ile çözülmeden geçilir,
+    sadece analiz edilecek kareler `retrieve()` ile çözülür.
+    """
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        raise BodyAnalysisError("Video açılamadı veya desteklenmeyen biçimde.", reason="video_open_failed")
+
+    analyzer = VideoBodyAnalyzer(gender)
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+        frame_index = 0
+        while not analyzer.full:
+            if not capture.grab():
+                break
+            timestamp = frame_index / fps
+            frame_index += 1
+            if not analyzer.should_process(timestamp):
+                continue
+            ok, frame = capture.retrieve()
+            if not ok:
+                continue
+            analyzer.process_frame(frame)
+        return analyzer.summary()
+    finally:
+        analyzer.close()
+        capture.release()
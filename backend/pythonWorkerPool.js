@@ -0,0 +1,248 @@
+const { spawn } = require('child_process');
+const path = require('path');
+
+// Kalıcı Python çalışan havuzu.
+// Her istekte yeni bir Python yorumlayıcısı başlatmak cv2/mediapipe/numpy importlarını
+// ve model yüklemesini her seferinde tekrar ödetir. Bu havuz `bodyAnalysis.py --worker`
+// süreçlerini bir kez başlatır, istekleri uzunluk önekli ikili çerçevelerle stdin/stdout
+// üzerinden gönderir ve yanıtları istek id'si ile eşleştirir (multiplexing).
+// Çöken çalışanlar bekleyen isteklerini hata ile sonlandırır ve yeniden başlatılır. Zaman aşımına
+// uğrayan isteğin çalışanı askıda kabul edilir: öldürülür ve aynı yoldan yeniden başlatılır.
+//
+// İki çalışan betiği vardır:
+//   - bodyAnalysis.py --worker: backend/bodyAnalysis.js (İngilizce anahtarlar, omuz-ayak bileği boyu)
+//   - python/analysis_worker.py: routes/bodyAnalysis.js (FastAPI /analyze_image/ ile aynı Türkçe
+//     anahtarlar ve boy hesabı; body_analysis.analyze_body_bytes)
+//
+// Çerçeve formatı (tüm tamsayılar big-endian uint32):
+//   İstek : [uzunluk][istek id][başlık uzunluğu][başlık JSON][ham görsel baytları]
+//   Yanıt : [uzunluk][istek id][sonuç JSON]
+
+const DEFAULT_SCRIPT = path.join(__dirname, 'bodyAnalysis.py');
+const ANALYSIS_WORKER_SCRIPT = path.join(__dirname, 'python', 'analysis_worker.py');
+const MAX_RESTART_DELAY_MS = 10000;
+
+class PythonWorker {
+  constructor(pool, index) {
+    this.pool = pool;
+    this.index = index;
+    this.pending = new Map();
+    this.buffer = Buffer.alloc(0);
+    this.ready = false;
+    this.restartDelay = 500;
+    this.stopped = false;
+    this.killing = false;
+    this.spawn();
+  }
+
+  spawn() {
+    const { pythonPath, script, scriptArgs } = this.pool.options;
+    this.process = spawn(pythonPath, [script, ...scriptArgs], {
+      stdio: ['pipe', 'pipe', 'pipe'],
+    });
+    this.ready = false;
+    this.killing = false;
+    this.buffer = Buffer.alloc(0);
+
+    this.process.stdout.on('data', (chunk) => this.onData(chunk));
+    this.process.stderr.on('data', (data) => {
+      // MediaPipe/TensorFlow logları stderr'e yazılır, sadece hata ayıklama için
+      if (process.env.PYTHON_WORKER_DEBUG) {
+        console.error(`[python-worker-${this.index}] ${data.toString().trimEnd()}`);
+      }
+    });
+    this.process.stdin.on('error', (err) => {
+      console.error(`Python çalışanına yazılamadı (${this.index}):`, err.message);
+    });
+    this.process.on('error', (err) => {
+      console.error(`Python çalışanı başlatılamadı (${this.index}):`, err.message);
+    });
+    this.process.on('exit', (code, signal) => this.onExit(code, signal));
+  }
+
+  get load() {
+    return this.pending.size;
+  }
+
+  get available() {
+    return !this.killing && this.process.exitCode === null && this.process.signalCode === null;
+  }
+
+  kill(reason) {
+    // Askıda kalan çalışan: bekleyen diğer istekler onExit'te reddedilir ve yerine yenisi başlatılır
+    if (this.killing || !this.available) {
+      return;
+    }
+    this.killing = true;
+    this.ready = false;
+    console.error(`Python çalışanı ${this.index} sonlandırılıyor: ${reason}`);
+    this.process.kill('SIGKILL');
+  }
+
+  onData(chunk) {
+    this.buffer = this.buffer.length ? Buffer.concat([this.buffer, chunk]) : chunk;
+    while (this.buffer.length >= 4) {
+      const length = this.buffer.readUInt32BE(0);
+      if (this.buffer.length < 4 + length) {
+        break;
+      }
+      const requestId = this.buffer.readUInt32BE(4);
+      const body = this.buffer.subarray(8, 4 + length);
+      this.buffer = this.buffer.subarray(4 + length);
+      this.onFrame(requestId, body);
+    }
+  }
+
+  onFrame(requestId, body) {
+    let payload;
+    try {
+      payload = JSON.parse(body.toString('utf8'));
+    } catch (err) {
+      payload = { success: false, error: 'Sonuçlar işlenirken bir hata oluştu' };
+    }
+
+    if (requestId === 0) {
+      // Hazır sinyali: modeller yüklendi
+      this.ready = true;
+      this.restartDelay = 500;
+      return;
+    }
+
+    const request = this.pending.get(requestId);
+    if (!request) {
+      return; // Zaman aşımına uğramış isteğin geç gelen yanıtı
+    }
+    this.pending.delete(requestId);
+    clearTimeout(request.timer);
+    request.resolve(payload);
+  }
+
+  onExit(code, signal) {
+    this.ready = false;
+    const error = new Error(`Python çalışanı beklenmedik şekilde kapandı (kod: ${code}, sinyal: ${signal})`);
+    for (const request of this.pending.values()) {
+      clearTimeout(request.timer);
+      request.reject(error);
+    }
+    this.pending.clear();
+
+    if (this.stopped) {
+      return;
+    }
+    console.error(`Python çalışanı ${this.index} kapandı, ${this.restartDelay} ms sonra yeniden başlatılacak.`);
+    setTimeout(() => {
+      if (!this.stopped) {
+        this.spawn();
+      }
+    }, this.restartDelay);
+    this.restartDelay = Math.min(this.restartDelay * 2, MAX_RESTART_DELAY_MS);
+  }
+
+  send(requestId, imageBuffer, meta) {
+    return new Promise((resolve, reject) => {
+      if (!this.available) {
+        reject(new Error('Python çalışanı yeniden başlatılıyor, lütfen tekrar deneyin'));
+        return;
+      }
+      const header = Buffer.from(JSON.stringify(meta), 'utf8');
+      const prefix = Buffer.alloc(12);
+      prefix.writeUInt32BE(8 + header.length + imageBuffer.length, 0);
+      prefix.writeUInt32BE(requestId, 4);
+      prefix.writeUInt32BE(header.length, 8);
+
+      const timer = setTimeout(() => {
+        this.pending.delete(requestId);
+        reject(new Error('Vücut analizi zaman aşımına uğradı'));
+        this.kill(`istek ${requestId} zaman aşımına uğradı`);
+      }, this.pool.options.requestTimeoutMs);
+      this.pending.set(requestId, { resolve, reject, timer });
+
+      // Görsel base64'e çevrilmeden, olduğu gibi yazılır
+      this.process.stdin.write(prefix);
+      this.process.stdin.write(header);
+      this.process.stdin.write(imageBuffer);
+    });
+  }
+
+  stop() {
+    this.stopped = true;
+    this.process.stdin.end();
+  }
+}
+
+class PythonWorkerPool {
+  constructor(options = {}) {
+    this.options = {
+      size: 2,
+      pythonPath: 'python',
+      script: DEFAULT_SCRIPT,
+      scriptArgs: ['--worker'],
+      requestTimeoutMs: 30000,
+      ...options,
+    };
+    this.nextRequestId = 1;
+    this.workers = [];
+    for (let i = 0; i < this.options.size; i++) {
+      this.workers.push(new PythonWorker(this, i));
+    }
+  }
+
+  nextId() {
+    const id = this.nextRequestId;
+    // 0 hazır sinyaline ayrılmıştır; uint32 sınırında başa dön
+    this.nextRequestId = this.nextRequestId >= 0xffffffff ? 1 : this.nextRequestId + 1;
+    return id;
+  }
+
+  pickWorker() {
+    // Hazır olanlar arasından en az bekleyen isteği olan çalışan; hiçbiri hazır değilse
+    // sonlandırılmakta veya yeniden başlatılmakta olmayanlar (model yüklüyor olabilir)
+    const ready = this.workers.filter((w) => w.ready);
+    const alive = this.workers.filter((w) => w.available);
+    const pool = ready.length ? ready : alive.length ? alive : this.workers;
+    return pool.reduce((best, w) => (w.load < best.load ? w : best));
+  }
+
+  analyze(imageBuffer, gender = 'male') {
+    return this.pickWorker().send(this.nextId(), imageBuffer, { gender });
+  }
+
+  close() {
+    for (const worker of this.workers) {
+      worker.stop();
+    }
+  }
+}
+
+let defaultPool = null;
+let analysisPool = null;
+
+function envPoolOptions() {
+  return {
+    size: parseInt(process.env.PYTHON_WORKERS || '2', 10),
+    pythonPath: process.env.PYTHON_BIN || 'python',
+    requestTimeoutMs: parseInt(process.env.PYTHON_WORKER_TIMEOUT_MS || '30000', 10),
+  };
+}
+
+// Uygulama genelinde paylaşılan havuz (ilk kullanımda oluşturulur); bodyAnalysis.py --worker
+function getDefaultPool() {
+  if (!defaultPool) {
+    defaultPool = new PythonWorkerPool(envPoolOptions());
+  }
+  return defaultPool;
+}
+
+// FastAPI ile aynı analiz hattını ve Türkçe yanıt anahtarlarını kullanan havuz; python/analysis_worker.py
+function getAnalysisPool() {
+  if (!analysisPool) {
+    analysisPool = new PythonWorkerPool({
+      ...envPoolOptions(),
+      script: ANALYSIS_WORKER_SCRIPT,
+      scriptArgs: [],
+    });
+  }
+  return analysisPool;
+}
+
+module.exports = { PythonWorkerPool, getDefaultPool, getAnalysisPool };
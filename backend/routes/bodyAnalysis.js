@@ -2,15 +2,7 @@ const express = require('express');
 const router = express.Router();
 const { spawn } = require('child_process');
 const path = require('path');
-const fs = require('fs');
-const { promisify } = require('util');
-const writeFileAsync = promisify(fs.writeFile);
-
-// Geçici dosyalar için klasörü oluştur
-const tempDir = path.join(__dirname, '../temp');
-if (!fs.existsSync(tempDir)) {
-  fs.mkdirSync(tempDir);
-}
+const { getAnalysisPool } = require('../pythonWorkerPool');
 
 router.post('/analyze', async (req, res) => {
   try {
@@ -66,7 +58,6 @@ router.post('/analyze', async (req, res) => {
 });
 
 router.post('/analyze-image', async (req, res) => {
-  let tempImagePath = null;
   try {
     const { image, gender } = req.body;
     if (!image) {
@@ -76,14 +67,12 @@ router.post('/analyze-image', async (req, res) => {
       });
     }
 
-    // Base64 formatını ve uzantısını algıla
-    let base64Data, ext;
+    // Base64 formatını algıla
+    let base64Data;
     if (image.startsWith('data:image/png')) {
       base64Data = image.replace(/^data:image\/png;base64,/, '');
-      ext = 'png';
     } else if (image.startsWith('data:image/jpeg') || image.startsWith('data:image/jpg')) {
       base64Data = image.replace(/^data:image\/jpeg;base64,/, '').replace(/^data:image\/jpg;base64,/, '');
-      ext = 'jpg';
     } else {
       return res.status(400).json({
         success: false,
@@ -91,75 +80,25 @@ router.post('/analyze-image', async (req, res) => {
       });
     }
 
-    tempImagePath = path.join(tempDir, `temp_${Date.now()}.${ext}`);
-    await writeFileAsync(tempImagePath, base64Data, 'base64');
-
-    // Python script'ini çalıştır
-    const pythonProcess = spawn('python', [
-      path.join(__dirname, '../python/body_analysis.py'),
-      tempImagePath,
-      gender || 'male'
-    ]);
-
-    let result = '';
-    let error = '';
-
-    pythonProcess.stdout.on('data', (data) => {
-      result += data.toString();
-    });
-
-    pythonProcess.stderr.on('data', (data) => {
-      error += data.toString();
-    });
-
-    pythonProcess.on('close', async (code) => {
-      if (tempImagePath && fs.existsSync(tempImagePath)) {
-        try {
-          await fs.promises.unlink(tempImagePath);
-        } catch (err) {
-          console.error('Geçici dosya silinemedi:', err);
-        }
-      }
-
-      if (code !== 0) {
-        return res.status(500).json({
-          success: false,
-          message: 'Görüntü analizi sırasında bir hata oluştu',
-          error: error || result
-        });
-      }
+    // Geçici dosya yerine görsel baytları doğrudan kalıcı Python çalışanına gönderilir.
+    // Çalışan python/body_analysis.py hattını kullanır; yanıt eskisi gibi Türkçe anahtarlıdır.
+    const imageBuffer = Buffer.from(base64Data, 'base64');
+    const analysisResult = await getAnalysisPool().analyze(imageBuffer, gender || 'male');
 
-      try {
-        const analysisResult = JSON.parse(result);
-        if (analysisResult.error) {
-          return res.status(400).json({
-            success: false,
-            message: analysisResult.error
-          });
-        }
-        res.json({
-          success: true,
-          data: analysisResult
-        });
-      } catch (err) {
-        res.status(500).json({
-          success: false,
-          message: 'Sonuçlar işlenirken bir hata oluştu',
-          error: err.message + ' | ' + result
-        });
-      }
+    if (!analysisResult.success) {
+      return res.status(400).json({
+        success: false,
+        message: analysisResult.error
+      });
+    }
+    res.json({
+      success: true,
+      data: analysisResult.results
     });
   } catch (error) {
-    if (tempImagePath && fs.existsSync(tempImagePath)) {
-      try {
-        await fs.promises.unlink(tempImagePath);
-      } catch (err) {
-        console.error('Geçici dosya silinemedi:', err);
-      }
-    }
     res.status(500).json({
       success: false,
-      message: 'Bir hata oluştu',
+      message: 'Görüntü analizi sırasında bir hata oluştu',
       error: error.message
     });
   }